@@ -0,0 +1,112 @@
+"""
+NCA rename regression benchmark.
+
+Compares the old NCA path (a default OCR pass followed by a second --psm 6
+pass for the parser, at 200 DPI) with the app's own rename_engine.process_pdf
+(text layer, OCR cache and DPI ladder), over a folder of NCA PDFs. Both OCR
+through the app's engine (tesserocr when installed, else tesseract). The
+cache, DPI stats and templates start empty in a temp folder (ERC_STATE_DIR)
+unless ERC_STATE_DIR is already set, so the app's own files are untouched.
+
+    python benchmarks/make_corpus.py nca_corpus --types nca --count 100
+    python benchmarks/bench_nca.py nca_corpus [--limit 200] [--truth nca_corpus/truth.csv]
+
+--truth is a make_corpus truth.csv or a plain CSV of file,nca_number;
+without it the old path's result is taken as the expected value.
+"""
+import os
+import sys
+import csv
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Before the app's modules read it at import
+STATE_DIR = None
+if not os.environ.get("ERC_STATE_DIR"):
+    STATE_DIR = tempfile.mkdtemp(prefix="erc_bench_nca_")
+    os.environ["ERC_STATE_DIR"] = STATE_DIR
+
+import pytesseract
+from pdf2image import convert_from_path
+from core.id_extractors import parse_nca_number
+from core.ocr_config import get_poppler_path, get_tesseract_path
+from core.ocr_engine import get_engine, image_to_text
+from core.rename_engine import process_pdf
+
+
+def old_path(path, poppler_path):
+    image = convert_from_path(path, first_page=1, last_page=1, poppler_path=poppler_path)[0]
+    image_to_text(image)
+    return parse_nca_number(image_to_text(image, "--psm 6"))
+
+def new_path(path, poppler_path):
+    result = process_pdf("NCA", os.path.dirname(path), os.path.basename(path), poppler_path)
+    if result["error"]:
+        print(f"{os.path.basename(path)}: {result['error']}")
+    return result["value"]
+
+def run(func, paths, poppler_path):
+    found = {}
+    start = time.perf_counter()
+    for path in paths:
+        found[os.path.basename(path)] = func(path, poppler_path)
+    return time.perf_counter() - start, found
+
+def match_rate(found, expected):
+    if not expected:
+        return 0.0
+    hits = sum(1 for file, value in expected.items() if value and found.get(file) == value)
+    return hits / len(expected)
+
+def read_truth(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    if rows and rows[0][:3] == ["file", "type", "number"]:
+        # make_corpus.py's truth.csv
+        return {row[0]: row[2] for row in rows[1:] if len(row) >= 3 and row[1].lower() == "nca"}
+    return {row[0]: row[1] for row in rows if len(row) >= 2}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder")
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--truth")
+    args = parser.parse_args()
+
+    tesseract_path = get_tesseract_path()
+    if tesseract_path:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    poppler_path = get_poppler_path()
+
+    files = sorted(f for f in os.listdir(args.folder) if f.lower().endswith(".pdf"))
+    if args.limit:
+        files = files[:args.limit]
+    if not files:
+        sys.exit("No PDF files found.")
+    paths = [os.path.join(args.folder, f) for f in files]
+
+    try:
+        # Warm up the engine so neither path pays for loading the model
+        get_engine()
+        old_time, old_found = run(old_path, paths, poppler_path)
+        new_time, new_found = run(new_path, paths, poppler_path)
+        expected = read_truth(args.truth) if args.truth else old_found
+
+        print(f"Files: {len(files)}, OCR engine: {get_engine().name}")
+        print(f"Old (2 OCR passes):      {len(files) / old_time:6.2f} files/s  match {match_rate(old_found, expected):.1%}")
+        print(f"New (process_pdf, cold): {len(files) / new_time:6.2f} files/s  match {match_rate(new_found, expected):.1%}")
+        print(f"Speed-up: {old_time / new_time:.2f}x")
+        lost = [f for f, v in expected.items() if v and old_found.get(f) == v and new_found.get(f) != v]
+        if lost:
+            print("Matched by old path only:", ", ".join(lost))
+    finally:
+        if STATE_DIR:
+            shutil.rmtree(STATE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
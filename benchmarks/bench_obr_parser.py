@@ -0,0 +1,171 @@
+"""
+OBR field parser micro-benchmark.
+
+Times core.obr_parser.parse_obr_text against the old multi-pass parser on
+stored OCR texts, cycled up to --docs documents, and reports any document
+where the two disagree. Texts come from the OCR cache (the default), a
+folder of .txt files or --fuzz: that many make_corpus.py OBR pages with
+line breaks, blank lines, case and label punctuation scrambled.
+
+    python benchmarks/bench_obr_parser.py [--texts folder | --fuzz 200000] [--cache ocr_cache.sqlite] [--docs 100000]
+
+One difference is intended and left out of the comparison: the old date
+pattern's \\s could run across a line break inside the date itself (e.g.
+"Office\\n5, 2024" after a "Date" label), where the new parser reads a
+date from one line only. Those texts are counted separately and compared
+on the other three fields.
+"""
+import os
+import re
+import sys
+import time
+import random
+import sqlite3
+import argparse
+from itertools import cycle, islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.obr_parser import parse_obr_text
+from core.ocr_cache import CACHE_FILE
+from benchmarks.make_corpus import obr_form
+
+
+def old_parse(text):
+    # The multi-pass parser ExtractWorker used before core/obr_parser.py
+    date_match = re.search(r"(?:Date\s*[:\-]?\s*)([A-Za-z]+\s+\d{1,2},\s+\d{4})", text, re.IGNORECASE)
+    date = date_match.group(1) if date_match else ""
+
+    payee = ""
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        match = re.search(r"Payee\s*[:\-]?\s*(.+)", line, re.IGNORECASE)
+        if match and match.group(1).strip():
+            payee = match.group(1).strip()
+            break
+        if re.match(r"^\s*Payee\s*[:\-]?\s*$", line, re.IGNORECASE) and i + 1 < len(lines):
+            next_line = lines[i + 1].strip()
+            if next_line:
+                payee = next_line
+                break
+
+    particulars_lines = []
+    is_collecting = False
+    blank_line_count = 0
+
+    for line in lines:
+        stripped = line.strip()
+        lower = stripped.lower()
+        if not is_collecting and "to obligate" in lower:
+            match = re.search(r"(To obligate.*)", stripped, re.IGNORECASE)
+            if match:
+                particulars_lines.append(match.group(1).strip())
+                is_collecting = True
+            continue
+
+        if is_collecting:
+            if any(kw in lower for kw in ["certified", "signature", "position", "printed name", "head", "date:", "status of obligation"]):
+                break
+            if not stripped:
+                blank_line_count += 1
+                if blank_line_count >= 2:
+                    break
+                continue
+            else:
+                blank_line_count = 0
+                particulars_lines.append(stripped)
+
+    full_particulars = " ".join(particulars_lines)
+    cleaned = re.split(r"\s+\d{10,}|\s+\d{3,}\.\d{2}|\|\s*\d+", full_particulars)[0].strip()
+
+    total_match = re.search(r"Total\s*[:\s]*([\d,]+\.\d{2})", text)
+    if total_match:
+        total_amount = f"{float(total_match.group(1).replace(',', '')):,.2f}"
+    else:
+        amounts = [float(a.replace(",", "")) for a in re.findall(r"(\d{1,3}(?:,\d{3})*\.\d{2})", text)]
+        total_amount = f"{sum(amounts):,.2f}"
+    return date, payee, cleaned, total_amount
+
+def fuzz_texts(count, seed=1):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = []
+        for line in obr_form(rng)[0]:
+            text = line[2]
+            if rng.random() < 0.2:
+                text = text.replace(":", rng.choice(("", " -", " :")), 1)
+            if rng.random() < 0.1:
+                text = text.upper() if rng.random() < 0.5 else text.lower()
+            # Break a line anywhere between words, as OCR of a skewed scan can
+            parts = text.split(" ")
+            words.append(" ".join(parts) if rng.random() < 0.7 else
+                         "\n".join(" ".join(parts[i:i + 2]) for i in range(0, len(parts), 2)))
+            words.append("\n" * rng.choice((1, 1, 1, 2, 3)))
+        texts.append("".join(words))
+    return texts
+
+def load_texts(folder=None, cache=CACHE_FILE):
+    if folder:
+        texts = []
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(".txt"):
+                with open(os.path.join(folder, name), encoding="utf-8", errors="ignore") as f:
+                    texts.append(f.read())
+        return texts
+    if not os.path.exists(cache):
+        return []
+    conn = sqlite3.connect(cache)
+    try:
+        # Full-page OBR passes only; corner regions aren't what the parser sees
+        rows = conn.execute("SELECT text FROM ocr WHERE config=? AND region=?", ("--psm 6", "None")).fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+def run(func, texts):
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", help="folder of .txt OCR outputs")
+    parser.add_argument("--cache", default=CACHE_FILE)
+    parser.add_argument("--fuzz", type=int, default=0, help="compare on this many fuzzed pages instead")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--docs", type=int, default=100000)
+    args = parser.parse_args()
+
+    texts = fuzz_texts(args.fuzz, args.seed) if args.fuzz else load_texts(args.texts, args.cache)
+    if not texts:
+        sys.exit("No stored OCR texts found.")
+    docs = list(islice(cycle(texts), args.docs))
+
+    mismatches, cross_line = [], 0
+    for i, text in enumerate(texts):
+        old, new = old_parse(text), parse_obr_text(text)
+        if "\n" in old[0]:
+            # The old date match ran across a line break; only the date may differ
+            cross_line += 1
+            old, new = old[1:], new[1:]
+        if old != new:
+            mismatches.append(i)
+    old_time = run(old_parse, docs)
+    new_time = run(parse_obr_text, docs)
+
+    print(f"Distinct texts: {len(texts)}, documents parsed: {len(docs)}")
+    print(f"Old parser:  {old_time:7.2f} s  {old_time / len(docs) * 1e6:8.1f} us/doc")
+    print(f"New parser:  {new_time:7.2f} s  {new_time / len(docs) * 1e6:8.1f} us/doc")
+    print(f"Speed-up: {old_time / new_time:.2f}x")
+    print(f"Cross-line dates, compared without the date: {cross_line}")
+    print(f"Texts where the parsers disagree: {len(mismatches)}")
+    for i in mismatches[:5]:
+        print("---")
+        print("old:", old_parse(texts[i]))
+        print("new:", parse_obr_text(texts[i]))
+
+
+if __name__ == "__main__":
+    main()
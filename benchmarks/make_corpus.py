@@ -0,0 +1,321 @@
+"""
+Synthetic OBR, NCA and SARO corpus for offline throughput and accuracy tests.
+
+Draws each form with made-up but pattern-true values (CA-MOOE/PGF/PS OBR
+serials, NCA-… and SARO-… numbers, payees, particulars, amounts) and
+saves it as a scanned PDF. Scan noise, skew, whole-page rotation, rubber
+stamps and attachment pages come in at the given rates. A share of the
+files can be born-digital, with a text layer and no image. The ground
+truth goes to truth.csv in the output folder.
+
+    python benchmarks/make_corpus.py OUT [--count 20000] [--types obr,nca,saro] [--dpi 150]
+        [--noise 0.3] [--skew 1.5] [--rotate 0.02] [--stamps 0.3] [--bundles 0.1]
+        [--digital 0.1] [--seed 1] [--jobs N]
+
+Score a rename or extraction run against the truth:
+
+    python -m erc batch rename --type auto --dry-run --output report.csv OUT
+    python benchmarks/make_corpus.py OUT --score report.csv
+"""
+import os
+import sys
+import csv
+import random
+import argparse
+from multiprocessing import Pool
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAGE_INCHES = (8.5, 11)
+TRUTH_FILE = "truth.csv"
+TRUTH_COLUMNS = ("file", "type", "number", "date", "payee", "particulars", "amount", "pages", "scanned",
+                 "rotation", "skew")
+MONTHS = ("January", "February", "March", "April", "May", "June", "July", "August", "September",
+          "October", "November", "December")
+PAYEES = ("JUAN DELA CRUZ ENTERPRISES", "MARIA SANTOS TRADING", "GOLDEN HARVEST SUPPLY CO.",
+          "PACIFIC OFFICE SOLUTIONS INC.", "ILOCOS PRINTING PRESS", "BAYANIHAN CONSTRUCTION CORP.",
+          "NORTHERN LIGHTS CATERING", "RIZAL HARDWARE AND GENERAL MERCHANDISE", "MINDANAO FUEL DEPOT",
+          "VISAYAS MEDICAL SUPPLIES")
+PURPOSES = ("office supplies for the 1st quarter", "fuel and lubricants for official vehicles",
+            "catering services for the regional training", "repair of the administrative building roof",
+            "printing of information materials", "janitorial services for the month",
+            "travelling expenses of personnel", "internet subscription for the regional office")
+STAMP_WORDS = ("RECEIVED", "RECORDED", "APPROVED", "PAID", "FOR PAYMENT")
+BUDGET_OFFICES = ("BMB", "BMC", "BMD", "FPB")
+FONT_NAMES = ("DejaVuSans.ttf", "arial.ttf", "LiberationSans-Regular.ttf")
+
+_fonts = {}
+
+
+def font(size):
+    if size not in _fonts:
+        for name in FONT_NAMES:
+            try:
+                _fonts[size] = ImageFont.truetype(name, size)
+                break
+            except OSError:
+                continue
+        else:
+            _fonts[size] = ImageFont.load_default(size=size)
+    return _fonts[size]
+
+def money(rng, low=1000, high=2500000):
+    return round(rng.uniform(low, high), 2)
+
+def random_date(rng):
+    return f"{rng.choice(MONTHS)} {rng.randint(1, 28)}, {rng.randint(2019, 2025)}"
+
+
+# A form is a list of (x, y, text, size, bold) lines, x and y as page fractions
+
+def obr_form(rng):
+    year, month = rng.randint(2019, 2025), rng.randint(1, 12)
+    prefix = rng.choice(("CA-MOOE", "CA-MOOE", "MOOE", "PGF", "PS"))
+    serial = f"{prefix}-{year}-{month:02d}-{rng.randint(1, 9999):04d}"
+    date, payee = random_date(rng), rng.choice(PAYEES)
+    items = [money(rng, 500, 500000) for _ in range(rng.randint(1, 3))]
+    total = sum(items)
+    particulars = f"To obligate payment for {rng.choice(PURPOSES)}"
+    extra = rng.choice(("as per attached documents", "under PR No. %d" % rng.randint(1000, 9999), ""))
+    lines = [
+        (0.5, 0.05, "OBLIGATION REQUEST AND STATUS", 30, True),
+        (0.5, 0.085, "Republic of the Philippines", 18, False),
+        (0.58, 0.13, f"Serial No.: {serial}", 20, False),
+        (0.58, 0.16, f"Date: {date}", 20, False),
+        (0.08, 0.22, f"Payee: {payee}", 20, False),
+        (0.08, 0.25, "Office: Regional Office", 20, False),
+        (0.08, 0.28, "Address: Quezon City", 20, False),
+        (0.08, 0.34, "Responsibility Center    Particulars    MFO/PAP    UACS Code    Amount", 16, True),
+        (0.08, 0.38, particulars, 18, False),
+    ]
+    y = 0.41
+    if extra:
+        lines.append((0.08, y, extra, 18, False))
+        y += 0.03
+    for amount in items:
+        lines.append((0.72, y, f"{amount:,.2f}", 18, False))
+        y += 0.03
+    lines += [
+        (0.55, y + 0.02, f"Total {total:,.2f}", 20, True),
+        (0.08, 0.72, "Certified: Charges to appropriation/allotment necessary, lawful", 16, False),
+        (0.08, 0.78, "Signature: ____________________", 16, False),
+        (0.08, 0.81, "Printed Name: ____________________", 16, False),
+        (0.08, 0.84, "Position: Head, Requesting Office", 16, False),
+    ]
+    truth = {"number": serial, "date": date, "payee": payee,
+             "particulars": " ".join(filter(None, (particulars, extra))), "amount": f"{total:,.2f}"}
+    return lines, truth
+
+def nca_form(rng):
+    year = rng.randint(19, 25)
+    number = f"NCA-{rng.choice(BUDGET_OFFICES)}-{rng.choice('EF')}-{year}-{rng.randint(1, 9999999):07d}"
+    amount = money(rng, 100000, 90000000)
+    lines = [
+        (0.5, 0.05, "NOTICE OF CASH ALLOCATION", 30, True),
+        (0.5, 0.085, "Department of Budget and Management", 18, False),
+        (0.08, 0.15, f"Date: {random_date(rng)}", 20, False),
+        (0.08, 0.19, "Department: Department of Energy", 20, False),
+        (0.08, 0.22, "Agency: Regional Office", 20, False),
+        (0.08, 0.27, "NCA No.", 20, True),
+        (0.08, 0.30, number, 22, False),
+        (0.08, 0.33, f"MDS Sub-Account No. 2067-{rng.randint(1000, 9999)}-{rng.randint(10, 99)}", 20, False),
+        (0.08, 0.40, "Purpose: For payment of current year obligations", 18, False),
+        (0.08, 0.45, f"Amount: {amount:,.2f}", 20, False),
+        (0.08, 0.80, "Approved by: ____________________", 16, False),
+    ]
+    return lines, {"number": number, "amount": f"{amount:,.2f}"}
+
+def saro_form(rng):
+    year = rng.randint(19, 25)
+    number = f"SARO-{rng.choice(BUDGET_OFFICES)}-{rng.choice('ABCD')}-{year}-{rng.randint(1, 9999999):07d}"
+    amount = money(rng, 100000, 50000000)
+    lines = [
+        (0.5, 0.05, "SPECIAL ALLOTMENT RELEASE ORDER", 30, True),
+        (0.5, 0.085, "Department of Budget and Management", 18, False),
+        (0.08, 0.15, f"Date: {random_date(rng)}", 20, False),
+        (0.08, 0.19, "Department: Department of Energy", 20, False),
+        (0.08, 0.23, f"Purpose: {rng.choice(PURPOSES).capitalize()}", 18, False),
+        (0.08, 0.30, f"Total Amount Released: {amount:,.2f}", 20, False),
+        (0.08, 0.60, "Recommending Approval: ____________________", 16, False),
+        (0.55, 0.86, f"SARO No.: {number}", 20, False),
+    ]
+    return lines, {"number": number, "amount": f"{amount:,.2f}"}
+
+def attachment_page(rng):
+    # Filler page of a bundle: a memo with no identifiers
+    lines = [(0.5, 0.06, "MEMORANDUM", 26, True)]
+    for i in range(rng.randint(8, 20)):
+        lines.append((0.08, 0.14 + i * 0.035, rng.choice(PURPOSES).capitalize() + " and related expenses.", 16, False))
+    return lines
+
+FORMS = {"obr": ("OBR", obr_form), "nca": ("NCA", nca_form), "saro": ("SARO", saro_form)}
+
+
+def draw_page(lines, dpi):
+    width, height = int(PAGE_INCHES[0] * dpi), int(PAGE_INCHES[1] * dpi)
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    scale = dpi / 150
+    for x, y, text, size, bold in lines:
+        face = font(max(8, int(size * scale)))
+        left = x * width
+        if x == 0.5:
+            left -= draw.textlength(text, font=face) / 2
+        draw.text((left, y * height), text, fill=0, font=face, stroke_width=1 if bold else 0, stroke_fill=0)
+    return image
+
+def add_stamp(image, rng):
+    # Gray rubber stamp overlapping the form, drawn on its own layer and rotated
+    dpi_scale = image.width / (PAGE_INCHES[0] * 150)
+    word, date = rng.choice(STAMP_WORDS), random_date(rng)
+    face = font(int(26 * dpi_scale))
+    w, h = int(380 * dpi_scale), int(150 * dpi_scale)
+    stamp = Image.new("L", (w, h), 0)
+    draw = ImageDraw.Draw(stamp)
+    draw.rounded_rectangle((2, 2, w - 3, h - 3), radius=int(12 * dpi_scale), outline=255, width=max(2, int(4 * dpi_scale)))
+    draw.text((w * 0.1, h * 0.15), word, fill=255, font=face)
+    draw.text((w * 0.1, h * 0.55), date, fill=255, font=font(int(20 * dpi_scale)))
+    stamp = stamp.rotate(rng.uniform(-25, 25), expand=True)
+    position = (int(rng.uniform(0.3, 0.7) * image.width), int(rng.uniform(0.15, 0.75) * image.height))
+    ink = Image.new("L", stamp.size, rng.randint(60, 140))
+    image.paste(ink, position, stamp.point(lambda v: int(v * 0.8)))
+    return image
+
+def add_noise(image, rng, amount):
+    # Speckle, uneven toner and a little blur, scaled by amount (0..1)
+    if amount <= 0:
+        return image
+    np_rng = np.random.default_rng(rng.randint(0, 2 ** 31))
+    pixels = np.asarray(image, dtype=np.float32) + np_rng.standard_normal(image.size[::-1], dtype=np.float32) * (25 * amount)
+    speckle = np_rng.random(pixels.shape, dtype=np.float32)
+    pixels[speckle < 0.002 * amount] = 0
+    pixels[speckle > 1 - 0.01 * amount] = 255
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    return image.filter(ImageFilter.GaussianBlur(0.3 + 0.5 * amount))
+
+def scan(image, rng, args, skew, rotation):
+    if rng.random() < args.stamps:
+        image = add_stamp(image, rng)
+    if skew:
+        image = image.rotate(skew, resample=Image.BILINEAR, fillcolor=255)
+    if rotation:
+        image = image.rotate(rotation, expand=True)
+    return add_noise(image, rng, args.noise * rng.uniform(0.5, 1.5))
+
+def write_digital(path, pages):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    pdf = canvas.Canvas(path, pagesize=letter)
+    width, height = letter
+    for lines in pages:
+        for x, y, text, size, bold in lines:
+            face, points = ("Helvetica-Bold" if bold else "Helvetica"), size * 0.48
+            left = x * width - (pdf.stringWidth(text, face, points) / 2 if x == 0.5 else 0)
+            pdf.setFont(face, points)
+            pdf.drawString(left, height - y * height - points, text)
+        pdf.showPage()
+    pdf.save()
+
+def make_document(job):
+    index, doc_type, seed, args = job
+    rng = random.Random(seed)
+    label, form = FORMS[doc_type]
+    lines, truth = form(rng)
+    pages = [lines] + [attachment_page(rng) for _ in range(rng.randint(1, 3) if rng.random() < args.bundles else 0)]
+    name = f"{index:06d}_{doc_type}.pdf"
+    path = os.path.join(args.out, name)
+    scanned = rng.random() >= args.digital
+    skew = round(rng.uniform(-args.skew, args.skew), 2) if scanned else 0
+    rotation = rng.choice((90, 180, 270)) if scanned and rng.random() < args.rotate else 0
+    if scanned:
+        images = []
+        for i, page in enumerate(pages):
+            image = draw_page(page, args.dpi)
+            # Only the form page gets the sampled skew and rotation; attachments just get noise
+            images.append(scan(image, rng, args, skew if i == 0 else 0, rotation if i == 0 else 0))
+        images[0].save(path, "PDF", resolution=args.dpi, save_all=True, append_images=images[1:], quality=75)
+    else:
+        write_digital(path, pages)
+    return {"file": name, "type": label, "number": truth["number"], "date": truth.get("date", ""),
+            "payee": truth.get("payee", ""), "particulars": truth.get("particulars", ""),
+            "amount": truth["amount"], "pages": len(pages), "scanned": int(scanned),
+            "rotation": rotation, "skew": skew}
+
+
+def generate(args):
+    os.makedirs(args.out, exist_ok=True)
+    types = [t.strip() for t in args.types.split(",") if t.strip()]
+    rng = random.Random(args.seed)
+    jobs = [(i, rng.choice(types), rng.randrange(2 ** 32), args) for i in range(args.count)]
+    truth_path = os.path.join(args.out, TRUTH_FILE)
+    with Pool(args.jobs or os.cpu_count()) as pool, open(truth_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=TRUTH_COLUMNS)
+        writer.writeheader()
+        for done, row in enumerate(pool.imap(make_document, jobs, chunksize=16), start=1):
+            writer.writerow(row)
+            if done % 500 == 0 or done == args.count:
+                print(f"{done}/{args.count} documents", file=sys.stderr)
+    return truth_path
+
+def score(out, report_path):
+    """
+    Print how many files a report got right, per type. The report is the
+    CSV of `python -m erc batch rename --dry-run` (its "Number" column) or of
+    an extraction ("Serial No.", "Date", "Payee", "Total Amount"). Renamed
+    files are matched back to the truth by their original name.
+    """
+    with open(os.path.join(out, TRUTH_FILE), newline="", encoding="utf-8") as f:
+        truth = {row["file"]: row for row in csv.DictReader(f)}
+    with open(report_path, newline="", encoding="utf-8") as f:
+        report = list(csv.DictReader(f))
+    fields = {"Number": "number", "Serial No.": "number", "Date": "date", "Payee": "payee", "Total Amount": "amount"}
+    fields = {column: key for column, key in fields.items() if report and column in report[0]}
+    totals = {}
+    for row in report:
+        expected = truth.get(row.get("File Name"))
+        if not expected:
+            continue
+        counts = totals.setdefault(expected["type"], {"files": 0, **{key: 0 for key in fields.values()}})
+        counts["files"] += 1
+        for column, key in fields.items():
+            # Extraction takes the serial from the file name, which is only right after a rename
+            if (row.get(column) or "").strip() == expected[key]:
+                counts[key] += 1
+    for doc_type, counts in sorted(totals.items()):
+        files = counts.pop("files")
+        rates = ", ".join(f"{key} {hits / files:.1%}" for key, hits in counts.items())
+        print(f"{doc_type}: {files} files, {rates}")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out", help="output folder")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--types", default="obr,nca,saro")
+    parser.add_argument("--dpi", type=int, default=150, help="scan resolution")
+    parser.add_argument("--noise", type=float, default=0.3, help="scan noise, 0 (clean) to 1 (poor copy)")
+    parser.add_argument("--skew", type=float, default=1.5, help="largest skew in degrees")
+    parser.add_argument("--rotate", type=float, default=0.02, help="share of pages scanned sideways or upside down")
+    parser.add_argument("--stamps", type=float, default=0.3, help="share of pages with a rubber stamp")
+    parser.add_argument("--bundles", type=float, default=0.1, help="share of files with attachment pages")
+    parser.add_argument("--digital", type=float, default=0.1, help="share of born-digital files with a text layer")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--score", metavar="REPORT", help="score a rename/extraction CSV against truth.csv")
+    args = parser.parse_args()
+    if args.score:
+        score(args.out, args.score)
+        return 0
+    unknown = {t.strip() for t in args.types.split(",")} - set(FORMS)
+    if unknown:
+        parser.error(f"unknown type(s): {', '.join(sorted(unknown))}")
+    print(generate(args), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Throughput benchmarks for the PDF and OCR pipelines.
+
+Each benchmark runs at every corpus size in its own child process, on
+copies of the corpus PDFs in a temp folder. Every copy gets a distinct
+trailing comment, so the copies hash differently and the OCR cache never
+serves one copy's results to another. Each run reports files/s, p50/p95
+per-file latency and peak RSS. For the pool benchmarks (rename, extract),
+latency is the gap between consecutive results. The OCR cache, DPI stats,
+form templates and job journals go to the temp folder, not the app's own
+files: the child and its pool processes get it as ERC_STATE_DIR.
+
+    python benchmarks/run_benchmarks.py [--corpus DIR] [--sizes 10,100,1000] [--bench parse,render,...]
+        [--output results.json] [--baseline baseline.json] [--tolerance 0.1]
+
+Without --corpus, a small synthetic corpus is generated (make_corpus.py)
+with a fixed seed, so runs on different machines use the same documents.
+
+With --baseline, a run whose files/s drops more than --tolerance below
+the baseline's is reported as a regression, and the exit code is 1.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from itertools import cycle, islice
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BENCHES = ("render", "ocr", "parse", "rename", "extract", "split", "merge", "table")
+DEFAULT_SIZES = "10,100"
+GENERATED_DOCS = 60
+
+
+def make_corpus(corpus, size, folder):
+    # size copies of the corpus PDFs, each with distinct bytes
+    sources = sorted(os.path.join(corpus, f) for f in os.listdir(corpus) if f.lower().endswith(".pdf"))
+    if not sources:
+        raise SystemExit(f"No PDFs in {corpus}")
+    os.makedirs(folder)
+    files = []
+    for i, source in enumerate(islice(cycle(sources), size)):
+        name = f"{i:06d}_{os.path.basename(source)}"
+        shutil.copyfile(source, os.path.join(folder, name))
+        with open(os.path.join(folder, name), "ab") as f:
+            f.write(f"\n% bench copy {i}\n".encode("ascii"))
+        files.append(name)
+    return files
+
+def peak_rss_mb():
+    # (this process, largest child process) peak resident set in MB, or None where unknown
+    try:
+        import resource
+        scale = 1024 * 1024 if platform.system() == "Darwin" else 1024
+        return (round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+                round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1))
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1), None
+    except Exception:
+        return None, None
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+def timed(items, func):
+    # Per-item latencies of func over items
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def result_gaps(results, consume):
+    # Latency for pool benchmarks: the gap between consecutive results
+    latencies, last = [], time.perf_counter()
+    for result in results:
+        consume(result)
+        now = time.perf_counter()
+        latencies.append(now - last)
+        last = now
+    return latencies
+
+def page_texts(paths, poppler_path):
+    # Text of each file's first page: the text layer, else OCR (not timed)
+    from core.ocr_engine import image_to_text
+    from core.pdf_render import render_page
+    from core.text_layer import get_text_layer
+    texts = []
+    for path in paths:
+        text = get_text_layer(path, poppler_path=poppler_path)
+        if text is None:
+            text = image_to_text(render_page(path, poppler_path=poppler_path), "--psm 6")
+        texts.append(text)
+    return texts
+
+
+def bench_render(folder, files, poppler_path):
+    from core.pdf_render import render_page
+    return timed([os.path.join(folder, f) for f in files], lambda path: render_page(path, poppler_path=poppler_path))
+
+def bench_ocr(folder, files, poppler_path):
+    from core.ocr_cache import DEFAULT_DPI
+    from core.ocr_engine import get_engine
+    from core.pdf_render import render_page
+    engine = get_engine()
+    images = [render_page(os.path.join(folder, f), dpi=DEFAULT_DPI, poppler_path=poppler_path) for f in files]
+    return timed(images, lambda image: engine.words(image, "--psm 6"))
+
+def bench_parse(folder, files, poppler_path):
+    from core.obr_parser import parse_obr_text
+    texts = page_texts([os.path.join(folder, f) for f in files], poppler_path)
+    return timed(texts, parse_obr_text)
+
+def bench_rename(folder, files, poppler_path):
+    from core.doc_classifier import AUTO
+    from core.rename_engine import RenameEngine, rename_pdf
+    def consume(result):
+        if result["value"]:
+            rename_pdf(folder, result["file"], result["path"], result["value"])
+    return result_gaps(RenameEngine(AUTO, folder, files, poppler_path).results(), consume)
+
+def bench_extract(folder, files, poppler_path):
+    from core.obr_extraction import ExtractEngine
+    return result_gaps(ExtractEngine(folder, files, poppler_path).results(), lambda result: None)
+
+def bench_split(folder, files, poppler_path):
+    from core.pdf_ops import split_pages
+    out = os.path.join(folder, "split")
+    return timed(files, lambda f: list(split_pages(os.path.join(folder, f), os.path.join(out, f))))
+
+def bench_merge(folder, files, poppler_path):
+    from core.pdf_ops import merge_files
+    # One merge of every file; the latency figures are that merge's time per file
+    start = time.perf_counter()
+    merge_files([os.path.join(folder, f) for f in files], os.path.join(folder, "merged.out"))
+    return [(time.perf_counter() - start) / len(files)] * len(files)
+
+def bench_table(folder, files, poppler_path):
+    if platform.system() == "Linux" and not os.environ.get("DISPLAY"):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from core.obr_extraction import obr_row
+    app = QApplication.instance() or QApplication([])
+    from obr_extractor import PDFExtractor
+    texts = page_texts([os.path.join(folder, f) for f in files], poppler_path)
+    rows = [obr_row(f, text) for f, text in zip(files, texts)]
+    window = PDFExtractor()
+    latencies = timed(rows, window.add_row)
+    start = time.perf_counter()
+    app.processEvents()
+    latencies[-1] += time.perf_counter() - start
+    return latencies
+
+
+def run_child(bench, size, corpus):
+    # Runs in the child process main() starts, with ERC_STATE_DIR set to its temp folder
+    import pytesseract
+    from core.ocr_config import get_poppler_path, get_state_dir, get_tesseract_path
+    corpus = os.path.abspath(corpus)
+    workdir = get_state_dir()
+    cwd = os.getcwd()
+    try:
+        # Anything the app writes relative to the working directory (theme, activity log) lands here too
+        os.chdir(workdir)
+        tesseract_path = get_tesseract_path()
+        if tesseract_path:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        folder = os.path.join(workdir, "corpus")
+        files = make_corpus(corpus, size, folder)
+        result = {"bench": bench, "size": size}
+        try:
+            latencies = globals()[f"bench_{bench}"](folder, files, get_poppler_path())
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            return result
+        # Setup such as rendering the OCR benchmark's images is not in the latencies
+        seconds = sum(latencies)
+        rss, children_rss = peak_rss_mb()
+        result.update({
+            "files": len(latencies),
+            "seconds": round(seconds, 4),
+            "files_per_sec": round(len(latencies) / seconds, 2) if seconds else None,
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 3) if latencies else None,
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+            "peak_rss_mb": rss,
+            "children_peak_rss_mb": children_rss,
+        })
+        return result
+    finally:
+        os.chdir(cwd)
+
+
+def compare(results, baseline, tolerance):
+    # Regressions against a baseline run, as printable lines
+    old = {(r["bench"], r["size"]): r for r in baseline.get("results", []) if r.get("files_per_sec")}
+    regressions = []
+    for result in results:
+        before = old.get((result["bench"], result["size"]))
+        if not before or not result.get("files_per_sec"):
+            continue
+        ratio = result["files_per_sec"] / before["files_per_sec"]
+        result["baseline_files_per_sec"] = before["files_per_sec"]
+        result["speedup"] = round(ratio, 3)
+        if ratio < 1 - tolerance:
+            regressions.append(f"{result['bench']} @ {result['size']}: {before['files_per_sec']} -> "
+                               f"{result['files_per_sec']} files/s ({ratio:.2f}x)")
+    return regressions
+
+def print_table(results):
+    print(f"{'bench':<9}{'size':>7}{'files/s':>11}{'p50 ms':>10}{'p95 ms':>10}{'RSS MB':>9}{'vs base':>9}", file=sys.stderr)
+    for r in results:
+        if "error" in r:
+            print(f"{r['bench']:<9}{r['size']:>7}  skipped: {r['error']}", file=sys.stderr)
+            continue
+        speedup = f"{r['speedup']:.2f}x" if "speedup" in r else ""
+        print(f"{r['bench']:<9}{r['size']:>7}{r['files_per_sec']:>11}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+              f"{r['peak_rss_mb'] or '':>9}{speedup:>9}", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="folder of sample PDFs, cycled up to each size (default: generated)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES)
+    parser.add_argument("--bench", default=",".join(BENCHES))
+    parser.add_argument("--output", help="write the results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--child", nargs=2, metavar=("BENCH", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child[0], int(args.child[1]), args.corpus)))
+        return 0
+
+    benches = [b.strip() for b in args.bench.split(",") if b.strip()]
+    unknown = set(benches) - set(BENCHES)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    generated = None
+    if not args.corpus:
+        generated = tempfile.mkdtemp(prefix="erc_corpus_")
+        args.corpus = generated
+        subprocess.run([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "make_corpus.py"),
+                        generated, "--count", str(GENERATED_DOCS)], check=True)
+    results = []
+    for bench in benches:
+        for size in [int(s) for s in args.sizes.split(",")]:
+            # A fresh process per run, so peak RSS belongs to that run alone. Its
+            # pool processes read ERC_STATE_DIR at import too, however they start
+            workdir = tempfile.mkdtemp(prefix="erc_bench_")
+            try:
+                proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--corpus", args.corpus,
+                                       "--child", bench, str(size)], stdout=subprocess.PIPE, text=True,
+                                      env=dict(os.environ, ERC_STATE_DIR=workdir))
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            lines = proc.stdout.strip().splitlines()
+            try:
+                results.append(json.loads(lines[-1]))
+            except (IndexError, ValueError):
+                results.append({"bench": bench, "size": size, "error": f"exit code {proc.returncode}"})
+    if generated:
+        shutil.rmtree(generated, ignore_errors=True)
+
+    from core.ocr_config import get_worker_count
+    report = {
+        "meta": {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                 "platform": platform.platform(), "cpu_count": os.cpu_count(), "workers": get_worker_count(),
+                 "corpus": "generated" if generated else os.path.abspath(args.corpus)},
+        "results": results,
+    }
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+    print_table(results)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
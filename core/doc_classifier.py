@@ -0,0 +1,58 @@
+import re
+from core.dpi_ladder import DPI_LADDER
+from core.ocr_cache import cached_ocr, file_hash
+from core.pdf_render import render_page
+from core.stage_timer import timed
+from core.text_layer import get_text_layer
+
+AUTO = "Auto"
+DOC_TYPES = ("OBR", "NCA", "SARO")
+# Scans are classified from the bottom rung in the NCA parser's block mode, so
+# the classification OCR is the same cache entry an NCA's first rung reads
+CLASSIFY_DPI = DPI_LADDER[0]
+CLASSIFY_CONFIG = "--psm 6"
+
+# (pattern, weight) per type, matched against the uppercased page text.
+# Form titles settle it on their own; the rest only tip a close call.
+KEYWORDS = {
+    "OBR": [
+        (re.compile(r"OBLIGATION\s+REQUEST"), 3),
+        (re.compile(r"\bTO\s+OBLIGATE\b"), 2),
+        (re.compile(r"CA-MOOE|\bPAYEE\b|\bORS\b|\bOBR\b"), 1),
+    ],
+    "NCA": [
+        (re.compile(r"NOTICE\s+OF\s+CASH\s+ALLOCATION"), 3),
+        (re.compile(r"NCA-[A-Z]{2,5}-"), 2),
+        (re.compile(r"CASH\s+ALLOCATION|\bNCA\b"), 1),
+    ],
+    "SARO": [
+        (re.compile(r"SPECIAL\s+ALLOTMENT\s+RELEASE\s+ORDER"), 3),
+        (re.compile(r"SARO[-\s]?[A-Z]{3}[-\s]"), 2),
+        (re.compile(r"ALLOTMENT\s+RELEASE|\bSARO\b"), 1),
+    ],
+}
+
+
+def classify_text(text):
+    # Best scoring document type for a page's text, or None when nothing matches or it's a tie
+    text = (text or "").upper()
+    scores = {doc_type: sum(weight for pattern, weight in patterns if pattern.search(text))
+              for doc_type, patterns in KEYWORDS.items()}
+    best = max(scores.values())
+    if not best or list(scores.values()).count(best) > 1:
+        return None
+    return next(doc_type for doc_type, score in scores.items() if score == best)
+
+def classify_pdf(pdf_path, poppler_path=None, text_layer=None, pdf_hash=None):
+    """
+    Document type of a PDF from its first page: the embedded text when there
+    is any, otherwise a cached low-DPI OCR of the page. text_layer "" means
+    the PDF is known to have no usable text.
+    """
+    text = get_text_layer(pdf_path, poppler_path=poppler_path) if text_layer is None else text_layer or None
+    if text is None:
+        render = lambda: render_page(pdf_path, dpi=CLASSIFY_DPI, poppler_path=poppler_path)
+        text = cached_ocr(pdf_path, render, dpi=CLASSIFY_DPI, config=CLASSIFY_CONFIG,
+                          pdf_hash=pdf_hash or file_hash(pdf_path))["text"]
+    with timed("parse"):
+        return classify_text(text)
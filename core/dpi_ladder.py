@@ -0,0 +1,83 @@
+import os
+import json
+from core.ocr_cache import DEFAULT_DPI
+from core.ocr_config import get_state_dir
+
+STATS_FILE = os.path.join(get_state_dir(), "dpi_stats.json")
+DPI_LADDER = (100, 150, 200, 300)
+MIN_CONFIDENCE = 60     # mean tesseract word confidence a rung must reach
+MIN_SAMPLES = 20        # successes needed before the start rung moves up
+START_COVERAGE = 0.8    # start at the lowest rung that covers this share of past successes
+EXPLORE_EVERY = 20      # every Nth file still starts at the bottom, so the ladder can move back down
+
+
+def mean_confidence(words):
+    confs = [float(c) for c in (words or {}).get("conf", []) if float(c) >= 0]
+    return sum(confs) / len(confs) if confs else 0.0
+
+
+class DpiLadder:
+    """
+    Remembers which DPI rung succeeded per document type and starts later
+    batches at the rung that usually works, instead of always at the bottom.
+    """
+
+    def __init__(self, path=STATS_FILE):
+        self.path = path
+        self.stats = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.stats = json.load(f)
+            except Exception as e:
+                print(f"Error loading DPI stats: {e}")
+
+    def rungs(self, doc_type, explore=False):
+        counts = self.stats.get(doc_type, {})
+        total = sum(counts.values())
+        if explore or total < MIN_SAMPLES:
+            return DPI_LADDER
+        covered = 0
+        for i, dpi in enumerate(DPI_LADDER):
+            covered += counts.get(str(dpi), 0)
+            if covered / total >= START_COVERAGE:
+                return DPI_LADDER[i:]
+        return DPI_LADDER
+
+    def record(self, doc_type, dpi):
+        if dpi:
+            counts = self.stats.setdefault(doc_type, {})
+            counts[str(dpi)] = counts.get(str(dpi), 0) + 1
+
+    def save(self):
+        try:
+            with open(self.path, "w") as f:
+                json.dump(self.stats, f)
+        except Exception as e:
+            print(f"Error saving DPI stats: {e}")
+
+
+def climb(rungs, ocr_at, parse):
+    """
+    OCR at each rung in turn until parse() finds something with reasonable
+    confidence. ocr_at(dpi) returns a cached_ocr result.
+    Returns (value, text, dpi); dpi is None when no rung found anything.
+    If a value was only ever found with low confidence, the first one is returned.
+    A rung at or above DEFAULT_DPI that reads the page confidently but finds
+    nothing ends the climb: the field isn't there, and more pixels won't put
+    it there. Below DEFAULT_DPI the climb goes on, as a field can be legible
+    at the baseline DPI and not at the low rungs.
+    """
+    fallback, text = None, ""
+    for dpi in rungs:
+        ocr = ocr_at(dpi)
+        text = ocr["text"]
+        value = parse(text)
+        confident = mean_confidence(ocr["words"]) >= MIN_CONFIDENCE
+        if value and confident:
+            return value, text, dpi
+        if value and not fallback:
+            fallback = (value, text, dpi)
+        if not value and confident and dpi >= DEFAULT_DPI:
+            break
+    return fallback or (None, text, None)
@@ -1,6 +1,6 @@
 import os
-import pdf2image
-import pytesseract
+from core.ocr_engine import image_to_text
+from core.pdf_render import render_pages
 from .pdf_utils import sanitize_filename, show_error
 from PyQt5.QtWidgets import QMessageBox
 
@@ -21,21 +21,23 @@ def extract_and_rename_pdfs(folder_path, output_widget, progress_bar=None):
 
     for count, filename in enumerate(pdf_files, start=1):
         pdf_path = os.path.join(folder_path, filename)
+        serial_number = None
+        # Only one page is loaded at a time; the rest wait on disk
+        pages = render_pages(pdf_path)
         try:
-            images = pdf2image.convert_from_path(pdf_path)
+            for image in pages:
+                text = image_to_text(image, config='--psm 6')
+                for line in text.split('\n'):
+                    if 'Serial No.' in line:
+                        serial_number = sanitize_filename(line.split('Serial No.')[-1].strip())
+                        break
+                if serial_number:
+                    break
         except Exception as e:
             output_widget.append(f"Failed to convert {filename}: {e}")
             continue
-
-        serial_number = None
-        for image in images:
-            text = pytesseract.image_to_string(image, lang='eng', config='--psm 6')
-            for line in text.split('\n'):
-                if 'Serial No.' in line:
-                    serial_number = sanitize_filename(line.split('Serial No.')[-1].strip())
-                    break
-            if serial_number:
-                break
+        finally:
+            pages.close()
 
         if serial_number:
             new_filename = f"{serial_number}.pdf"
@@ -0,0 +1,152 @@
+import os
+import time
+import threading
+from core.ocr_config import get_watch_settle_seconds
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+POLL_INTERVAL = 2.0  # seconds between folder scans when there are no file system events
+MAX_WAIT = 60.0      # a file that stops growing but never gets its %%EOF is handed over after this
+TAIL_BYTES = 1024
+
+
+def is_complete_pdf(path):
+    # A PDF that is still being written has no %%EOF marker at its end yet
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - TAIL_BYTES))
+            return b"%%EOF" in f.read()
+    except OSError:
+        # Scanners on Windows keep the file locked while writing
+        return False
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if not event.is_directory:
+            self.watcher._touch(getattr(event, "dest_path", None) or event.src_path)
+
+
+class FolderWatcher:
+    """
+    Yields the PDFs that arrive in a folder, in batches, once each has been
+    fully written: its size and modification time have held still for
+    settle seconds and it ends in %%EOF. Uses watchdog (inotify on Linux,
+    ReadDirectoryChangesW on Windows) when it is installed and the folder
+    supports it, otherwise scans the folder every POLL_INTERVAL seconds.
+    Files already there when the watcher starts are skipped unless
+    include_existing is set. seen replaces that snapshot with a listing the
+    caller already took, e.g. of a batch it runs itself, so a file that
+    arrives in between is neither missed nor handled twice.
+    """
+
+    def __init__(self, folder, settle=None, include_existing=False, seen=None):
+        self.folder = folder
+        self.settle = get_watch_settle_seconds() if settle is None else settle
+        if seen is not None:
+            self._seen = set(seen)
+        else:
+            self._seen = set() if include_existing else set(self._listing())
+        self._pending = {}  # name: (size, mtime, stable since, first seen)
+        self._events = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._observer = None
+
+    def _listing(self):
+        try:
+            return [entry.name for entry in os.scandir(self.folder)
+                    if entry.is_file() and entry.name.lower().endswith(".pdf")]
+        except OSError as e:
+            print(f"Cannot read watched folder {self.folder}: {e}")
+            return []
+
+    def _touch(self, path):
+        name = os.path.basename(path)
+        if name.lower().endswith(".pdf") and os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.folder):
+            with self._lock:
+                self._events.add(name)
+            self._wake.set()
+
+    def _start_observer(self):
+        if Observer is None:
+            return
+        try:
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), self.folder, recursive=False)
+            self._observer.start()
+        except Exception as e:
+            print(f"File system events unavailable for {self.folder}, polling instead: {e}")
+            self._observer = None
+
+    def _arrivals(self):
+        if self._observer:
+            with self._lock:
+                names, self._events = self._events, set()
+            return names
+        return set(self._listing())
+
+    def ignore(self, name):
+        # For files the pipeline itself writes into the folder, like renamed PDFs
+        with self._lock:
+            self._seen.add(name)
+            self._pending.pop(name, None)
+
+    def _ready(self, now):
+        ready = []
+        for name, (size, mtime, since, first) in list(self._pending.items()):
+            try:
+                stat = os.stat(os.path.join(self.folder, name))
+            except OSError:
+                # Moved away or renamed before it settled
+                del self._pending[name]
+                continue
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                self._pending[name] = (stat.st_size, stat.st_mtime, now, first)
+            elif stat.st_size and now - since >= self.settle:
+                if is_complete_pdf(os.path.join(self.folder, name)) or now - first >= MAX_WAIT:
+                    ready.append(name)
+        return ready
+
+    def batches(self):
+        """Lists of ready file names, sorted; blocks between arrivals and ends after stop()."""
+        self._start_observer()
+        try:
+            while not self._stopped:
+                now = time.monotonic()
+                arrivals = self._arrivals()
+                with self._lock:
+                    for name in arrivals - self._seen:
+                        if name not in self._pending:
+                            self._pending[name] = (None, None, now, now)
+                    ready = self._ready(now)
+                    for name in ready:
+                        del self._pending[name]
+                        self._seen.add(name)
+                if ready:
+                    yield sorted(ready)
+                    continue
+                # Events wake the loop early; pending files are rechecked until they settle
+                timeout = min(POLL_INTERVAL, self.settle / 2) if self._pending else POLL_INTERVAL
+                self._wake.wait(max(0.1, timeout))
+                self._wake.clear()
+        finally:
+            if self._observer:
+                self._observer.stop()
+                self._observer.join(timeout=5)
+
+    def stop(self):
+        # Safe to call from any thread; batches() returns at its next check
+        self._stopped = True
+        self._wake.set()
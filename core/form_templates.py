@@ -0,0 +1,310 @@
+import os
+import re
+import json
+from datetime import datetime
+from core.dpi_ladder import MIN_CONFIDENCE, mean_confidence
+from core.id_extractors import extract_obr_number, find_saro_number, match_nca_number, parse_nca_number
+from core.obr_parser import PARTICULARS_CUT_RE, PARTICULARS_START_RE, parse_obr_text
+from core.ocr_cache import DEFAULT_DPI, cached_ocr
+from core.ocr_config import get_state_dir
+from core.pdf_render import crop_region, get_page_size, render_page
+
+TEMPLATES_FILE = os.path.join(get_state_dir(), "form_templates.json")
+MIN_SAMPLES = 3          # pages a form type must be learned from before its template is used
+MIN_FIELD_SAMPLES = 2    # ...and how many of them must have located the field
+MAX_FIELD_SAMPLES = 15   # a field's box comes from its latest this many sample boxes
+PAD_X, PAD_Y = 0.01, 0.005
+EDGE_PX = 2              # a word this close to a box edge was likely cut off by it
+MAX_FIELD_AREA = {"particulars": 0.4}  # share of the page; anything bigger is a bad match
+DEFAULT_MAX_AREA = 0.1
+
+# Tesseract config per field: one text line for short fields, digits only for amounts
+LINE = "--psm 7"
+BLOCK = "--psm 6"
+FIELD_CONFIGS = {
+    "OBR": {
+        "serial": LINE,
+        "date": LINE,
+        "payee": LINE,
+        "particulars": BLOCK,
+        "amount": "--psm 7 -c tessedit_char_whitelist=0123456789,.",
+    },
+    "NCA": {"nca_number": LINE},
+    "SARO": {"saro_number": LINE},
+}
+# The field that names the file in each rename mode
+ID_FIELDS = {"OBR": "serial", "NCA": "nca_number", "SARO": "saro_number"}
+
+DATE_VALUE_RE = re.compile(r"[A-Za-z]+\s+\d{1,2},\s+\d{4}")
+PAYEE_LABEL_RE = re.compile(r"^\s*Payee\s*[:\-]?\s*", re.IGNORECASE)
+# The tail of a label just left of a box, e.g. the "e:" of "Payee:"
+LABEL_TAIL_RE = re.compile(r"^\s*(?:[^\s:]{0,3}:|[^\w\s]+)\s*")
+# The whole box must be one amount, grouped properly or not at all
+AMOUNT_VALUE_RE = re.compile(r"\d{1,3}(?:,\d{3})*\.\d{2}|\d+\.\d{2}")
+
+_templates = None
+
+
+def parse_date(text):
+    # "March 5, 2024" (or "Mar 5, 2024") as written, if it is a real date
+    for fmt in ("%B %d, %Y", "%b %d, %Y"):
+        try:
+            datetime.strptime(re.sub(r"\s+", " ", text), fmt)
+            return text
+        except ValueError:
+            continue
+    return None
+
+def parse_field(field, text):
+    """
+    Value of one field from the OCR text of its box alone, or None when the
+    text doesn't hold a valid one: a real date, a payee that is mostly
+    letters, an amount that is the whole box, particulars that start where
+    the full-page parser starts them.
+    """
+    text = text.strip()
+    if not text:
+        return None
+    if field == "serial":
+        return extract_obr_number(text)
+    if field == "date":
+        match = DATE_VALUE_RE.search(text)
+        return parse_date(match.group(0)) if match else None
+    if field == "payee":
+        lines = [LABEL_TAIL_RE.sub("", PAYEE_LABEL_RE.sub("", line)).strip() for line in text.splitlines()]
+        payee = next((line for line in lines if line), "")
+        letters = sum(c.isalpha() for c in payee)
+        return payee if letters >= 3 and letters >= 0.6 * len(payee.replace(" ", "")) else None
+    if field == "particulars":
+        joined = " ".join(line.strip() for line in text.splitlines() if line.strip())
+        match = PARTICULARS_START_RE.search(joined)
+        if not match:
+            return None
+        return PARTICULARS_CUT_RE.split(match.group(0), 1)[0].strip() or None
+    if field == "amount":
+        match = AMOUNT_VALUE_RE.fullmatch(text.replace(" ", ""))
+        return f"{float(match.group(0).replace(',', '')):,.2f}" if match else None
+    if field == "nca_number":
+        return match_nca_number(text)
+    if field == "saro_number":
+        return find_saro_number(text)
+    return None
+
+def page_values(form_type, text):
+    # Field values read from a full page the usual way, to look up in its word boxes
+    if form_type == "OBR":
+        date, payee, particulars, total = parse_obr_text(text)
+        return {"serial": extract_obr_number(text), "date": date, "payee": payee,
+                "particulars": particulars, "amount": total}
+    if form_type == "NCA":
+        return {"nca_number": parse_nca_number(text)}
+    return {"saro_number": find_saro_number(text)}
+
+def normalize(text):
+    return re.sub(r"[^0-9a-z]", "", text.lower())
+
+def locate(words, value, max_words=80):
+    """
+    Pixel box (x1, y1, x2, y2) around the shortest run of consecutive words
+    whose text contains value, ignoring case, spaces and punctuation.
+    """
+    target = normalize(value or "")
+    if not target:
+        return None
+    texts = [normalize(text) for text in words["text"]]
+    for start in range(len(texts)):
+        joined = ""
+        for end in range(start, min(start + max_words, len(texts))):
+            joined += texts[end]
+            if target in joined:
+                # Drop leading words the match doesn't need
+                while start < end and target in "".join(texts[start + 1:end + 1]):
+                    start += 1
+                x1 = min(words["left"][i] for i in range(start, end + 1))
+                y1 = min(words["top"][i] for i in range(start, end + 1))
+                x2 = max(words["left"][i] + words["width"][i] for i in range(start, end + 1))
+                y2 = max(words["top"][i] + words["height"][i] for i in range(start, end + 1))
+                return x1, y1, x2, y2
+            if len(joined) > len(target) * 3 + 20:
+                break
+    return None
+
+def make_sample(form_type, words, text, size):
+    """
+    Field boxes, as page fractions, found on one page whose full-page OCR
+    words and text are known. size is the rendered page size in pixels.
+    Small enough to pickle back from a pool process.
+    """
+    width, height = size
+    boxes = {}
+    for field, value in page_values(form_type, text).items():
+        box = locate(words, value) if value else None
+        if not box:
+            continue
+        x1, y1, x2, y2 = box
+        fraction = (x1 / width, y1 / height, x2 / width, y2 / height)
+        if (fraction[2] - fraction[0]) * (fraction[3] - fraction[1]) <= MAX_FIELD_AREA.get(field, DEFAULT_MAX_AREA):
+            boxes[field] = fraction
+    return {"boxes": boxes} if boxes else None
+
+def sample_from_ocr(form_type, pdf_path, ocr, dpi):
+    # make_sample for a page OCR'd in full at dpi
+    if not ocr or not ocr.get("words"):
+        return None
+    page_width, page_height = get_page_size(pdf_path)
+    return make_sample(form_type, ocr["words"], ocr["text"], (page_width * dpi / 72.0, page_height * dpi / 72.0))
+
+
+def robust_box(boxes):
+    """
+    One box for a field from its sample boxes: the median left and top edge,
+    and the right and bottom edge three quarters of the way up, so a longer
+    than usual value still fits while a single stray sample moves nothing.
+    """
+    box = []
+    for i in range(4):
+        values = sorted(b[i] for b in boxes)
+        box.append(values[len(values) // 2] if i < 2 else values[int(0.75 * (len(values) - 1))])
+    return box
+
+def steady(boxes):
+    # Does the field stay put from page to page, i.e. its tops vary less than its height?
+    tops = sorted(b[1] for b in boxes)
+    heights = sorted(b[3] - b[1] for b in boxes)
+    return tops[int(0.75 * (len(tops) - 1))] - tops[int(0.25 * (len(tops) - 1))] <= heights[len(heights) // 2]
+
+
+class FormTemplates:
+    """
+    Learned field boxes per form type, kept in form_templates.json. Each
+    field keeps its latest sample boxes and uses robust_box of them, so a
+    template corrects itself as samples keep coming in, e.g. from pages the
+    template misread and the full-page path then read.
+    """
+
+    def __init__(self, path=TEMPLATES_FILE):
+        self.path = path
+        self.templates = {}
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.templates = json.load(f)
+            except Exception as e:
+                print(f"Error loading form templates: {e}")
+
+    def samples_needed(self, form_type):
+        return max(0, MIN_SAMPLES - self.templates.get(form_type, {}).get("samples", 0))
+
+    def get(self, form_type):
+        """
+        {field: (left, top, right, bottom)} with padding, or None while still
+        learning. Fields that move from page to page (steady) are left out.
+        """
+        template = self.templates.get(form_type)
+        if not template or template.get("samples", 0) < MIN_SAMPLES:
+            return None
+        boxes = {}
+        for field, entry in template["fields"].items():
+            if entry["count"] >= MIN_FIELD_SAMPLES and steady(entry.get("boxes") or [entry["box"]]):
+                left, top, right, bottom = entry["box"]
+                boxes[field] = (max(0.0, left - PAD_X), max(0.0, top - PAD_Y),
+                                min(1.0, right + PAD_X), min(1.0, bottom + PAD_Y))
+        return boxes or None
+
+    def covers(self, form_type, fields):
+        # Is there a box for every one of fields, i.e. will read_fields try the template?
+        boxes = self.get(form_type)
+        return bool(boxes) and all(field in boxes for field in fields)
+
+    def add_sample(self, form_type, sample):
+        template = self.templates.setdefault(form_type, {"samples": 0, "fields": {}})
+        template["samples"] += 1
+        self.dirty = True
+        for field, box in sample["boxes"].items():
+            # Files written before the sample boxes were kept only have the box itself
+            entry = template["fields"].setdefault(field, {"box": list(box), "count": 0, "boxes": []})
+            entry.setdefault("boxes", [entry["box"]] if entry["count"] else [])
+            entry["boxes"] = (entry["boxes"] + [list(box)])[-MAX_FIELD_SAMPLES:]
+            entry["box"] = robust_box(entry["boxes"])
+            entry["count"] += 1
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            with open(self.path, "w") as f:
+                json.dump(self.templates, f, indent=2)
+            self.dirty = False
+        except Exception as e:
+            print(f"Error saving form templates: {e}")
+
+
+def get_templates():
+    # Loaded once per process; pool processes see what earlier batches learned
+    global _templates
+    if _templates is None:
+        _templates = FormTemplates()
+    return _templates
+
+def clipped(words, size):
+    """
+    Does a word touch the edge of its box (size in pixels), i.e. the box cut
+    it off? Label tails ("e:" of "Payee:") and stray marks don't count.
+    """
+    width, height = size
+    for text, left, top, w, h in zip(words["text"], words["left"], words["top"], words["width"], words["height"]):
+        if text.endswith(":") or not any(c.isalnum() for c in text):
+            continue
+        if left <= EDGE_PX or top <= EDGE_PX or left + w >= width - EDGE_PX or top + h >= height - EDGE_PX:
+            return True
+    return False
+
+def read_fields(form_type, pdf_path, fields=None, poppler_path=None, rungs=(DEFAULT_DPI,), pdf_hash=None):
+    """
+    OCR only the learned boxes of a scanned page, each with its field's
+    config, and parse them. A field only gets a value when its words are
+    read with MIN_CONFIDENCE, none is cut off by the box edge and the text
+    parses as the field (parse_field). The rungs are tried in turn until
+    every field has a value; a rung that reads every box confidently but
+    still leaves one without ends the climb, as in dpi_ladder.climb.
+    Returns ({field: value or None}, dpi of the rung that read them all or
+    None), or ({}, None) when the template doesn't cover every field
+    (FormTemplates.covers), so a non-empty result means the template was
+    tried and misread the page. A single
+    field is rendered on its own; several share one page render per rung,
+    which only happens on a cache miss.
+    """
+    boxes = get_templates().get(form_type)
+    if not boxes:
+        return {}, None
+    names = [name for name in (fields or boxes) if name in FIELD_CONFIGS[form_type]]
+    if not names or not get_templates().covers(form_type, names):
+        return {}, None
+    page_width, page_height = get_page_size(pdf_path)
+
+    values = {}
+    for dpi in rungs:
+        page = []
+        def render(box):
+            if len(names) == 1:
+                return render_page(pdf_path, dpi=dpi, crop=box, poppler_path=poppler_path)
+            if not page:
+                page.append(render_page(pdf_path, dpi=dpi, poppler_path=poppler_path))
+            return crop_region(page[0], box)
+
+        values, confident = {}, True
+        for name in names:
+            box = boxes[name]
+            ocr = cached_ocr(pdf_path, lambda: render(box), dpi=dpi, config=FIELD_CONFIGS[form_type][name],
+                             region=box, pdf_hash=pdf_hash)
+            words = ocr["words"] or {"text": [], "left": [], "top": [], "width": [], "height": [], "conf": []}
+            size = ((box[2] - box[0]) * page_width * dpi / 72.0, (box[3] - box[1]) * page_height * dpi / 72.0)
+            readable = mean_confidence(words) >= MIN_CONFIDENCE
+            confident = confident and readable
+            values[name] = parse_field(name, ocr["text"]) if readable and not clipped(words, size) else None
+        if all(values.values()):
+            return values, dpi
+        if confident:
+            break
+    return values, None
@@ -0,0 +1,121 @@
+import re
+from core.ocr_engine import image_to_text
+from PIL import Image
+
+
+def match_nca_number(line):
+    # Priority: 7-digit NCA format
+    match = re.search(r"(NCA-[A-Z]{2,5}-[A-Z]-\d{2,4}-\d{7})", line)
+    if match:
+        return match.group(1).strip()
+
+    # Fallback: 6-digit variant
+    match = re.search(r"(NCA-[A-Z]{2,5}-[A-Z]-\d{2,4}-\d{6})", line)
+    if match:
+        return match.group(1).strip()
+
+    # Fallback: plain numeric code like '345247-0'
+    match = re.search(r"(\d{5,7}[-–]\d{1,3})", line)
+    if match:
+        return match.group(1).strip()
+    return None
+
+def parse_nca_number(text):
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+
+    for i, line in enumerate(lines):
+        if "2067" in line:
+            if i > 0:
+                nca_number = match_nca_number(lines[i - 1])
+                if nca_number:
+                    return nca_number
+
+    return None
+
+def nca_suggestions(text):
+    # Lines that look like they carry an NCA number, for the manual fallback
+    suggestions = []
+    for line in text.splitlines():
+        match = re.search(r"(NCA-[A-Z0-9\-]+|\d{5,7}[-–]\d{1,3})", line)
+        if match:
+            suggestions.append(match.group(1).strip())
+    return list(dict.fromkeys(suggestions))[:3]
+
+def extract_nca_number(image):
+    try:
+        text = image_to_text(image, config="--psm 6")
+        return parse_nca_number(text)
+    except Exception as e:
+        print(f"Error during OCR: {e}")
+        return None
+
+def find_saro_number(text):
+    # Regex patterns for SARO No.
+    patterns = [
+        r"(SARO[-\s]?[A-Z]{3}[-\s]?[A-Z]?[-\s]?\d{2}[-\s]?\d{7})",  # e.g. SARO-BMB-A-08-0016104
+        r"\b([A-Z]{1}-\d{2}-\d{5})\b"  # e.g. A-01-05818
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, text)
+        if match:
+            return match.group(1).replace(" ", "").strip()
+    return None
+
+def extract_saro_number_from_image(image: Image.Image) -> str:
+    # Convert image to grayscale for better OCR accuracy
+    gray = image.convert("L")
+
+    # Crop bottom-right corner (where SARO No. usually appears)
+    width, height = gray.size
+    cropped = gray.crop((int(width * 0.5), int(height * 0.75), width, height))
+
+    # Run OCR on cropped section
+    text = image_to_text(cropped)
+
+    saro_number = find_saro_number(text)
+    if not saro_number:
+        print("OCR text (no match):", text)
+    return saro_number
+
+def extract_obr_number(text):
+    try:
+        # Try to match OBR serial patterns (CA-MOOE..., MOOE..., PGF..., PS...)
+        match = re.search(r"(CA\-MOOE\S+|MOOE\S+|PGF\S+|PS\S+)", text)
+        if match:
+            return match.group(1).strip()
+        return None
+    except Exception as e:
+        print(f"Error during OBR pattern matching: {e}")
+        return None
+
+def obr_suggestions(text):
+    # Lines that look like they contain an OBR serial, for the manual fallback
+    suggestions = []
+    for line in text.splitlines():
+        if any(pattern in line.upper() for pattern in ['CA-MOOE', 'MOOE', 'PGF', 'PS']):
+            suggestions.append(line.strip())
+    return list(dict.fromkeys(suggestions))[:3]  # Unique, max 3
+
+def saro_suggestions(text):
+    suggestions = []
+    match = re.search(r"SARO\s*No\.?\s*[:\-~]?\s*([A-Z0-9\-~]+)", text, re.IGNORECASE)
+    if match:
+        suggestion = match.group(1).replace("~", "-").replace("–", "-").strip()
+        if not suggestion.upper().startswith(("SARO-", "A-")):
+            suggestion = "A-" + suggestion
+        suggestions.append(suggestion)
+
+    # Look for additional patterns in each line
+    for line in text.splitlines():
+        # Look for A-XX-XXXXX pattern
+        match = re.search(r"\b([A-Z]\-\d{2}\-\d{5})\b", line)
+        if match:
+            suggestions.append(match.group(1))
+        # Look for SARO-XXX-X-XX-XXXXXXX pattern
+        match = re.search(r"(SARO\-[A-Z]{3}\-[A-Z]\-\d{2}\-\d{7})", line)
+        if match:
+            suggestions.append(match.group(1))
+
+    # Remove duplicates and limit to top 3
+    return list(dict.fromkeys(suggestions))[:3]
@@ -0,0 +1,111 @@
+import os
+import json
+import hashlib
+from datetime import datetime
+from core.ocr_cache import file_hash
+from core.ocr_config import get_state_dir
+
+JOURNAL_DIR = os.path.join(get_state_dir(), "journals")
+# Outcomes a resumed batch doesn't repeat; errors and skips are tried again
+DONE_STATUSES = ("renamed", "row")
+
+
+def journal_path(kind, folder):
+    # One journal per kind of batch and folder
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(folder)).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(JOURNAL_DIR, f"{kind}_{key}.jsonl")
+
+def torn(path):
+    # Does the file end mid-line, e.g. after a crash during a write?
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if not f.tell():
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+    except OSError:
+        return False
+
+
+class JobJournal:
+    """
+    Append-only JSON-lines record of each file's outcome in one batch
+    (content hash, status and whatever the batch produced), so a canceled or
+    crashed batch can pick up where it stopped. Lines are flushed as they
+    are written and a torn last line is ignored. finish() removes the
+    journal once the batch is done.
+    """
+
+    def __init__(self, kind, folder):
+        self.kind = kind
+        self.folder = folder
+        self.path = journal_path(kind, folder)
+        self.entries = {}  # file: latest entry
+        self._file = None
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        self.entries[entry["file"]] = entry
+            except Exception as e:
+                print(f"Error loading job journal {self.path}: {e}")
+
+    def done(self, files):
+        """
+        The files of a folder listing the journal already covers: recorded
+        as done (DONE_STATUSES) with the same content, or written by the
+        batch under a new name.
+        """
+        by_new_name = {entry["new_name"]: entry for entry in self.entries.values() if entry.get("new_name")}
+        done = set()
+        for file in files:
+            entry = self.entries.get(file) or by_new_name.get(file)
+            if not entry or entry["status"] not in DONE_STATUSES:
+                continue
+            try:
+                if entry.get("hash") in (None, file_hash(os.path.join(self.folder, file))):
+                    done.add(file)
+            except OSError:
+                pass
+        return done
+
+    def record(self, file, status, path=None, **fields):
+        # path is hashed so a file replaced under the same name is processed again
+        entry = {"file": file, "status": status, "time": datetime.now().isoformat(timespec="seconds")}
+        try:
+            entry["hash"] = file_hash(path or os.path.join(self.folder, file))
+        except OSError:
+            pass
+        entry.update(fields)
+        self.entries[file] = entry
+        try:
+            if self._file is None:
+                os.makedirs(JOURNAL_DIR, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+                if torn(self.path):
+                    # Start after the torn line instead of gluing onto it
+                    self._file.write("\n")
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+        except Exception as e:
+            print(f"Job journal write failed: {e}")
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def finish(self):
+        # The batch is complete; nothing left to resume
+        self.close()
+        self.entries = {}
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except OSError as e:
+            print(f"Error removing job journal {self.path}: {e}")
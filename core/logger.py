@@ -1,4 +1,5 @@
 import csv
+import json
 from datetime import datetime
 
 def log_action(username, action, filenames=None):
@@ -13,3 +14,13 @@ def log_action(username, action, filenames=None):
             action,
             filenames
         ])
+
+def log_metrics(username, job, metrics):
+    # One JSON line per batch (StageStats.to_dict()), next to the activity log
+    metrics_file = f"batch_metrics_{username}.jsonl"
+    entry = {"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "user": username, "job": job, **metrics}
+    try:
+        with open(metrics_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    except Exception as e:
+        print(f"Error writing batch metrics: {e}")
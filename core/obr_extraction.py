@@ -0,0 +1,266 @@
+import os
+import math
+import time
+import multiprocessing
+import pytesseract
+from functools import partial
+from concurrent.futures import CancelledError, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from core.dpi_ladder import DPI_LADDER, EXPLORE_EVERY, DpiLadder, climb
+from core.ocr_cache import cached_ocr, file_hash, prefetch_ocr
+from core.form_templates import get_templates, read_fields, sample_from_ocr
+from core.obr_parser import parse_obr_text
+from core.ocr_config import get_ocr_batch_size, get_worker_count
+from core.pdf_render import render_page
+from core.rename_engine import init_worker, queue_wait
+from core.stage_timer import add_timings, take_timings, timed
+from core.text_layer import get_text_layer
+
+OBR_OCR_CONFIG = "--psm 6"
+LADDER_KEY = "OBR extraction"
+TEMPLATE_FIELDS = ("date", "payee", "particulars", "amount")
+CANCEL_POLL_SECONDS = 0.2  # how long results() waits on the pool before checking for a cancel
+# Runs of a chunk after worker processes died under it: as given, one file
+# per task, then one file with nothing else running, so the crash is its own
+CHUNK, SINGLE, ALONE = range(3)
+# Extractor table columns; obr_row fills all but Remarks
+OBR_COLUMNS = ("File Name", "Serial No.", "Date", "Payee", "Particulars",
+               "Total Amount", "Payment", "Tax", "Balance", "Remarks")
+
+_cancel_event = None
+
+
+def complete_fields(text):
+    # Enough to accept an OCR pass without trying a higher DPI
+    with timed("parse"):
+        fields = parse_obr_text(text)
+    return fields if fields[0] and fields[1] else None
+
+def obr_row(filename, text, fields=None):
+    # One row of the extractor table; payment and tax are filled in by hand
+    with timed("parse"):
+        date, payee, particulars, total_amount = fields or parse_obr_text(text)
+    serial = os.path.splitext(filename)[0]
+    return [filename, serial, date, payee, particulars, total_amount, "", "", total_amount]
+
+def init_extract_worker(tesseract_cmd, cancel_event):
+    init_worker(tesseract_cmd)
+    global _cancel_event
+    _cancel_event = cancel_event
+
+def canceled():
+    # In a pool worker: has the batch been canceled?
+    return _cancel_event is not None and _cancel_event.is_set()
+
+def extract_obr(folder, filename, poppler_path, rungs=DPI_LADDER, text_layer=None, pdf_hash=None, learn=False):
+    """
+    Table row for one OBR PDF. The text layer is used when there is one.
+    Scans are read from the learned OBR template's field boxes when every
+    box reads a valid value (read_fields), including a date, payee and
+    amount; otherwise the page is OCR'd up the DPI ladder until the date and
+    payee are found.
+    text_layer "" means the PDF is already known to have no usable text.
+    With learn, or when the template misread the page, a page read in full
+    also returns a template sample.
+    """
+    pdf_path = os.path.join(folder, filename)
+    result = {"file": filename, "row": None, "error": None, "dpi": None, "sample": None}
+    try:
+        text = get_text_layer(pdf_path, poppler_path=poppler_path) if text_layer is None else text_layer or None
+        if text is None:
+            pdf_hash = pdf_hash or file_hash(pdf_path)
+            values, template_dpi = read_fields("OBR", pdf_path, TEMPLATE_FIELDS, poppler_path, rungs, pdf_hash)
+            if template_dpi and values.get("date") and values.get("payee") and values.get("amount"):
+                fields = (values["date"], values["payee"], values.get("particulars") or "", values["amount"])
+                result["row"], result["dpi"] = obr_row(filename, "", fields), template_dpi
+                return result
+
+            ocr_at = lambda dpi: cached_ocr(
+                pdf_path, lambda: render_page(pdf_path, dpi=dpi, poppler_path=poppler_path),
+                dpi=dpi, config=OBR_OCR_CONFIG, pdf_hash=pdf_hash)
+            fields, text, result["dpi"] = climb(rungs, ocr_at, complete_fields)
+            result["row"] = obr_row(filename, text, fields)
+            if fields and (learn or values):
+                result["sample"] = sample_from_ocr("OBR", pdf_path, ocr_at(result["dpi"]), result["dpi"])
+        else:
+            result["row"] = obr_row(filename, text)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+def failed_row(filename, error):
+    return {"file": filename, "row": None, "error": error, "dpi": None, "sample": None}
+
+def extract_chunk(folder, files, poppler_path, rungs=DPI_LADDER, learn=0, submitted=None):
+    """
+    extract_obr over several files in one pool task, with the scans OCR'd
+    together at the first rung beforehand unless the OBR template has a
+    box for every TEMPLATE_FIELDS field (see process_chunk in rename_engine). The first learn files are asked
+    for template samples. Results carry per-stage "timings" like
+    process_chunk's.
+    Stops within a file of the batch being canceled, in the batched OCR
+    too; the files not reached are left out.
+    """
+    waited = queue_wait(submitted)
+    take_timings()
+    text_layers, hashes, jobs = {}, {}, []
+    dpi = rungs[0]
+    for filename in files:
+        pdf_path = os.path.join(folder, filename)
+        try:
+            text_layers[filename] = get_text_layer(pdf_path, poppler_path=poppler_path) or ""
+            if not text_layers[filename]:
+                hashes[filename] = file_hash(pdf_path)
+                jobs.append((hashes[filename], partial(render_page, pdf_path, dpi=dpi, poppler_path=poppler_path)))
+        except Exception:
+            # extract_obr runs into the same problem and reports it
+            text_layers.pop(filename, None)
+    if not get_templates().covers("OBR", TEMPLATE_FIELDS):
+        prefetch_ocr(jobs, dpi=dpi, config=OBR_OCR_CONFIG, stop=canceled)
+    shared = add_timings(take_timings(), waited)
+
+    results = []
+    for i, filename in enumerate(files):
+        if canceled():
+            break
+        result = extract_obr(folder, filename, poppler_path, rungs,
+                             text_layers.get(filename), hashes.get(filename), i < learn)
+        result["timings"] = add_timings(take_timings(), shared, 1 / len(files))
+        results.append(result)
+    return results
+
+
+class ExtractEngine:
+    """
+    Runs extract_obr over a folder on a process pool, one chunk of files per
+    task, so rendering, OCR and parsing of different files overlap across
+    cores. Only a couple of chunks per worker are in flight at a time.
+    results() yields in folder order when ordered, otherwise as completed.
+    With keep_pool the pool outlives results(), as in RenameEngine, for a
+    folder watch that runs batch after batch (results(files)); close()
+    shuts it down.
+    """
+
+    def __init__(self, folder, files, poppler_path, workers=None, ordered=True, keep_pool=False):
+        self.folder = folder
+        self.files = files
+        self.poppler_path = poppler_path
+        self.workers = workers or get_worker_count()
+        self.ordered = ordered
+        self.keep_pool = keep_pool
+        self.ladder = DpiLadder()
+        self.templates = get_templates()
+        self._learn = self.templates.samples_needed("OBR") * 2
+        self._executor = None
+        self._cancel = False
+        self._cancel_event = multiprocessing.Event()
+
+    def _new_pool(self, workers):
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_extract_worker,
+            initargs=(pytesseract.pytesseract.tesseract_cmd, self._cancel_event),
+        )
+
+    def chunks(self):
+        size = max(1, min(get_ocr_batch_size(), math.ceil(len(self.files) / self.workers)))
+        for start in range(0, len(self.files), size):
+            chunk = self.files[start:start + size]
+            explore = any(i % EXPLORE_EVERY == 0 for i in range(start, start + len(chunk)))
+            learn, self._learn = self._learn, max(0, self._learn - len(chunk))
+            yield start, chunk, self.ladder.rungs(LADDER_KEY, explore=explore), learn
+
+    def results(self, files=None):
+        """
+        Yields each file's result. When a worker process dies (a crash in
+        poppler or tesseract), every chunk it took down is run again one file
+        per task on a fresh pool, and a file caught in a second crash once
+        more with nothing else running. Only a file that kills its worker on
+        its own is failed, with a "worker process crashed" error.
+        files replaces the batch, e.g. with a watched folder's next arrivals.
+        """
+        if files is not None:
+            self.files = files
+            self._learn = self.templates.samples_needed("OBR") * 2
+        if self._cancel or not self.files:
+            return
+        workers = self.workers if self.keep_pool else max(1, min(self.workers, len(self.files)))
+        if self._executor is None:
+            self._executor = self._new_pool(workers)
+        pending, done_chunks, next_start = {}, {}, 0
+        retries = []  # (start, files, run) to run again after a pool broke
+        chunks = self.chunks()
+        try:
+            while True:
+                # Keep the pool fed without queueing the whole folder up front
+                while len(pending) < workers * 2 and not self._cancel:
+                    if any(run == ALONE for _, _, run, _ in pending.values()):
+                        break
+                    if retries:
+                        if retries[0][2] == ALONE and pending:
+                            break
+                        start, files, run = retries.pop(0)
+                        rungs, learn = self.ladder.rungs(LADDER_KEY), 0
+                    else:
+                        chunk = next(chunks, None)
+                        if chunk is None:
+                            break
+                        (start, files, rungs, learn), run = chunk, CHUNK
+                    future = self._executor.submit(extract_chunk, self.folder, files, self.poppler_path, rungs, learn,
+                                                   time.time())
+                    pending[future] = (start, files, run, self._executor)
+                if not pending or self._cancel:
+                    return
+                # Wakes up now and then, so a cancel doesn't wait for a chunk to finish
+                finished, _ = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                if self._cancel:
+                    return
+                for future in finished:
+                    start, files, run, pool = pending.pop(future)
+                    try:
+                        results = future.result()
+                    except (BrokenProcessPool, CancelledError):
+                        if pool is self._executor:
+                            self._executor.shutdown(wait=False, cancel_futures=True)
+                            self._executor = self._new_pool(workers)
+                        if run != ALONE:
+                            retries += [(start + i, [file], run + 1) for i, file in enumerate(files)]
+                            retries.sort(key=lambda retry: retry[2])
+                            continue
+                        results = [failed_row(f, "worker process crashed on this file") for f in files]
+                    except Exception as e:
+                        results = [failed_row(f, str(e)) for f in files]
+                    for result in results:
+                        self.ladder.record(LADDER_KEY, result["dpi"])
+                        if result["sample"]:
+                            self.templates.add_sample("OBR", result["sample"])
+                    done_chunks[start] = (files, results)
+
+                # In order, a finished chunk waits until every chunk before it is out
+                for start in sorted(done_chunks):
+                    if self.ordered and start != next_start:
+                        break
+                    files, results = done_chunks.pop(start)
+                    next_start = start + len(files)
+                    for result in results:
+                        if self._cancel:
+                            return
+                        yield result
+        finally:
+            if not self.keep_pool or self._cancel or pending:
+                # Chunks still running would otherwise land in the next batch's pool
+                self.close()
+            self.ladder.save()
+            self.templates.save()
+
+    def cancel(self):
+        # Safe to call from any thread. Queued chunks are dropped, running
+        # ones stop after the file they are on and results() returns at once.
+        self._cancel = True
+        self._cancel_event.set()
+        self.close()
+
+    def close(self):
+        executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
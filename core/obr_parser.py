@@ -0,0 +1,104 @@
+import re
+
+# Every pattern is compiled once at import; parse_obr_text walks the lines a single time
+DATE_RE = re.compile(r"Date\s*[:\-]?\s*([A-Za-z]+\s+\d{1,2},\s+\d{4})", re.IGNORECASE)
+DATE_LABEL_RE = re.compile(r"Date\s*[:\-]?\s*$", re.IGNORECASE)
+DATE_VALUE_RE = re.compile(r"\s*([A-Za-z]+\s+\d{1,2},\s+\d{4})")
+PAYEE_RE = re.compile(r"Payee\s*[:\-]?\s*(.+)", re.IGNORECASE)
+PAYEE_LABEL_RE = re.compile(r"\s*Payee\s*[:\-]?\s*$", re.IGNORECASE)
+PARTICULARS_START_RE = re.compile(r"To obligate.*", re.IGNORECASE)
+# Matched against the lowercased line
+PARTICULARS_STOP_RE = re.compile(r"certified|signature|position|printed name|head|date:|status of obligation")
+PARTICULARS_CUT_RE = re.compile(r"\s+(?:\d{10,}|\d{3,}\.\d{2})|\|\s*\d+")
+TOTAL_RE = re.compile(r"Total[:\s]*([\d,]+\.\d{2})")
+TOTAL_LABEL_RE = re.compile(r"Total[:\s]*$")
+TOTAL_VALUE_RE = re.compile(r"[:\s]*([\d,]+\.\d{2})")
+AMOUNT_RE = re.compile(r"\d{1,3}(?:,\d{3})*\.\d{2}")
+BLANK_RE = re.compile(r"[:\s]*$")
+
+# Particulars states
+BEFORE, COLLECTING, DONE = range(3)
+
+
+def parse_obr_text(text):
+    """
+    (date, payee, particulars, total amount) from the text of one OBR page,
+    in a single walk over its lines. A label at the end of a line ("Payee:",
+    "Date:", "Total") takes its value from the next line. The walk stops as
+    soon as every field is settled.
+    A date is read from a single line. The old whole-text pattern could join
+    a word at the end of one line to a day on the next ("Office\\n5, 2024");
+    that is no longer taken as a date.
+    """
+    date = payee = total = None
+    date_pending = payee_pending = total_pending = False
+    particulars, state, blanks = [], BEFORE, 0
+
+    for line in text.split("\n"):
+        # Cheap substring checks decide which patterns are worth running on a line
+        low = line.lower()
+        stripped = line.strip()
+
+        if date is None and (date_pending or "date" in low):
+            if date_pending:
+                match = DATE_VALUE_RE.match(line)
+                if match:
+                    date = match.group(1)
+                date_pending = date is None and not stripped
+            if date is None and "date" in low:
+                match = DATE_RE.search(line)
+                if match:
+                    date = match.group(1)
+                elif DATE_LABEL_RE.search(line):
+                    date_pending = True
+
+        if payee is None and (payee_pending or "payee" in low):
+            if payee_pending:
+                payee_pending = False
+                if stripped:
+                    payee = stripped
+            if payee is None and "payee" in low:
+                match = PAYEE_RE.search(line)
+                if match and match.group(1).strip():
+                    payee = match.group(1).strip()
+                elif PAYEE_LABEL_RE.match(line):
+                    payee_pending = True
+
+        if state == BEFORE:
+            if "to obligate" in low:
+                particulars.append(PARTICULARS_START_RE.search(stripped).group(0).strip())
+                state = COLLECTING
+        elif state == COLLECTING:
+            if PARTICULARS_STOP_RE.search(low):
+                state = DONE
+            elif not stripped:
+                blanks += 1
+                if blanks >= 2:
+                    state = DONE
+            else:
+                blanks = 0
+                particulars.append(stripped)
+
+        if total is None and (total_pending or "Total" in line):
+            if total_pending:
+                match = TOTAL_VALUE_RE.match(line)
+                if match:
+                    total = match.group(1)
+                total_pending = total is None and bool(BLANK_RE.match(line))
+            if total is None and "Total" in line:
+                match = TOTAL_RE.search(line)
+                if match:
+                    total = match.group(1)
+                elif TOTAL_LABEL_RE.search(line):
+                    total_pending = True
+
+        if date is not None and payee is not None and total is not None and state == DONE:
+            break
+
+    cleaned = PARTICULARS_CUT_RE.split(" ".join(particulars), 1)[0].strip()
+    if total is not None:
+        total_amount = f"{float(total.replace(',', '')):,.2f}"
+    else:
+        # No "Total" on the page: the sum of every amount on it
+        total_amount = f"{sum(float(a.replace(',', '')) for a in AMOUNT_RE.findall(text)):,.2f}"
+    return date or "", payee or "", cleaned, total_amount
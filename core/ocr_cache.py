@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import atexit
+import sqlite3
+import hashlib
+from core.ocr_config import get_ocr_cache_limit_mb, get_state_dir
+from core.ocr_engine import WORD_FIELDS, get_engine, ocr_batch
+from core.stage_timer import timed
+
+CACHE_FILE = os.path.join(get_state_dir(), "ocr_cache.sqlite")
+DEFAULT_DPI = 200  # pdf2image's default
+# Bumped when the key changes; an older cache file is emptied rather than misread
+SCHEMA_VERSION = 2
+# A hit only refreshes last_used once the stored one is this old, so reads stay reads
+TOUCH_AFTER = 3600
+# Deferred refreshes are written once this many pile up (pool workers don't run atexit)
+TOUCH_BATCH = 100
+
+_cache = None
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    # Streamed so large scan bundles are never read into memory at once
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def words_to_text(words):
+    # Rebuild image_to_string-style text from word boxes: one line per OCR line,
+    # a blank line between paragraphs
+    lines, current, last_line, last_par = [], [], None, None
+    for text, block, par, line in zip(words["text"], words["block_num"], words["par_num"], words["line_num"]):
+        if (block, par, line) != last_line:
+            if current:
+                lines.append(" ".join(current))
+                current = []
+            if last_par is not None and (block, par) != last_par:
+                lines.append("")
+            last_line, last_par = (block, par, line), (block, par)
+        current.append(text)
+    if current:
+        lines.append(" ".join(current))
+    return "\n".join(lines)
+
+def words_in_rect(words, rect):
+    # Text of the words whose centre falls inside rect (x1, y1, x2, y2), in reading order
+    x1, y1, x2, y2 = rect
+    keep = [i for i in range(len(words["text"]))
+            if x1 <= words["left"][i] + words["width"][i] / 2 <= x2
+            and y1 <= words["top"][i] + words["height"][i] / 2 <= y2]
+    return words_to_text({field: [words[field][i] for i in keep] for field in WORD_FIELDS})
+
+def ocr_words(image, config=""):
+    with timed("ocr"):
+        return get_engine().words(image, config)
+
+
+class OcrCache:
+    """
+    OCR results keyed by PDF content hash, page, DPI, tesseract config,
+    region and OCR engine, so moved or re-downloaded files are not OCR'd again.
+    Least recently used entries are evicted once the file passes its size limit.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_bytes=None, engine=None):
+        self.path = path
+        self.max_bytes = max_bytes or get_ocr_cache_limit_mb() * 1024 * 1024
+        # tesserocr and the tesseract executable don't give identical results
+        self.engine = engine or get_engine().name
+        self._puts = 0
+        self._touched = {}  # key: time of a hit not yet written to last_used
+        # Several pool processes share the file, hence WAL and a generous timeout
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS ocr")
+            self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr (
+                pdf_hash TEXT, page INTEGER, dpi INTEGER, config TEXT, region TEXT, engine TEXT,
+                text TEXT, words TEXT, size INTEGER, last_used REAL,
+                PRIMARY KEY (pdf_hash, page, dpi, config, region, engine)
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ocr_last_used ON ocr (last_used)")
+        self.conn.commit()
+
+    def get(self, pdf_hash, page=1, dpi=DEFAULT_DPI, config="", region=None):
+        key = (pdf_hash, page, dpi, config, str(region), self.engine)
+        row = self.conn.execute(
+            "SELECT text, words, last_used FROM ocr "
+            "WHERE pdf_hash=? AND page=? AND dpi=? AND config=? AND region=? AND engine=?", key
+        ).fetchone()
+        if not row:
+            return None
+        now = time.time()
+        if now - row[2] > TOUCH_AFTER:
+            # Written with the next put, a full batch or on exit
+            self._touched[key] = now
+            if len(self._touched) >= TOUCH_BATCH:
+                self.flush()
+        return {"text": row[0], "words": json.loads(row[1]) if row[1] else None}
+
+    def flush(self):
+        # Write the deferred last_used refreshes in one transaction
+        if not self._touched:
+            return
+        touched, self._touched = self._touched, {}
+        self.conn.executemany(
+            "UPDATE ocr SET last_used=? "
+            "WHERE pdf_hash=? AND page=? AND dpi=? AND config=? AND region=? AND engine=?",
+            [(used,) + key for key, used in touched.items()],
+        )
+        self.conn.commit()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+    def put(self, pdf_hash, page, dpi, config, region, text, words=None):
+        words_json = json.dumps(words, separators=(",", ":")) if words else None
+        size = len(text.encode("utf-8")) + len(words_json or "")
+        self.conn.execute(
+            "INSERT OR REPLACE INTO ocr VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (pdf_hash, page, dpi, config, str(region), self.engine, text, words_json, size, time.time()),
+        )
+        # The write lock is taken anyway, so pending touches ride along
+        self.flush()
+        self.conn.commit()
+        self._puts += 1
+        if self._puts % 50 == 1:
+            self.evict()
+
+    def evict(self):
+        self.flush()
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% of the limit so this doesn't run again on the next insert
+        excess = total - int(self.max_bytes * 0.9)
+        rows = self.conn.execute("SELECT rowid, size FROM ocr ORDER BY last_used").fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if excess <= 0:
+                break
+            doomed.append((rowid,))
+            excess -= size
+        self.conn.executemany("DELETE FROM ocr WHERE rowid=?", doomed)
+        self.conn.commit()
+
+
+def get_cache():
+    # One connection per process
+    global _cache
+    if _cache is None:
+        _cache = OcrCache()
+        atexit.register(_close_cache)
+    return _cache
+
+def _close_cache():
+    global _cache
+    if _cache is not None:
+        try:
+            _cache.close()
+        except Exception as e:
+            print(f"OCR cache close failed: {e}")
+        _cache = None
+
+def cached_ocr(pdf_path, render, page=1, dpi=DEFAULT_DPI, config="", region=None, pdf_hash=None):
+    """
+    OCR text and word boxes for one page (or region) of a PDF. render() is
+    only called on a cache miss. A broken cache never stops the OCR itself.
+    """
+    try:
+        cache = get_cache()
+        pdf_hash = pdf_hash or file_hash(pdf_path)
+        hit = cache.get(pdf_hash, page, dpi, config, region)
+        if hit:
+            return hit
+    except Exception as e:
+        print(f"OCR cache unavailable: {e}")
+        cache = None
+
+    words = ocr_words(render(), config)
+    result = {"text": words_to_text(words), "words": words}
+    if cache:
+        try:
+            cache.put(pdf_hash, page, dpi, config, region, result["text"], words)
+        except Exception as e:
+            print(f"OCR cache write failed: {e}")
+    return result
+
+def prefetch_ocr(jobs, page=1, dpi=DEFAULT_DPI, config="", region=None, stop=None):
+    """
+    OCR the (pdf_hash, render) jobs that aren't cached yet in batched
+    tesseract runs and store the results, so the cached_ocr calls that follow
+    are hits. Any failure leaves those jobs to cached_ocr. stop() ends the
+    prefetch early, between files (see ocr_batch).
+    """
+    try:
+        cache = get_cache()
+        missing = [(pdf_hash, render) for pdf_hash, render in jobs
+                   if not cache.get(pdf_hash, page, dpi, config, region)]
+        results = ocr_batch([render for _, render in missing], config, stop=stop)
+        for (pdf_hash, _), words in zip(missing, results):
+            if words is not None:
+                cache.put(pdf_hash, page, dpi, config, region, words_to_text(words), words)
+    except Exception as e:
+        print(f"Batch OCR failed: {e}")
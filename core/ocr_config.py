@@ -2,6 +2,10 @@ import os
 import json
 import pytesseract
 
+def get_state_dir():
+    # Where the OCR cache, DPI stats, form templates and job journals live; ERC_STATE_DIR moves them
+    return os.environ.get("ERC_STATE_DIR") or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 def load_ocr_config():
     config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ocr_config.json")
     print(f"Loading config from: {config_path}")
@@ -50,3 +54,47 @@ def set_poppler_path(path):
         os.environ["POPPLER_PATH"] = path
         return True
     return False
+
+def get_worker_count():
+    # Number of OCR processes for batch jobs; defaults to the machine's core count
+    config = load_ocr_config()
+    try:
+        count = int(config.get("worker_count") or 0)
+    except (TypeError, ValueError):
+        count = 0
+    return count if count > 0 else (os.cpu_count() or 1)
+
+def get_ocr_cache_limit_mb():
+    config = load_ocr_config()
+    try:
+        return max(1, int(config.get("ocr_cache_mb", 512)))
+    except (TypeError, ValueError):
+        return 512
+
+def get_ocr_backend():
+    # "auto" uses tesserocr when it is installed, "cli" forces the tesseract executable
+    backend = str(load_ocr_config().get("ocr_backend", "auto")).lower()
+    return backend if backend in ("auto", "tesserocr", "cli") else "auto"
+
+def get_ocr_batch_size():
+    # Images per tesseract run in batch OCR; bounds the temp files written per run
+    config = load_ocr_config()
+    try:
+        return max(1, int(config.get("ocr_batch_size", 32)))
+    except (TypeError, ValueError):
+        return 32
+
+def get_watch_folders():
+    # {folder: rename mode} from "watch_folders"; folders that don't exist are left out
+    folders = load_ocr_config().get("watch_folders") or {}
+    if not isinstance(folders, dict):
+        return {}
+    return {folder: str(mode) for folder, mode in folders.items() if os.path.isdir(folder)}
+
+def get_watch_settle_seconds():
+    # How long a dropped file's size must hold still before it is treated as fully written
+    config = load_ocr_config()
+    try:
+        return max(0.5, float(config.get("watch_settle_seconds", 3)))
+    except (TypeError, ValueError):
+        return 3.0
@@ -0,0 +1,294 @@
+import os
+import shlex
+import platform
+import tempfile
+import threading
+import subprocess
+import pytesseract
+from core.ocr_config import get_ocr_backend, get_ocr_batch_size
+from core.stage_timer import timed
+
+# Batches run one tesseract per pool process, so tesseract's own OpenMP threads
+# would only oversubscribe the cores. libgomp reads this once, when tesserocr
+# loads it, so it has to be set before the import; CLI runs inherit it.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+WORD_FIELDS = ("text", "left", "top", "width", "height", "conf", "block_num", "par_num", "line_num")
+STOP_POLL_SECONDS = 0.2  # how often a running tesseract checks whether its batch was canceled
+
+_engine = None
+
+
+class OcrCanceled(Exception):
+    # A batch's stop() came true before the batch was through
+    pass
+
+
+def raw_image(image):
+    # Uncompressed 8-bit pixels tesseract can take as is: (mode, bytes, bytes per pixel)
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB" if image.mode in ("RGBA", "P", "CMYK") else "L")
+    return image, image.tobytes(), 1 if image.mode == "L" else 3
+
+def parse_config(config):
+    # Split a pytesseract-style config string into (lang, psm, variables)
+    lang, psm, variables = "eng", None, {}
+    args = shlex.split(config or "")
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        value = args[i + 1] if i + 1 < len(args) else ""
+        if arg == "--psm":
+            psm, i = int(value), i + 1
+        elif arg == "-l":
+            lang, i = value, i + 1
+        elif arg == "-c" and "=" in value:
+            key, val = value.split("=", 1)
+            variables[key] = val
+            i += 1
+        i += 1
+    return lang, psm, variables
+
+
+class TesserocrEngine:
+    """
+    tesseract's C API through tesserocr. The model is loaded once per process
+    and images are handed over as raw pixel buffers, so there is no process
+    start, temp PNG or traineddata reload per call. Each language and set of
+    -c variables gets an API object of its own: variables stick to the object
+    they are set on, and a digits-only whitelist must not leak into later calls.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self):
+        self._apis = {}
+        # One API object is not safe to use from two threads at once
+        self._lock = threading.Lock()
+
+    def _api(self, lang, variables=None):
+        key = (lang, tuple(sorted((variables or {}).items())))
+        if key not in self._apis:
+            tessdata = os.environ.get("TESSDATA_PREFIX")
+            if tessdata:
+                api = tesserocr.PyTessBaseAPI(path=tessdata, lang=lang)
+            else:
+                api = tesserocr.PyTessBaseAPI(lang=lang)
+            for name, value in key[1]:
+                api.SetVariable(name, value)
+            self._apis[key] = api
+        return self._apis[key]
+
+    def _recognize(self, image, config):
+        lang, psm, variables = parse_config(config)
+        api = self._api(lang, variables)
+        api.Clear()
+        api.SetPageSegMode(psm if psm is not None else tesserocr.PSM.AUTO)
+        image, data, bpp = raw_image(image)
+        api.SetImageBytes(data, image.width, image.height, bpp, bpp * image.width)
+        api.Recognize()
+        return api
+
+    def text(self, image, config=""):
+        with self._lock:
+            return self._recognize(image, config).GetUTF8Text()
+
+    def words(self, image, config=""):
+        words = empty_words()
+        RIL = tesserocr.RIL
+        with self._lock:
+            api = self._recognize(image, config)
+            iterator = api.GetIterator()
+            if iterator is None:
+                return words
+            block = par = line = 0
+            for word in tesserocr.iterate_level(iterator, RIL.WORD):
+                # Same numbering as image_to_data, so words_to_text rebuilds the same lines
+                if word.IsAtBeginningOf(RIL.BLOCK):
+                    block, par, line = block + 1, 0, 0
+                if word.IsAtBeginningOf(RIL.PARA):
+                    par, line = par + 1, 0
+                if word.IsAtBeginningOf(RIL.TEXTLINE):
+                    line += 1
+                try:
+                    text = word.GetUTF8Text(RIL.WORD)
+                except RuntimeError:
+                    # tesserocr raises rather than return "" for a page with no words
+                    continue
+                box = word.BoundingBox(RIL.WORD)
+                if not text or not text.strip() or not box:
+                    continue
+                x1, y1, x2, y2 = box
+                for field, value in zip(WORD_FIELDS, (text, x1, y1, x2 - x1, y2 - y1, word.Confidence(RIL.WORD), block, par, line)):
+                    words[field].append(value)
+        return words
+
+    def words_batch(self, images, config="", stop=None):
+        # The model is already resident, so a batch is just a loop; stop is
+        # checked between images by ocr_batch
+        return [self.words(image, config) for image in images]
+
+
+class CliEngine:
+    """
+    Fallback when tesserocr isn't installed: the tesseract executable, fed an
+    uncompressed PGM/PPM on stdin instead of a PNG temp file.
+    """
+
+    name = "cli"
+
+    def _run(self, source, config, output=(), stdin=None, stop=None):
+        """
+        tesseract's stdout. With stop, the run is killed and OcrCanceled
+        raised as soon as stop() is true, e.g. partway through a batch.
+        """
+        args = [pytesseract.pytesseract.tesseract_cmd, source, "stdout"] + shlex.split(config or "") + list(output)
+        if "-l" not in args:
+            args[3:3] = ["-l", "eng"]
+        startupinfo = None
+        if platform.system() == "Windows":
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        proc = subprocess.Popen(args, stdin=subprocess.PIPE if stdin is not None else None,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, startupinfo=startupinfo)
+        while True:
+            try:
+                out, err = proc.communicate(stdin, timeout=STOP_POLL_SECONDS if stop else None)
+                break
+            except subprocess.TimeoutExpired:
+                stdin = None  # already sent
+                if stop():
+                    proc.kill()
+                    proc.communicate()
+                    raise OcrCanceled()
+        if proc.returncode != 0:
+            raise RuntimeError(f"tesseract failed: {err.decode(errors='ignore').strip()}")
+        return out.decode("utf-8", errors="ignore")
+
+    def text(self, image, config=""):
+        return self._run("stdin", config, stdin=pnm_bytes(image))
+
+    def words(self, image, config=""):
+        return parse_tsv(self._run("stdin", config, ("tsv",), stdin=pnm_bytes(image)))[1]
+
+    def words_batch(self, images, config="", stop=None):
+        """
+        One tesseract run over a list file of images, so process start and
+        model load are paid once per batch. tsv output numbers the pages in
+        list order, which is how the words are split back per image. stop
+        can end the run early (see _run).
+        """
+        with tempfile.TemporaryDirectory(prefix="erc_ocr_") as tmp:
+            list_path = os.path.join(tmp, "images.txt")
+            count = 0
+            with open(list_path, "w", encoding="utf-8") as f:
+                # Each image goes to disk as soon as it is rendered and is not kept
+                for image in images:
+                    image_path = os.path.join(tmp, f"{count}.pnm")
+                    with open(image_path, "wb") as out:
+                        out.write(pnm_bytes(image))
+                    f.write(image_path + "\n")
+                    count += 1
+            if not count:
+                return []
+            pages = parse_tsv(self._run(list_path, config, ("tsv",), stop=stop), by_page=True)
+        return [pages.get(i + 1) or empty_words() for i in range(count)]
+
+
+def pnm_bytes(image):
+    # Binary PGM/PPM: a short header in front of the raw pixels, no compression
+    image, data, bpp = raw_image(image)
+    header = f"{'P5' if bpp == 1 else 'P6'}\n{image.width} {image.height}\n255\n".encode("ascii")
+    return header + data
+
+def empty_words():
+    return {field: [] for field in WORD_FIELDS}
+
+
+def parse_tsv(tsv, by_page=False):
+    """
+    Word rows of tesseract's tsv output in the image_to_data field layout.
+    With by_page, a dict of page number to words; otherwise {1: words}.
+    """
+    pages = {}
+    lines = tsv.splitlines()
+    if not lines:
+        return {1: empty_words()}
+    header = lines[0].split("\t")
+    for line in lines[1:]:
+        row = dict(zip(header, line.split("\t")))
+        # Multi-image runs repeat the header line
+        if row.get("level") == "level":
+            continue
+        page = int(row.get("page_num") or 1) if by_page else 1
+        words = pages.setdefault(page, empty_words())
+        if row.get("level") != "5" or not row.get("text", "").strip():
+            continue
+        for field in WORD_FIELDS:
+            words[field].append(row[field] if field == "text" else
+                                float(row[field]) if field == "conf" else int(row[field]))
+    return pages or {1: empty_words()}
+
+def get_engine():
+    """
+    The OCR engine for this process, created on first use and kept for the
+    life of the process (each pool worker gets its own).
+    """
+    global _engine
+    if _engine is None:
+        backend = get_ocr_backend()
+        if tesserocr is not None and backend in ("auto", "tesserocr"):
+            try:
+                _engine = TesserocrEngine()
+                _engine._api("eng")
+            except Exception as e:
+                print(f"tesserocr unavailable, using the tesseract executable: {e}")
+                _engine = None
+        if _engine is None:
+            _engine = CliEngine()
+    return _engine
+
+def image_to_text(image, config=""):
+    return get_engine().text(image, config)
+
+def ocr_batch(images, config="", chunk_size=None, stop=None):
+    """
+    Word boxes for each of images, in order. Items may be PIL images or
+    callables that render one; they are rendered only as the batch reaches
+    them, and tesseract runs once per chunk_size items. A callable that raises
+    yields None for that item instead of failing the whole batch. stop() is
+    checked before each item and while tesseract runs; once it is true the
+    batch ends without yielding the rest.
+    """
+    chunk_size = chunk_size or get_ocr_batch_size()
+    engine = get_engine()
+    items = list(images)
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        failed = set()
+
+        def rendered():
+            for i, item in enumerate(chunk):
+                if stop and stop():
+                    raise OcrCanceled()
+                try:
+                    image = item() if callable(item) else item
+                except Exception as e:
+                    print(f"Render failed, skipping in OCR batch: {e}")
+                    failed.add(i)
+                    continue
+                yield image
+
+        # Pages rendered along the way are timed as render, not OCR
+        try:
+            with timed("ocr"):
+                words = iter(engine.words_batch(rendered(), config, stop))
+        except OcrCanceled:
+            return
+        for i in range(len(chunk)):
+            yield None if i in failed else next(words)
@@ -0,0 +1,29 @@
+import os
+from PyPDF2 import PdfMerger, PdfReader, PdfWriter
+
+
+def split_pages(input_pdf, output_folder):
+    """
+    Write each page of input_pdf to output_folder as page_N.pdf. Yields
+    (page number, page count, output path) as each page is written.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    reader = PdfReader(input_pdf)
+    total_pages = len(reader.pages)
+    for i, page in enumerate(reader.pages, start=1):
+        writer = PdfWriter()
+        writer.add_page(page)
+        output_path = os.path.join(output_folder, f"page_{i}.pdf")
+        with open(output_path, "wb") as output_pdf:
+            writer.write(output_pdf)
+        yield i, total_pages, output_path
+
+def merge_files(files, output_path):
+    # files are appended in the order given
+    merger = PdfMerger()
+    try:
+        for file in files:
+            merger.append(file)
+        merger.write(output_path)
+    finally:
+        merger.close()
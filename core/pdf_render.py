@@ -0,0 +1,119 @@
+import io
+import os
+import shutil
+import platform
+import tempfile
+import subprocess
+from PIL import Image
+from PyPDF2 import PdfReader
+from core.stage_timer import timed
+
+# Page regions as (left, top, right, bottom) fractions of the page
+FULL_PAGE = (0.0, 0.0, 1.0, 1.0)
+OBR_SERIAL_REGION = (0.5, 0.0, 1.0, 0.3)   # top-right corner, "Serial No."
+SARO_NUMBER_REGION = (0.5, 0.7, 1.0, 1.0)  # bottom-right corner, "SARO No."
+
+# Output colors; OCR only needs grayscale, which is a third of the size of RGB
+RGB, GRAY, MONO = "rgb", "gray", "mono"
+COLORS = (RGB, GRAY, MONO)
+
+
+def poppler_command(name, poppler_path=None):
+    exe = name + ".exe" if platform.system() == "Windows" else name
+    return os.path.join(poppler_path, exe) if poppler_path else exe
+
+def run_poppler(args, timeout=None):
+    startupinfo = None
+    if platform.system() == "Windows":
+        # Don't flash a console window for every page
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    with timed("render"):
+        proc = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              startupinfo=startupinfo, timeout=timeout)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{os.path.basename(args[0])} failed: {proc.stderr.decode(errors='ignore').strip()}")
+    return proc.stdout
+
+def get_page_size(pdf_path, page=1):
+    # Size in points as displayed, i.e. with the page rotation applied
+    pdf_page = PdfReader(pdf_path).pages[page - 1]
+    width, height = float(pdf_page.mediabox.width), float(pdf_page.mediabox.height)
+    if (pdf_page.get("/Rotate") or 0) % 180 == 90:
+        width, height = height, width
+    return width, height
+
+def render_dir():
+    # Scratch folder for rendered pages; RAM-backed /dev/shm where there is one
+    shm = "/dev/shm"
+    base = shm if os.path.isdir(shm) and os.access(shm, os.W_OK) else None
+    return tempfile.mkdtemp(prefix="erc_render_", dir=base)
+
+def pdftoppm_args(pdf_path, first_page, last_page, dpi, color, crop, poppler_path):
+    args = [poppler_command("pdftoppm", poppler_path), "-r", str(dpi), "-f", str(first_page)]
+    if last_page:
+        args += ["-l", str(last_page)]
+    if crop:
+        # Poppler rasterizes just the requested rectangle, so a corner costs a fraction of a page
+        page_width, page_height = get_page_size(pdf_path, first_page)
+        scale = dpi / 72.0
+        left, top, right, bottom = crop
+        x, y = int(page_width * left * scale), int(page_height * top * scale)
+        w = max(1, int(page_width * right * scale) - x)
+        h = max(1, int(page_height * bottom * scale) - y)
+        args += ["-x", str(x), "-y", str(y), "-W", str(w), "-H", str(h)]
+    if color not in COLORS:
+        raise ValueError(f"Unknown render color: {color}")
+    if color != RGB:
+        args.append("-" + color)
+    return args
+
+def render_page(pdf_path, page=1, dpi=200, color=GRAY, crop=None, poppler_path=None):
+    """
+    One page (or the crop region of one, as page fractions) as a PIL image,
+    read straight from pdftoppm's output without temp files.
+    """
+    args = pdftoppm_args(pdf_path, page, page, dpi, color, crop, poppler_path) + [pdf_path]
+    image = Image.open(io.BytesIO(run_poppler(args)))
+    image.load()
+    return image
+
+def crop_region(image, region):
+    # Same region as render_page(crop=...), cut from an already rendered page
+    width, height = image.size
+    left, top, right, bottom = region
+    return image.crop((int(width * left), int(height * top), int(width * right), int(height * bottom)))
+
+def render_pages(pdf_path, first_page=1, last_page=None, dpi=200, color=GRAY, crop=None,
+                 poppler_path=None, paths_only=False, output_folder=None):
+    """
+    Render a page range (last_page=None means to the end) and yield the pages
+    in order. Pages go to uncompressed files in output_folder (a RAM-backed
+    temp folder by default) and are loaded one at a time, so only one page is
+    ever held in memory. With paths_only the file paths are yielded instead
+    and the files (and the temp folder) are left for the caller to delete.
+    """
+    folder = output_folder or render_dir()
+    try:
+        if crop:
+            # Page sizes can differ, so each page gets its own crop rectangle
+            last = last_page or len(PdfReader(pdf_path).pages)
+            for page in range(first_page, last + 1):
+                args = pdftoppm_args(pdf_path, page, page, dpi, color, crop, poppler_path)
+                run_poppler(args + ["-singlefile", pdf_path, os.path.join(folder, f"page-{page:05d}")])
+        else:
+            args = pdftoppm_args(pdf_path, first_page, last_page, dpi, color, None, poppler_path)
+            run_poppler(args + [pdf_path, os.path.join(folder, "page")])
+
+        for name in sorted(n for n in os.listdir(folder) if n.startswith("page")):
+            path = os.path.join(folder, name)
+            if paths_only:
+                yield path
+                continue
+            image = Image.open(path)
+            image.load()
+            os.remove(path)
+            yield image
+    finally:
+        if not paths_only and not output_folder:
+            shutil.rmtree(folder, ignore_errors=True)
@@ -1,10 +1,12 @@
 import os
 import shutil
-import pdf2image
-import pytesseract
 from PyPDF2 import PdfReader, PdfWriter
 from utils.dialogs import show_error, show_warning
 from utils.helpers import sanitize_filename
+from core.text_layer import get_text_layer
+from core.ocr_cache import cached_ocr, file_hash
+from core.dpi_ladder import DpiLadder, climb
+from core.pdf_render import render_page
 
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QListWidget, QHBoxLayout, QPushButton,
@@ -13,6 +15,27 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QDesktopServices, QKeyEvent
 from PyQt5.QtCore import QUrl, Qt
 
+LADDER_KEY = "Serial rename"
+
+
+def find_serial_number(text):
+    for line in text.split('\n'):
+        if 'Serial No.' in line:
+            return sanitize_filename(line.split('Serial No.')[-1].strip())
+    return None
+
+
+def ocr_serial_number(pdf_path, ladder):
+    # Page by page, each page climbing the DPI ladder until the serial number reads
+    pdf_hash = file_hash(pdf_path)
+    for page in range(1, len(PdfReader(pdf_path).pages) + 1):
+        ocr_at = lambda dpi: cached_ocr(pdf_path, lambda: render_page(pdf_path, page=page, dpi=dpi), page=page, dpi=dpi, config='--psm 6', pdf_hash=pdf_hash)
+        serial_number, _, dpi = climb(ladder.rungs(LADDER_KEY), ocr_at, find_serial_number)
+        if serial_number:
+            ladder.record(LADDER_KEY, dpi)
+            return serial_number
+    return None
+
 
 def extract_and_rename_pdfs(folder_path, output_widget, progress_bar=None):
     if not os.path.isdir(folder_path):
@@ -29,23 +52,21 @@ def extract_and_rename_pdfs(folder_path, output_widget, progress_bar=None):
         progress_bar.setMaximum(total)
         progress_bar.setValue(0)
 
+    ladder = DpiLadder()
     for count, filename in enumerate(pdf_files, start=1):
         pdf_path = os.path.join(folder_path, filename)
-        try:
-            images = pdf2image.convert_from_path(pdf_path)
-        except Exception as e:
-            output_widget.append(f"Failed to convert {filename}: {e}")
-            continue
-
         serial_number = None
-        for image in images:
-            text = pytesseract.image_to_string(image, lang='eng', config='--psm 6')
-            for line in text.split('\n'):
-                if 'Serial No.' in line:
-                    serial_number = sanitize_filename(line.split('Serial No.')[-1].strip())
-                    break
-            if serial_number:
-                break
+
+        # Embedded text first; only scanned PDFs are rendered and OCR'd
+        text = get_text_layer(pdf_path, first_page=None, last_page=None)
+        if text is not None:
+            serial_number = find_serial_number(text)
+        else:
+            try:
+                serial_number = ocr_serial_number(pdf_path, ladder)
+            except Exception as e:
+                output_widget.append(f"Failed to convert {filename}: {e}")
+                continue
 
         if serial_number:
             new_filename = f"{serial_number}.pdf"
@@ -64,6 +85,7 @@ def extract_and_rename_pdfs(folder_path, output_widget, progress_bar=None):
         if progress_bar:
             progress_bar.setValue(count)
 
+    ladder.save()
     open_and_manage_files(folder_path)
 
 
@@ -0,0 +1,358 @@
+import os
+import math
+import time
+import pytesseract
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from core.id_extractors import extract_obr_number, find_saro_number, parse_nca_number, nca_suggestions, obr_suggestions, saro_suggestions
+from core.doc_classifier import AUTO, CLASSIFY_CONFIG, CLASSIFY_DPI, DOC_TYPES, classify_pdf
+from core.form_templates import ID_FIELDS, get_templates, read_fields, sample_from_ocr
+from core.dpi_ladder import DPI_LADDER, EXPLORE_EVERY, DpiLadder, climb
+from core.ocr_cache import DEFAULT_DPI, cached_ocr, file_hash, prefetch_ocr
+from core.ocr_config import get_ocr_batch_size, get_worker_count
+from core.pdf_render import FULL_PAGE, OBR_SERIAL_REGION, SARO_NUMBER_REGION, crop_region, render_page
+from core.stage_timer import add_timings, take_timings, timed
+from core.text_layer import get_text_layer
+
+# Part of the page shown in the manual fallback dialogs
+PREVIEW_REGIONS = {"OBR": OBR_SERIAL_REGION, "NCA": FULL_PAGE, "SARO": SARO_NUMBER_REGION}
+# The NCA parser reads line by line, which needs tesseract's single-block mode
+NCA_OCR_CONFIG = "--psm 6"
+
+
+def init_worker(tesseract_cmd):
+    # OMP_THREAD_LIMIT is already set by core.ocr_engine, before tesserocr loaded
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+def lazy_page(path, poppler_path):
+    # Renders the first page on first use at each DPI, so cache hits skip poppler entirely
+    images = {}
+    def render(dpi=DEFAULT_DPI):
+        if dpi not in images:
+            images[dpi] = render_page(path, dpi=dpi, poppler_path=poppler_path)
+        return images[dpi]
+    return render
+
+def ocr_region(path, region, poppler_path, pdf_hash, dpi=DEFAULT_DPI):
+    # Region pass; any failure here just means the full page gets OCR'd instead
+    try:
+        render = lambda: render_page(path, dpi=dpi, crop=region, poppler_path=poppler_path)
+        return cached_ocr(path, render, dpi=dpi, region=region, pdf_hash=pdf_hash)
+    except Exception as e:
+        print(f"Region OCR failed for {path}: {e}")
+        return {"text": "", "words": None}
+
+def render_preview(path, region, poppler_path, first_page=None):
+    try:
+        return render_page(path, crop=region, poppler_path=poppler_path)
+    except Exception:
+        first_page = first_page or lazy_page(path, poppler_path)
+        return crop_region(first_page(), region)
+
+def parse_text(mode, text):
+    # (value, suggestions) for the given mode
+    with timed("parse"):
+        if mode == "OBR":
+            return extract_obr_number(text), obr_suggestions(text)
+        if mode == "NCA":
+            return parse_nca_number(text), nca_suggestions(text)
+        return find_saro_number(text), saro_suggestions(text)
+
+def process_pdf(mode, folder, file, poppler_path, rungs=DPI_LADDER, text_layer=None, pdf_hash=None, learn=False):
+    """
+    Extract the identifier from the first page of one PDF in a pool process.
+    The embedded text layer is used when there is one. Otherwise the page is
+    OCR'd up the DPI ladder (rungs), stopping at the first DPI that reads the
+    number; OBR and SARO numbers are read from their corner of the page and
+    the full page is only rendered when that finds nothing. Once a form
+    template has been learned, only the number's own box is OCR'd first.
+    text_layer and pdf_hash may be passed in when the caller already has
+    them; text_layer "" means the PDF is known to have no usable text.
+    With learn, or when the template misread the page, a successfully read
+    scan also returns a template sample.
+    Returns a plain dict so it can be pickled back to the batch thread.
+    """
+    path = os.path.join(folder, file)
+    result = {"file": file, "path": path, "mode": mode, "value": None, "suggestions": [], "preview": None,
+              "error": None, "dpi": None, "sample": None}
+    try:
+        # Digitally generated PDFs already carry their text; only scans need OCR
+        text = get_text_layer(path, poppler_path=poppler_path) if text_layer is None else text_layer or None
+        if text is not None:
+            result["value"], suggestions = parse_text(mode, text)
+            if not result["value"]:
+                result["suggestions"] = suggestions
+                result["preview"] = render_preview(path, PREVIEW_REGIONS[mode], poppler_path)
+            return result
+
+        pdf_hash = pdf_hash or file_hash(path)
+        field = ID_FIELDS[mode]
+        values, template_dpi = read_fields(mode, path, [field], poppler_path, rungs, pdf_hash)
+        if template_dpi:
+            result["value"], result["dpi"] = values[field], template_dpi
+            return result
+        # A template that misread the page is corrected from the full-page read below
+        learn = learn or bool(values)
+
+        first_page = lazy_page(path, poppler_path)
+        parse_value = lambda text: parse_text(mode, text)[0]
+
+        if mode == "NCA":
+            # One OCR pass per rung feeds both the parser and the fallback suggestions
+            ocr_at = lambda dpi: cached_ocr(path, lambda: first_page(dpi), dpi=dpi, config=NCA_OCR_CONFIG, pdf_hash=pdf_hash)
+            result["value"], text, result["dpi"] = climb(rungs, ocr_at, parse_value)
+            if not result["value"]:
+                result["suggestions"] = parse_text(mode, text)[1]
+                result["preview"] = first_page()
+            elif learn:
+                result["sample"] = sample_from_ocr(mode, path, ocr_at(result["dpi"]), result["dpi"])
+            return result
+
+        region = PREVIEW_REGIONS[mode]
+        ocr_at = lambda dpi: ocr_region(path, region, poppler_path, pdf_hash, dpi)
+        result["value"], _, result["dpi"] = climb(rungs, ocr_at, parse_value)
+        if not result["value"]:
+            text = cached_ocr(path, first_page, pdf_hash=pdf_hash)["text"]
+            value, suggestions = parse_text(mode, text)
+            # A SARO-like pattern elsewhere on the page is only a suggestion
+            if mode == "OBR":
+                result["value"] = value
+            if not result["value"]:
+                result["suggestions"] = suggestions
+                result["preview"] = render_preview(path, region, poppler_path, first_page)
+        if learn and result["value"]:
+            # The corner pass has no full-page word boxes, so samples cost one page OCR
+            ocr = cached_ocr(path, first_page, pdf_hash=pdf_hash)
+            result["sample"] = sample_from_ocr(mode, path, ocr, DEFAULT_DPI)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+def failed_result(mode, folder, file, error):
+    return {"file": file, "path": os.path.join(folder, file), "mode": mode, "value": None, "suggestions": [],
+            "preview": None, "error": error, "dpi": None, "sample": None}
+
+def read_text_layers(folder, files, poppler_path):
+    # ({file: text layer or ""}, {file: hash} for the scans); files that can't be read are left out
+    text_layers, hashes = {}, {}
+    for file in files:
+        path = os.path.join(folder, file)
+        try:
+            text_layers[file] = get_text_layer(path, poppler_path=poppler_path) or ""
+            if not text_layers[file]:
+                hashes[file] = file_hash(path)
+        except Exception:
+            # process_pdf runs into the same problem and reports it
+            text_layers.pop(file, None)
+    return text_layers, hashes
+
+def queue_wait(submitted):
+    # Seconds a pool task waited for a worker; submitted is time.time() at submit
+    return {"queue": max(0.0, time.time() - submitted)} if submitted else {}
+
+def process_chunk(mode, folder, files, poppler_path, rungs=DPI_LADDER, learn=0, known=None, submitted=None):
+    """
+    process_pdf over several files in one pool task. The scanned ones are
+    first OCR'd together at the bottom rung, with one tesseract run per OCR
+    batch instead of one per file, so process_pdf finds them in the cache and
+    only climbs the ladder for files that rung doesn't settle. With a learned
+    template that has the number's box there is no full-page pass to batch. The first learn files are
+    asked for template samples. known is read_text_layers' result when the
+    caller already has it. Each result carries its "timings" per stage
+    (stage_timer), with the chunk's shared work split evenly over its files.
+    """
+    waited = queue_wait(submitted)
+    take_timings()
+    text_layers, hashes = known or read_text_layers(folder, files, poppler_path)
+    dpi = rungs[0]
+    crop = None if mode == "NCA" else PREVIEW_REGIONS[mode]
+    jobs = [(hashes[file], partial(render_page, os.path.join(folder, file), dpi=dpi, crop=crop,
+                                   poppler_path=poppler_path))
+            for file in files if file in hashes]
+
+    if not get_templates().covers(mode, [ID_FIELDS[mode]]):
+        if mode == "NCA":
+            prefetch_ocr(jobs, dpi=dpi, config=NCA_OCR_CONFIG)
+        else:
+            prefetch_ocr(jobs, dpi=dpi, region=PREVIEW_REGIONS[mode])
+    # The chunk waited for its worker as a whole, so the wait is shared too
+    shared = add_timings(take_timings(), waited)
+    results = []
+    for i, file in enumerate(files):
+        result = process_pdf(mode, folder, file, poppler_path, rungs, text_layers.get(file), hashes.get(file), i < learn)
+        result["timings"] = add_timings(take_timings(), shared, 1 / len(files))
+        results.append(result)
+    return results
+
+def classify_chunk(folder, files, poppler_path, rungs, learn, submitted=None):
+    """
+    Auto mode: classify each file of the chunk (classify_pdf), then run
+    process_chunk once per document type found. The scans are classified
+    from one batched low-DPI OCR run. rungs and learn are dicts keyed by
+    type. Each result's "mode" is the type it was read as, and
+    "classify_time" its share of the seconds spent classifying.
+    """
+    waited = queue_wait(submitted)
+    started = time.perf_counter()
+    take_timings()
+    text_layers, hashes = read_text_layers(folder, files, poppler_path)
+    jobs = [(hashes[file], partial(render_page, os.path.join(folder, file), dpi=CLASSIFY_DPI,
+                                   poppler_path=poppler_path))
+            for file in files if file in hashes]
+    prefetch_ocr(jobs, dpi=CLASSIFY_DPI, config=CLASSIFY_CONFIG)
+
+    groups, results = {}, []
+    for file in files:
+        try:
+            doc_type = classify_pdf(os.path.join(folder, file), poppler_path, text_layers.get(file), hashes.get(file))
+        except Exception as e:
+            results.append(failed_result(None, folder, file, str(e)))
+            continue
+        if doc_type:
+            groups.setdefault(doc_type, []).append(file)
+        else:
+            results.append(failed_result(None, folder, file, "document type not recognized"))
+    classify_time = (time.perf_counter() - started) / max(1, len(files))
+    shared = add_timings(take_timings(), waited)
+
+    for doc_type, group in groups.items():
+        results += process_chunk(doc_type, folder, group, poppler_path, rungs[doc_type], learn.get(doc_type, 0),
+                                 (text_layers, hashes))
+    for result in results:
+        result["classify_time"] = classify_time
+        result["timings"] = add_timings(result.get("timings") or {}, shared, 1 / len(files))
+    return results
+
+def format_manual_value(mode, value):
+    # Clerks often type just the digits of a SARO number
+    value = value.strip()
+    if mode == "SARO" and not value.upper().startswith(("SARO-", "A-")):
+        value = "A-" + value
+    return value
+
+def rename_pdf(folder, file, path, value):
+    # Returns (renamed, summary or skipped message)
+    new_name = f"{value}.pdf"
+    new_path = os.path.join(folder, new_name)
+    if os.path.exists(new_path):
+        return False, f"{file} (already exists as {new_name})"
+    os.rename(path, new_path)
+    return True, f"{file} ➔ {new_name}"
+
+def apply_renames(folder, mode, entries):
+    """
+    Bulk-apply manual entries from the review queue.
+    entries is a list of (review item, typed value); blank values are skipped.
+    """
+    renamed, skipped, summary = 0, [], []
+    for item, value in entries:
+        file = item["file"]
+        if not value or not value.strip():
+            skipped.append(f"{file} ({mode} number not found)")
+            continue
+        try:
+            ok, message = rename_pdf(folder, file, item["path"], format_manual_value(mode, value))
+        except Exception as e:
+            skipped.append(f"{file} (error: {e})")
+            continue
+        if ok:
+            renamed += 1
+            summary.append(message)
+        else:
+            skipped.append(message)
+    return renamed, skipped, summary
+
+
+class RenameEngine:
+    """
+    Runs process_pdf over a batch of files on a process pool and yields the
+    results in completion order. Files are handed out in chunks (process_chunk)
+    so each worker can OCR its scans in one tesseract run; chunks are kept
+    small enough that every worker gets some. In AUTO mode each chunk is
+    classified first (classify_chunk) and every file is read as its own
+    type. Renaming itself stays with the caller.
+    With keep_pool the pool outlives results(), so a folder watch can run
+    batch after batch (results(pdf_files)) without starting processes and
+    loading models each time; close() shuts it down.
+    """
+
+    def __init__(self, mode, folder, pdf_files, poppler_path, workers=None, keep_pool=False):
+        self.mode = mode
+        self.folder = folder
+        self.pdf_files = pdf_files
+        self.poppler_path = poppler_path
+        self.workers = workers or get_worker_count()
+        self.keep_pool = keep_pool
+        self.ladder = DpiLadder()
+        self.templates = get_templates()
+        self._executor = None
+        self._cancel = False
+
+    def results(self, pdf_files=None):
+        # pdf_files replaces the batch, e.g. with a watched folder's next arrivals
+        if pdf_files is not None:
+            self.pdf_files = pdf_files
+        if self._cancel or not self.pdf_files:
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers if self.keep_pool else max(1, min(self.workers, len(self.pdf_files))),
+                initializer=init_worker,
+                initargs=(pytesseract.pytesseract.tesseract_cmd,),
+            )
+        executor, broken = self._executor, False
+        try:
+            size = max(1, min(get_ocr_batch_size(), math.ceil(len(self.pdf_files) / self.workers)))
+            types = DOC_TYPES if self.mode == AUTO else (self.mode,)
+            # Ask for a few spare samples, as not every page locates its fields
+            learn = {doc_type: self.templates.samples_needed(doc_type) * 2 for doc_type in types}
+            futures = {}
+            for start in range(0, len(self.pdf_files), size):
+                chunk = self.pdf_files[start:start + size]
+                # A chunk explores from the bottom rung if any of its files is due to
+                explore = any(i % EXPLORE_EVERY == 0 for i in range(start, start + len(chunk)))
+                rungs = {doc_type: self.ladder.rungs(doc_type, explore=explore) for doc_type in types}
+                if self.mode == AUTO:
+                    future = executor.submit(classify_chunk, self.folder, chunk, self.poppler_path, rungs, learn,
+                                                   time.time())
+                else:
+                    future = executor.submit(process_chunk, self.mode, self.folder, chunk, self.poppler_path,
+                                                   rungs[self.mode], learn[self.mode], submitted=time.time())
+                learn = {doc_type: max(0, count - len(chunk)) for doc_type, count in learn.items()}
+                futures[future] = chunk
+            for future in as_completed(futures):
+                if self._cancel:
+                    return
+                if future.cancelled():
+                    continue
+                try:
+                    results = future.result()
+                except Exception as e:
+                    broken = broken or isinstance(e, BrokenProcessPool)
+                    mode = None if self.mode == AUTO else self.mode
+                    results = [failed_result(mode, self.folder, file, str(e)) for file in futures[future]]
+                for result in results:
+                    mode = result["mode"]
+                    if mode:
+                        self.ladder.record(mode, result["dpi"])
+                        if result["sample"]:
+                            self.templates.add_sample(mode, result["sample"])
+                    yield result
+        finally:
+            # A broken pool is replaced on the next batch
+            if not self.keep_pool or broken or self._cancel:
+                self.close()
+            self.ladder.save()
+            self.templates.save()
+
+    def cancel(self):
+        # Safe to call from any thread; pending files are dropped, running ones finish on their own
+        self._cancel = True
+        self.close()
+
+    def close(self):
+        executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,116 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Where a batch spends its time: waiting for a pool worker, poppler (pages
+# and text layers), tesseract, field parsing, renaming on disk, the job
+# journal and the UI thread
+STAGES = ("queue", "render", "ocr", "parse", "rename", "journal", "ui")
+STAGE_LABELS = {"queue": "Queue wait", "render": "Render", "ocr": "OCR", "parse": "Parse",
+                "rename": "Rename", "journal": "Journal", "ui": "UI"}
+# Upper bounds of the histogram buckets in ms; the last bucket is open-ended
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Per thread, so a worker thread in the UI process doesn't mix its timers with another's
+_local = threading.local()
+
+
+@contextmanager
+def timed(stage):
+    """
+    Add the time spent in the block to stage for this thread. Nested timers
+    take their time out of the enclosing one, e.g. a page rendered lazily
+    inside an OCR batch counts as render, not OCR.
+    """
+    if not hasattr(_local, "running"):
+        _local.running = []  # [stage, started] of the open timers
+    if not hasattr(_local, "totals"):
+        _local.totals = {}
+    running = _local.running
+    now = time.perf_counter()
+    if running:
+        outer = running[-1]
+        _local.totals[outer[0]] = _local.totals.get(outer[0], 0.0) + now - outer[1]
+    running.append([stage, now])
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        started = running.pop()[1]
+        _local.totals[stage] = _local.totals.get(stage, 0.0) + now - started
+        if running:
+            running[-1][1] = now
+
+def take_timings():
+    # Seconds per stage since the last call, then start over
+    timings = getattr(_local, "totals", {})
+    _local.totals = {}
+    return timings
+
+def add_timings(timings, extra, share=1.0):
+    for stage, seconds in extra.items():
+        timings[stage] = timings.get(stage, 0.0) + seconds * share
+    return timings
+
+
+class StageStats:
+    """
+    Per-batch totals and a latency histogram for each stage, fed one file's
+    timings at a time. add() may be called from the worker thread while the
+    UI thread reads summary().
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.files = 0
+        self.totals = {stage: 0.0 for stage in STAGES}
+        self.histograms = {stage: [0] * (len(BUCKETS_MS) + 1) for stage in STAGES}
+        self._lock = threading.Lock()
+
+    def add(self, timings, count_file=True):
+        with self._lock:
+            if count_file:
+                self.files += 1
+            for stage, seconds in timings.items():
+                if stage not in self.totals:
+                    continue
+                self.totals[stage] += seconds
+                self.histograms[stage][bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+
+    def median_ms(self, stage):
+        # Upper bound of the bucket holding the median, None for the open bucket
+        histogram = self.histograms[stage]
+        count, seen = sum(histogram), 0
+        for i, n in enumerate(histogram):
+            seen += n
+            if count and seen * 2 >= count:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else None
+        return 0
+
+    def summary(self):
+        # A few lines for the progress dialog, slowest stage first
+        with self._lock:
+            busy = sum(self.totals.values())
+            lines = []
+            for stage in sorted(STAGES, key=lambda s: -self.totals[s]):
+                seconds = self.totals[stage]
+                if not seconds:
+                    continue
+                median = self.median_ms(stage)
+                median = f"≤{median} ms" if median is not None else f">{BUCKETS_MS[-1]} ms"
+                lines.append(f"{STAGE_LABELS[stage]}: {seconds:.2f} s ({seconds * 100 / busy:.0f}%), "
+                             f"median {median}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "files": self.files,
+                "elapsed": round(time.perf_counter() - self.started, 3),
+                "buckets_ms": list(BUCKETS_MS),
+                "stages": {stage: {"seconds": round(self.totals[stage], 3),
+                                   "mean_ms": round(self.totals[stage] * 1000 / max(1, self.files), 1),
+                                   "histogram": list(self.histograms[stage])}
+                           for stage in STAGES},
+            }
@@ -0,0 +1,40 @@
+import re
+from PyPDF2 import PdfReader
+from core.pdf_render import poppler_command, run_poppler
+
+# Fewer letters/digits than this and the page is treated as a plain scan
+MIN_TEXT_CHARS = 20
+
+
+def extract_text_layer(pdf_path, first_page=1, last_page=1, poppler_path=None):
+    """
+    Return the embedded text of the given pages, or "" when the PDF has none.
+    Uses pdftotext -layout so lines come out in reading order like OCR output;
+    falls back to PyPDF2 if poppler can't be run. Pages are separated by form feeds.
+    """
+    try:
+        args = [poppler_command("pdftotext", poppler_path), "-layout", "-enc", "UTF-8"]
+        if first_page:
+            args += ["-f", str(first_page)]
+        if last_page:
+            args += ["-l", str(last_page)]
+        return run_poppler(args + [pdf_path, "-"]).decode("utf-8", errors="ignore")
+    except Exception as e:
+        print(f"pdftotext failed for {pdf_path}: {e}")
+
+    try:
+        pages = PdfReader(pdf_path).pages
+        start = (first_page or 1) - 1
+        end = last_page or len(pages)
+        return "\f".join(page.extract_text() or "" for page in pages[start:end])
+    except Exception as e:
+        print(f"Text layer read failed for {pdf_path}: {e}")
+        return ""
+
+def has_usable_text(text):
+    return len(re.findall(r"[A-Za-z0-9]", text or "")) >= MIN_TEXT_CHARS
+
+def get_text_layer(pdf_path, first_page=1, last_page=1, poppler_path=None):
+    # Embedded text if there is enough of it to parse, otherwise None so the caller OCRs
+    text = extract_text_layer(pdf_path, first_page, last_page, poppler_path)
+    return text if has_usable_text(text) else None
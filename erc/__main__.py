@@ -0,0 +1,6 @@
+import sys
+from erc.cli import main
+
+# Guarded, as pool processes on Windows re-import the main module
+if __name__ == "__main__":
+    sys.exit(main())
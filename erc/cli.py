@@ -0,0 +1,235 @@
+"""
+Headless batch runner: the rename, OBR extraction, split and merge jobs of
+the app without Qt, for unattended runs.
+
+    python -m erc batch rename --type obr|nca|saro|auto [--jobs N] [--output report.csv] DIR
+    python -m erc batch extract [--jobs N] [--output rows.xlsx] DIR
+    python -m erc batch split [--output-dir DIR] INPUT.pdf
+    python -m erc batch merge OUTPUT.pdf INPUT.pdf...
+
+Progress goes to stdout as JSON lines, one object per event ("start",
+"file", "page", "done"); everything else the pipeline prints goes to stderr.
+The "done" event of rename and extract has the batch's seconds per stage.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import pytesseract
+from core.doc_classifier import AUTO
+from core.job_journal import DONE_STATUSES, JobJournal
+from core.obr_extraction import OBR_COLUMNS, ExtractEngine
+from core.ocr_config import get_poppler_path, get_tesseract_path
+from core.pdf_ops import merge_files, split_pages
+from core.rename_engine import RenameEngine, rename_pdf
+from core.stage_timer import StageStats, add_timings, take_timings, timed
+
+RENAME_COLUMNS = ("File Name", "Type", "Number", "New Name", "Status", "Message")
+RENAME_TYPES = {"obr": "OBR", "nca": "NCA", "saro": "SARO", "auto": AUTO}
+
+_progress = sys.stdout
+
+
+def emit(event, **fields):
+    _progress.write(json.dumps({"event": event, **fields}) + "\n")
+    _progress.flush()
+
+def write_table(path, columns, rows):
+    # CSV or XLSX by extension, the same way the extractor's Save As does
+    import pandas as pd
+    df = pd.DataFrame(rows, columns=list(columns))
+    if path.lower().endswith(".xlsx"):
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+def list_pdfs(folder):
+    return sorted(f for f in os.listdir(folder) if f.lower().endswith(".pdf"))
+
+def open_journal(kind, folder, files, resume):
+    # (journal, files still to do); without resume any earlier journal is dropped
+    journal = JobJournal(kind, folder)
+    if resume:
+        done = journal.done(files)
+        return journal, [f for f in files if f not in done]
+    journal.finish()
+    return journal, files
+
+def stage_seconds(stats):
+    return {stage: values["seconds"] for stage, values in stats.to_dict()["stages"].items() if values["seconds"]}
+
+def setup_ocr(args):
+    tesseract_path = args.tesseract or get_tesseract_path()
+    if tesseract_path:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    # poppler on PATH (None) is the norm on Linux
+    return args.poppler or get_poppler_path()
+
+
+def batch_rename(args):
+    mode = RENAME_TYPES[args.type]
+    files = list_pdfs(args.folder)
+    journal, todo = open_journal(f"rename_{mode}", args.folder, files, args.resume)
+    rows = [[entry["file"], entry.get("type", ""), entry.get("value", ""), entry.get("new_name", ""),
+             entry["status"], entry["message"]] for entry in journal.entries.values()
+            if entry["file"] not in todo and entry["status"] in DONE_STATUSES]
+    engine = RenameEngine(mode, args.folder, todo, setup_ocr(args), workers=args.jobs)
+    emit("start", op="rename", type=mode, folder=args.folder, total=len(todo), resumed=len(files) - len(todo))
+
+    started, counts, stats = time.perf_counter(), {}, StageStats()
+    try:
+        for done, result in enumerate(engine.results(), start=1):
+            file, value, new_name = result["file"], result["value"], None
+            if result["error"]:
+                status, message = "error", result["error"]
+            elif not value:
+                # The GUI's review queue; here the suggestions go in the report
+                status, message = "unread", "; ".join(result["suggestions"])
+            elif args.dry_run:
+                status, message, new_name = "would_rename", "", f"{value}.pdf"
+            else:
+                new_name = f"{value}.pdf"
+                try:
+                    with timed("rename"):
+                        ok, message = rename_pdf(args.folder, file, result["path"], value)
+                    status = "renamed" if ok else "skipped"
+                except Exception as e:
+                    status, message = "error", str(e)
+            if not args.dry_run and status in ("renamed", "skipped", "error"):
+                # Unread files are left out, so a resumed run reads them again
+                path = os.path.join(args.folder, new_name) if status == "renamed" else None
+                with timed("journal"):
+                    journal.record(file, status, path, type=result["mode"], value=value,
+                                   new_name=new_name if status == "renamed" else None, message=message)
+            stats.add(add_timings(take_timings(), result.get("timings") or {}))
+            counts[status] = counts.get(status, 0) + 1
+            rows.append([file, result["mode"] or "", value or "", new_name or "", status, message])
+            emit("file", done=done, total=len(todo), file=file, type=result["mode"], value=value,
+                 new_name=new_name, status=status, message=message)
+    except KeyboardInterrupt:
+        engine.cancel()
+        journal.close()
+        emit("canceled", elapsed=round(time.perf_counter() - started, 3), counts=counts)
+        return 130
+    journal.finish()
+
+    if args.output:
+        write_table(args.output, RENAME_COLUMNS, rows)
+    elapsed = time.perf_counter() - started
+    emit("done", op="rename", elapsed=round(elapsed, 3), files_per_second=round(len(todo) / elapsed, 2) if elapsed else None,
+         counts=counts, output=args.output, stages=stage_seconds(stats))
+    return 1 if counts.get("error") else 0
+
+def batch_extract(args):
+    files = list_pdfs(args.folder)
+    journal, todo = open_journal("extract", args.folder, files, args.resume)
+    # Rows a resumed run already has
+    rows = {f: journal.entries[f]["row"] for f in files
+            if f not in todo and f in journal.entries and journal.entries[f]["status"] == "row"}
+    engine = ExtractEngine(args.folder, todo, setup_ocr(args), workers=args.jobs, ordered=not args.unordered)
+    emit("start", op="extract", folder=args.folder, total=len(todo), resumed=len(files) - len(todo))
+
+    started, errors, stats = time.perf_counter(), 0, StageStats()
+    try:
+        for done, result in enumerate(engine.results(), start=1):
+            with timed("journal"):
+                if result["error"]:
+                    journal.record(result["file"], "error", error=result["error"])
+                else:
+                    journal.record(result["file"], "row", row=result["row"])
+            stats.add(add_timings(take_timings(), result.get("timings") or {}))
+            if result["error"]:
+                errors += 1
+                emit("file", done=done, total=len(todo), file=result["file"], status="error", message=result["error"])
+            else:
+                rows[result["file"]] = result["row"]
+                emit("file", done=done, total=len(todo), file=result["file"], status="ok", dpi=result["dpi"])
+    except KeyboardInterrupt:
+        engine.cancel()
+        journal.close()
+        emit("canceled", elapsed=round(time.perf_counter() - started, 3))
+        return 130
+    journal.finish()
+
+    output = args.output or os.path.join(args.folder, "obr_extraction.csv")
+    # Folder order, whichever run and worker each row came from
+    write_table(output, OBR_COLUMNS, [rows[f] + [""] * (len(OBR_COLUMNS) - len(rows[f])) for f in files if f in rows])
+    elapsed = time.perf_counter() - started
+    emit("done", op="extract", elapsed=round(elapsed, 3), files_per_second=round(len(todo) / elapsed, 2) if elapsed else None,
+         rows=len(rows), errors=errors, output=output, stages=stage_seconds(stats))
+    return 1 if errors else 0
+
+def batch_split(args):
+    output_dir = args.output_dir or os.path.splitext(args.input)[0] + "_pages"
+    emit("start", op="split", input=args.input, output_dir=output_dir)
+    started, pages = time.perf_counter(), 0
+    for page, total, path in split_pages(args.input, output_dir):
+        pages = page
+        emit("page", done=page, total=total, output=path)
+    emit("done", op="split", elapsed=round(time.perf_counter() - started, 3), pages=pages)
+    return 0
+
+def batch_merge(args):
+    emit("start", op="merge", inputs=args.inputs, output=args.output)
+    started = time.perf_counter()
+    merge_files(args.inputs, args.output)
+    emit("done", op="merge", elapsed=round(time.perf_counter() - started, 3), output=args.output)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m erc", description="ERC Utility batch jobs without the GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+    batch = commands.add_parser("batch", help="run a batch job")
+    jobs = batch.add_subparsers(dest="job", required=True)
+
+    def ocr_options(job):
+        job.add_argument("folder", help="folder of PDFs")
+        job.add_argument("--jobs", "-j", type=int, default=None,
+                         help="OCR processes (default: worker_count from ocr_config.json, else one per core)")
+        job.add_argument("--output", "-o", help="write results to this .csv or .xlsx")
+        job.add_argument("--resume", action="store_true", help="continue an unfinished batch on this folder")
+        job.add_argument("--tesseract", help="tesseract executable (default: ocr_config.json, else PATH)")
+        job.add_argument("--poppler", help="poppler bin folder (default: ocr_config.json, else PATH)")
+
+    rename = jobs.add_parser("rename", help="rename PDFs by their OBR/NCA/SARO number")
+    rename.add_argument("--type", "-t", choices=sorted(RENAME_TYPES), required=True)
+    rename.add_argument("--dry-run", action="store_true", help="read the numbers but rename nothing")
+    ocr_options(rename)
+    rename.set_defaults(run=batch_rename)
+
+    extract = jobs.add_parser("extract", help="extract OBR rows to CSV/XLSX")
+    extract.add_argument("--unordered", action="store_true", help="report files as they finish, not in folder order")
+    ocr_options(extract)
+    extract.set_defaults(run=batch_extract)
+
+    split = jobs.add_parser("split", help="split a PDF into one file per page")
+    split.add_argument("input")
+    split.add_argument("--output-dir", help="default: <input>_pages next to the input")
+    split.set_defaults(run=batch_split)
+
+    merge = jobs.add_parser("merge", help="merge PDFs in the order given")
+    merge.add_argument("output")
+    merge.add_argument("inputs", nargs="+")
+    merge.set_defaults(run=batch_merge)
+    return parser
+
+def main(argv=None):
+    global _progress
+    args = build_parser().parse_args(argv)
+    if getattr(args, "folder", None) and not os.path.isdir(args.folder):
+        print(f"Not a folder: {args.folder}", file=sys.stderr)
+        return 2
+    # Keep stdout for the JSON lines: anything else written to it, including by
+    # pool processes and subprocesses, is sent to stderr instead
+    sys.stdout.flush()
+    _progress = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    try:
+        return args.run(args)
+    except Exception as e:
+        emit("error", message=str(e))
+        return 1
+    finally:
+        _progress.flush()
@@ -1,9 +1,9 @@
 import sys
 import os
 import pytesseract
-from pdf2image import convert_from_path
 import json
 import time
+import multiprocessing
 from PyQt5.QtWidgets import QApplication, QMessageBox
 from ui_pages.main_window import PDFUtilityTool
 from ui_pages.login_page import LoginPage
@@ -68,4 +68,6 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    # Required for the OCR process pool in the PyInstaller build
+    multiprocessing.freeze_support()
     main()
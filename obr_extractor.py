@@ -1,23 +1,33 @@
 import os
-import re
 import sys
+import time
+import threading
 import pytesseract
 import pandas as pd
 import cv2
 import numpy as np
-from core.logger import log_action
+from core.logger import log_action, log_metrics
+from core.ocr_cache import DEFAULT_DPI, file_hash, get_cache, words_in_rect
+from core.dpi_ladder import DPI_LADDER
+from core.obr_extraction import OBR_COLUMNS, ExtractEngine
+from core.job_journal import JobJournal
+from core.stage_timer import StageStats, add_timings, take_timings, timed
+from core.ocr_engine import image_to_text
 import csv
 import json
-from pdf2image import convert_from_path
+from core.pdf_render import RGB, render_page
+from core.ocr_config import get_poppler_path
 from PIL import Image
+from ui_pages.obr_table_model import ObrTableModel, TotalsModel
+from ui_pages.watch_dialog import EXTRACT, WatchWorker
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QFileDialog, QTableWidget, QTableWidgetItem, QVBoxLayout,
+    QApplication, QMainWindow, QFileDialog, QTableView, QVBoxLayout,
     QPushButton, QWidget, QHBoxLayout, QLineEdit, QMenu, QMessageBox, QProgressDialog,
     QHeaderView, QGraphicsScene, QGraphicsView, QGraphicsPixmapItem,
-    QRubberBand, QDialog, QLabel, QTextEdit, QAbstractItemView
+    QRubberBand, QDialog, QLabel, QTextEdit, QAbstractItemView, QCheckBox, QListWidget, QUndoStack
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QObject, QRect, QSize, QPoint
-from PyQt5.QtGui import QPixmap, QImage, QColor, QIcon, QKeySequence
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal, QObject, QRect, QSize, QPoint
+from PyQt5.QtGui import QPixmap, QImage, QIcon, QKeySequence
 
 
 
@@ -60,12 +70,14 @@ class CropGraphicsView(QGraphicsView):
         super().mouseReleaseEvent(event)
 
 class PDFCropViewer(QDialog):
-    def __init__(self, pil_image, callback):
+    def __init__(self, pil_image, callback, words=None):
         super().__init__()
         self.setWindowTitle("Select Area to Extract")
         self.setGeometry(200, 100, 1000, 800)
         self.original_pil_image = pil_image
         self.callback = callback
+        # Cached word boxes for this page, if the page was OCR'd during extraction
+        self.words = words
 
         pixmap = pil_to_pixmap(pil_image)
         self.view = CropGraphicsView(pixmap, self.extract_crop_text)
@@ -77,27 +89,58 @@ class PDFCropViewer(QDialog):
     def extract_crop_text(self, rect_coords):
         try:
             x1, y1, x2, y2 = map(int, rect_coords)
-            cropped = self.original_pil_image.crop((x1, y1, x2, y2))
-            text = pytesseract.image_to_string(cropped, lang="eng", config="--psm 6")
+            text = words_in_rect(self.words, (x1, y1, x2, y2)) if self.words else ""
+            if not text.strip():
+                cropped = self.original_pil_image.crop((x1, y1, x2, y2))
+                text = image_to_text(cropped, config="--psm 6")
             self.callback(text.strip())
         except Exception as e:
             QMessageBox.warning(self, "OCR Error", str(e))
         self.accept()
 
+# Extracted rows reach the table in batches: whatever arrived in the last
+# ROW_BATCH_MS, or sooner once ROW_BATCH_SIZE rows are waiting
+ROW_BATCH_SIZE = 200
+ROW_BATCH_MS = 250
+# Search runs once typing pauses for this long
+SEARCH_DELAY_MS = 200
+
 class ExtractWorker(QObject):
+    """
+    Runs ExtractEngine from a QThread. Rows arrive in folder order when
+    ordered, otherwise as each file finishes. They and any errors are held
+    until the UI thread collects them with take_results(), on a timer or when
+    rows_ready says a full batch is waiting. Each outcome goes to the batch's
+    JobJournal, which is removed once the batch completes. Per-stage timings
+    go to stats.
+    """
     finished = pyqtSignal()
-    error = pyqtSignal(str)
-    progress = pyqtSignal(int, str)
-    result = pyqtSignal(list)
+    rows_ready = pyqtSignal()
 
-    def __init__(self, folder, files):
+    def __init__(self, folder, files, ordered=True, journal=None):
         super().__init__()
         self.folder = folder
         self.files = files
+        self.ordered = ordered
+        self.journal = journal
+        self.engine = None
+        self.stats = StageStats()
         self._is_running = True
+        self._lock = threading.Lock()
+        self._rows, self._errors, self._done, self._last_file = [], [], 0, ""
+
+    def take_results(self):
+        # (rows, error messages, files done, last file) since the last call
+        with self._lock:
+            rows, errors = self._rows, self._errors
+            self._rows, self._errors = [], []
+            return rows, errors, self._done, self._last_file
 
     def cancel(self):
+        # Connected with Qt.DirectConnection, so this runs on the UI thread while run() is busy
         self._is_running = False
+        if self.engine:
+            self.engine.cancel()
 
     def run(self):
         from core.ocr_config import get_poppler_path, get_tesseract_path
@@ -105,75 +148,71 @@ class ExtractWorker(QObject):
         tesseract_path = get_tesseract_path()
         if tesseract_path:
             pytesseract.pytesseract.tesseract_cmd = tesseract_path
-        
-        for i, filename in enumerate(self.files):
+        self.engine = ExtractEngine(self.folder, self.files, poppler_path, ordered=self.ordered)
+        if not self._is_running:
+            self.engine.cancel()
+
+        for done, result in enumerate(self.engine.results(), start=1):
             if not self._is_running:
                 break
-            try:
-                self.progress.emit(i, filename)
-                image = convert_from_path(os.path.join(self.folder, filename), poppler_path=poppler_path)[0]
-                text = pytesseract.image_to_string(image, lang="eng", config="--psm 6")
-                serial = os.path.splitext(filename)[0]
-
-                date_match = re.search(r"(?:Date\s*[:\-]?\s*)([A-Za-z]+\s+\d{1,2},\s+\d{4})", text, re.IGNORECASE)
-                date = date_match.group(1) if date_match else ""
-
-                payee = ""
-                lines = text.split("\n")
-                for i, line in enumerate(lines):
-                    match = re.search(r"Payee\s*[:\-]?\s*(.+)", line, re.IGNORECASE)
-                    if match and match.group(1).strip():
-                        payee = match.group(1).strip()
-                        break
-                    if re.match(r"^\s*Payee\s*[:\-]?\s*$", line, re.IGNORECASE) and i + 1 < len(lines):
-                        next_line = lines[i + 1].strip()
-                        if next_line:
-                            payee = next_line
-                            break
-
-                particulars_lines = []
-                is_collecting = False
-                blank_line_count = 0
-
-                for line in lines:
-                    stripped = line.strip()
-                    lower = stripped.lower()
-                    if not is_collecting and "to obligate" in lower:
-                        match = re.search(r"(To obligate.*)", stripped, re.IGNORECASE)
-                        if match:
-                            particulars_lines.append(match.group(1).strip())
-                            is_collecting = True
-                        continue
-
-                    if is_collecting:
-                        if any(kw in lower for kw in ["certified", "signature", "position", "printed name", "head", "date:", "status of obligation"]):
-                            break
-                        if not stripped:
-                            blank_line_count += 1
-                            if blank_line_count >= 2:
-                                break
-                            continue
-                        else:
-                            blank_line_count = 0
-                            particulars_lines.append(stripped)
-
-                full_particulars = " ".join(particulars_lines)
-                cleaned = re.split(r"\s+\d{10,}|\s+\d{3,}\.\d{2}|\|\s*\d+", full_particulars)[0].strip()
-
-                total_match = re.search(r"Total\s*[:\s]*([\d,]+\.\d{2})", text)
-                if total_match:
-                    total_amount = f"{float(total_match.group(1).replace(',', '')):,.2f}"
+            if self.journal:
+                with timed("journal"):
+                    if result["error"]:
+                        self.journal.record(result["file"], "error", error=result["error"])
+                    else:
+                        self.journal.record(result["file"], "row", row=result["row"])
+            self.stats.add(add_timings(take_timings(), result.get("timings") or {}))
+            with self._lock:
+                if result["error"]:
+                    self._errors.append(f"{result['file']}: {result['error']}")
                 else:
-                    amounts = [float(a.replace(",", "")) for a in re.findall(r"(\d{1,3}(?:,\d{3})*\.\d{2})", text)]
-                    total_amount = f"{sum(amounts):,.2f}"
+                    self._rows.append(result["row"])
+                self._done, self._last_file = done, result["file"]
+                full = len(self._rows) == ROW_BATCH_SIZE
+            if full:
+                self.rows_ready.emit()
+
+        if self.journal:
+            # A canceled batch keeps its journal so the next run can resume
+            if self._is_running:
+                self.journal.finish()
+            else:
+                self.journal.close()
+        self.finished.emit()
 
-                row_data = [filename, serial, date, payee, cleaned, total_amount, "", "", total_amount]
-                self.result.emit(row_data)
+class ErrorPanel(QWidget):
+    """
+    Files that failed to extract, listed under the table instead of one
+    message box each, so a batch never stops to wait for OK. Hidden while empty.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title = QLabel()
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear)
+        self.list = QListWidget()
+        self.list.setFixedHeight(100)
+
+        header = QHBoxLayout()
+        header.addWidget(self.title)
+        header.addStretch()
+        header.addWidget(clear_button)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(header)
+        layout.addWidget(self.list)
+        self.setLayout(layout)
+        self.hide()
 
-            except Exception as e:
-                self.error.emit(f"Failed to process {filename}: {e}")
+    def add_errors(self, messages):
+        self.list.addItems(messages)
+        self.title.setText(f"⚠ {self.list.count()} file(s) failed to extract")
+        self.show()
 
-        self.finished.emit()
+    def clear(self):
+        self.list.clear()
+        self.hide()
 
 CONFIG_FILE = "theme_config.json"
 
@@ -196,34 +235,55 @@ class PDFExtractor(QMainWindow):
         self.setGeometry(100, 100, 1600, 900)
         self.folder_path = ""
         self.edit_log = []
-        self.undo_stack = []
-        self.redo_stack = []
+        self.undo_stack = QUndoStack(self)
 
-        self.columns = ["File Name", "Serial No.", "Date", "Payee", "Particulars",
-                        "Total Amount", "Payment", "Tax", "Balance", "Remarks"]
+        self.columns = list(OBR_COLUMNS)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(len(self.columns))
-        self.table.setHorizontalHeaderLabels(self.columns)
+        # The view only paints the visible rows, so rows keep a fixed height
+        # instead of being resized to their contents
+        self.model = ObrTableModel(self.columns)
+        self.model.undo_stack = self.undo_stack
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
         header = self.table.horizontalHeader()
         header.setStretchLastSection(True)
         header.setSectionResizeMode(QHeaderView.Stretch)
 
         self.table.setSortingEnabled(True)
+        self.table.sortByColumn(-1, Qt.AscendingOrder)
         self.table.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked)
-        self.table.itemChanged.connect(self.log_edit)
-        self.table.itemChanged.connect(self.recalculate_totals)
+        self.model.cells_edited.connect(self.log_edit)
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.open_context_menu)
         self.table.setSelectionBehavior(QAbstractItemView.SelectItems)
 
+        # The TOTAL row, pinned under the table and lined up with its columns
+        self.total_view = QTableView()
+        self.total_view.setModel(TotalsModel(self.model, self))
+        self.total_view.horizontalHeader().hide()
+        self.total_view.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.total_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.total_view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.total_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.total_view.setFixedHeight(self.total_view.verticalHeader().defaultSectionSize()
+                                       + 2 * self.total_view.frameWidth())
+        header.sectionResized.connect(lambda col, old, new: self.total_view.setColumnWidth(col, new))
+        self.table.verticalHeader().geometriesChanged.connect(self.sync_total_view)
+        self.table.horizontalScrollBar().valueChanged.connect(self.total_view.horizontalScrollBar().setValue)
+
         self.entry = QLineEdit()
         self.entry.setPlaceholderText("Folder path...")
 
         self.search_entry = QLineEdit()
         self.search_entry.setPlaceholderText("Search table...")
-        self.search_entry.textChanged.connect(self.search_table)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(lambda: self.search_table(self.search_entry.text()))
+        self.search_entry.textChanged.connect(self.search_timer.start)
 
         self.theme_toggle = QPushButton()
         self.theme_toggle.setCheckable(True)
@@ -238,6 +298,17 @@ class PDFExtractor(QMainWindow):
         extract_button = QPushButton("Start Extraction")
         extract_button.clicked.connect(self.extract_pdfs)
 
+        self.keep_order = QCheckBox("Keep folder order")
+        self.keep_order.setChecked(True)
+        self.keep_order.setToolTip("Unchecked, rows appear as soon as each file is done")
+
+        self.watch_new = QCheckBox("Watch for new files")
+        self.watch_new.setToolTip("Keep adding rows as new PDFs are dropped into the folder")
+        self.watch_new.toggled.connect(self.toggle_watch)
+        self.watch_thread = self.watch_worker = None
+        self.stopping_watches = []  # (thread, worker) of stopped watches still winding down
+        self.closing = False
+
         save_button = QPushButton("Save As")
         save_button.clicked.connect(self.save_as)
 
@@ -254,10 +325,18 @@ class PDFExtractor(QMainWindow):
         self.log_output.setReadOnly(True)
         self.log_output.setFixedHeight(100)
 
+        self.error_panel = ErrorPanel()
+
+        self.drain_timer = QTimer(self)
+        self.drain_timer.setInterval(ROW_BATCH_MS)
+        self.drain_timer.timeout.connect(self.drain_worker)
+
         top_row1 = QHBoxLayout()
         top_row1.addWidget(self.entry)
         top_row1.addWidget(browse_button)
         top_row1.addWidget(extract_button)
+        top_row1.addWidget(self.keep_order)
+        top_row1.addWidget(self.watch_new)
         top_row1.addWidget(open_button)
         top_row1.addWidget(save_button)
 
@@ -275,6 +354,8 @@ class PDFExtractor(QMainWindow):
         layout = QVBoxLayout()
         layout.addLayout(top_layout)
         layout.addWidget(self.table)
+        layout.addWidget(self.total_view)
+        layout.addWidget(self.error_panel)
         layout.addWidget(self.log_output)
 
         container = QWidget()
@@ -287,6 +368,13 @@ class PDFExtractor(QMainWindow):
         # Keyboard shortcuts for copy/paste
         self.table.installEventFilter(self)
 
+    def sync_total_view(self, *args):
+        # Row numbers widen the table's vertical header as rows are added
+        row_header = self.table.verticalHeader()
+        self.total_view.verticalHeader().setFixedWidth(max(row_header.minimumWidth(), row_header.sizeHint().width()))
+        for col in range(self.model.columnCount()):
+            self.total_view.setColumnWidth(col, self.table.columnWidth(col))
+
     def eventFilter(self, source, event):
         if event.type() == event.KeyPress:
             if event.matches(QKeySequence.Copy):
@@ -298,85 +386,52 @@ class PDFExtractor(QMainWindow):
         return super().eventFilter(source, event)
     
     def copy_selection(self):
-        selection = self.table.selectedRanges()
+        # Tab-separated rows, built in one pass
+        selection = self.table.selectionModel().selection()
         if selection:
-            text = ""
-            for range_ in selection:
-                for row in range(range_.topRow(), range_.bottomRow() + 1):
-                    row_data = []
-                    for col in range(range_.leftColumn(), range_.rightColumn() + 1):
-                        item = self.table.item(row, col)
-                        row_data.append(item.text() if item else "")
-                    text += "\t".join(row_data) + "\n"
-            QApplication.clipboard().setText(text)
+            rows = self.model.rows
+            lines = ["\t".join(rows[row].cells[range_.left():range_.right() + 1])
+                     for range_ in selection for row in range(range_.top(), range_.bottom() + 1)]
+            QApplication.clipboard().setText("\n".join(lines) + "\n")
 
     def paste_to_selection(self):
-        start_row = self.table.currentRow()
-        start_col = self.table.currentColumn()
-        text = QApplication.clipboard().text()
-        for i, line in enumerate(text.splitlines()):
-            for j, val in enumerate(line.split("\t")):
-                row = start_row + i
-                col = start_col + j
-                if row < self.table.rowCount() and col < self.table.columnCount():
-                    old = self.table.item(row, col).text() if self.table.item(row, col) else ""
-                    self.undo_stack.append((row, col, old))
-                    item = QTableWidgetItem(val)
-                    item.setTextAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-                    self.table.setItem(row, col, item)
-
-    def log_edit(self, item):
-        row, col = item.row(), item.column()
-        text = item.text()
-        old = getattr(item, 'old_text', '')
-        self.edit_log.append((row, col, old, text))
-        self.undo_stack.append((row, col, old))
-        self.log_output.append(f"[{self.user}] Edited (Row {row+1}, Col {col+1}): '{old}' → '{text}'")
-        item.old_text = text
+        current = self.table.currentIndex()
+        if not current.isValid():
+            return
+        start_row, start_col = current.row(), current.column()
+        rows, columns = self.model.rowCount(), self.model.columnCount()
+        edits = []
+        for i, line in enumerate(QApplication.clipboard().text().splitlines()):
+            if start_row + i >= rows:
+                break
+            for j, val in enumerate(line.split("\t")[:columns - start_col]):
+                edits.append((start_row + i, start_col + j, val))
+        # One undo step and one recalculation for the whole block
+        self.model.edit_cells(edits, f"paste of {len(edits)} cells at (Row {start_row + 1}, Col {start_col + 1})")
+
+    def log_edit(self, changes):
+        self.edit_log.extend(changes)
+        if len(changes) == 1:
+            row, col, old, text = changes[0]
+            self.log_output.append(f"[{self.user}] Edited (Row {row+1}, Col {col+1}): '{old}' → '{text}'")
+        else:
+            text = self.undo_stack.undoText()
+            self.log_output.append(f"[{self.user}] {text[:1].upper()}{text[1:]}")
 
     def undo_edit(self):
-        if not self.undo_stack:
+        if not self.undo_stack.canUndo():
             return
-        row, col, old = self.undo_stack.pop()
-        current = self.table.item(row, col).text() if self.table.item(row, col) else ""
-        self.redo_stack.append((row, col, current))
-        item = QTableWidgetItem(old)
-        item.setTextAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-        item.old_text = old
-        self.table.blockSignals(True)
-        self.table.setItem(row, col, item)
-        self.table.blockSignals(False)
-        self.log_output.append(f"Undo (Row {row+1}, Col {col+1}): → '{old}'")
+        self.log_output.append(f"Undo {self.undo_stack.undoText()}")
+        self.undo_stack.undo()
 
     def redo_edit(self):
-        if not self.redo_stack:
+        if not self.undo_stack.canRedo():
             return
-        row, col, text = self.redo_stack.pop()
-        old = self.table.item(row, col).text() if self.table.item(row, col) else ""
-        self.undo_stack.append((row, col, old))
-        item = QTableWidgetItem(text)
-        item.setTextAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-        item.old_text = text
-        self.table.blockSignals(True)
-        self.table.setItem(row, col, item)
-        self.table.blockSignals(False)
-        self.log_output.append(f"Redo (Row {row+1}, Col {col+1}): → '{text}'")
+        self.log_output.append(f"Redo {self.undo_stack.redoText()}")
+        self.undo_stack.redo()
 
     def search_table(self, text):
-        text = text.lower()
-        for row in range(self.table.rowCount()):
-            row_matches = False
-            for col in range(self.table.columnCount()):
-                item = self.table.item(row, col)
-                if item and text in item.text().lower():
-                    row_matches = True
-
-            for col in range(self.table.columnCount()):
-                item = self.table.item(row, col)
-                if not item:
-                    item = QTableWidgetItem("")
-                    self.table.setItem(row, col, item)
-                item.setBackground(QColor("cyan") if row_matches and text else Qt.white) 
+        self.model.set_search(text)
 
     def toggle_dark_mode(self):
         dark = self.theme_toggle.isChecked()
@@ -391,7 +446,7 @@ class PDFExtractor(QMainWindow):
                 color: #dcddde;
                 font-size: 14px;
             }
-            QLineEdit, QTableWidget, QTextEdit {
+            QLineEdit, QTableView, QTextEdit {
                 background-color: #202225;
                 border: 1px solid #444;
                 color: #dcddde;
@@ -402,7 +457,7 @@ class PDFExtractor(QMainWindow):
                 padding: 4px;
                 border: 1px solid #444;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3a3c40;
             }
             QPushButton {
@@ -449,151 +504,174 @@ class PDFExtractor(QMainWindow):
             self.entry.setText(path)
 
     def extract_pdfs(self):
-        try:
-            self.table.itemChanged.disconnect(self.recalculate_totals)
-        except:
-            pass
-            log_action(self.user, "Started PDF Extraction", os.listdir(self.folder_path))
-        
-
-        self.table.setRowCount(0)
+        self.model.clear()
+        self.error_panel.clear()
         folder = self.folder_path or self.entry.text()
         if not os.path.isdir(folder):
             QMessageBox.critical(self, "Error", "Invalid folder path.")
             return
 
-        pdf_files = [f for f in os.listdir(folder) if f.lower().endswith(".pdf")]
+        pdf_files = sorted(f for f in os.listdir(folder) if f.lower().endswith(".pdf"))
+        if self.watch_new.isChecked():
+            # Anything not in the listing, even if dropped in before the watch starts, is the watch's
+            self.stop_watch()
+            self.start_watch(folder, pdf_files)
         if not pdf_files:
             QMessageBox.information(self, "No PDFs", "No PDF files found.")
             return
+        log_action(self.user, "Started PDF Extraction", pdf_files)
+
+        journal = JobJournal("extract", folder)
+        if journal.entries:
+            done = journal.done(pdf_files)
+            answer = QMessageBox.question(
+                self, "Resume Extraction",
+                f"A previous extraction of this folder did not finish ({len(done)} files done).\n\n"
+                "Resume where it stopped? Choose No to start over.",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+            if answer == QMessageBox.Yes:
+                # Rows from the first run go in first, in folder order
+                self.model.append_rows([journal.entries[file]["row"] for file in pdf_files
+                                        if file in done and journal.entries[file]["status"] == "row"])
+                pdf_files = [f for f in pdf_files if f not in done]
+            else:
+                journal.finish()
 
-        self.progress_dialog = QProgressDialog("Extracting PDFs...", None, 0, len(pdf_files), self)
+        self.progress_dialog = QProgressDialog("Extracting PDFs...", "Cancel", 0, len(pdf_files), self)
         self.progress_dialog.setWindowTitle("Please Wait")
         self.progress_dialog.setWindowModality(Qt.WindowModal)
         self.progress_dialog.setMinimumDuration(0)
 
         self.thread = QThread()
-        self.worker = ExtractWorker(folder, pdf_files)
+        self.worker = ExtractWorker(folder, pdf_files, ordered=self.keep_order.isChecked(), journal=journal)
         self.worker.moveToThread(self.thread)
 
-        self.worker.progress.connect(lambda i, name: (
-            self.progress_dialog.setValue(i),
-            self.progress_dialog.setLabelText(f"Processing {name} ({i+1}/{len(pdf_files)})")
-        ))
-        self.worker.result.connect(self.add_row)
-        self.worker.error.connect(lambda msg: QMessageBox.critical(self, "Error", msg))
+        stats = self.worker.stats
+        self.worker.rows_ready.connect(self.drain_worker)
+        # Collect the last rows before the dialog goes
+        self.worker.finished.connect(self.drain_worker)
+        self.worker.finished.connect(self.drain_timer.stop)
         self.worker.finished.connect(self.thread.quit)
         self.worker.finished.connect(self.progress_dialog.close)
-        self.worker.finished.connect(self.update_total_row)
-        self.worker.finished.connect(lambda: self.table.itemChanged.connect(self.recalculate_totals))
-        self.progress_dialog.canceled.connect(self.worker.cancel)
+        self.worker.finished.connect(lambda: log_metrics(self.user, "OBR extraction", stats.to_dict()))
+        self.progress_dialog.canceled.connect(self.worker.cancel, Qt.DirectConnection)
 
         self.thread.started.connect(self.worker.run)
         self.thread.start()
+        self.drain_timer.start()
+
+    def drain_worker(self):
+        # One range insert for every row the worker has ready, errors to the panel
+        rows, errors, done, name = self.worker.take_results()
+        if rows:
+            started = time.perf_counter()
+            self.model.append_rows(rows)
+            self.worker.stats.add({"ui": time.perf_counter() - started}, count_file=False)
+        if errors:
+            self.error_panel.add_errors(errors)
+        if done and self.progress_dialog.isVisible():
+            self.progress_dialog.setValue(done)
+            self.progress_dialog.setLabelText(f"Processed {name} ({done}/{self.progress_dialog.maximum()})\n\n"
+                                              f"{self.worker.stats.summary()}")
+
+    def toggle_watch(self, enabled):
+        self.stop_watch()
+        if not enabled:
+            return
+        folder = self.folder_path or self.entry.text()
+        if not os.path.isdir(folder):
+            QMessageBox.critical(self, "Error", "Invalid folder path.")
+            self.watch_new.setChecked(False)
+            return
+        self.start_watch(folder)
+
+    def start_watch(self, folder, seen=None):
+        thread, worker = QThread(), WatchWorker(folder, EXTRACT, get_poppler_path(), seen)
+        worker.moveToThread(thread)
+        worker.log.connect(self.log_output.append)
+        worker.row.connect(self.add_watched_row)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(lambda: self.watch_ended(thread, worker))
+        thread.started.connect(worker.run)
+        thread.start()
+        self.watch_thread, self.watch_worker = thread, worker
+
+    def stop_watch(self):
+        # Doesn't wait for the thread; it is kept until its finished signal (watch_ended)
+        if self.watch_worker:
+            self.watch_worker.stop()
+            self.stopping_watches.append((self.watch_thread, self.watch_worker))
+            self.watch_thread = self.watch_worker = None
+
+    def watch_ended(self, thread, worker):
+        if (thread, worker) in self.stopping_watches:
+            self.stopping_watches.remove((thread, worker))
+        elif worker is self.watch_worker:
+            self.watch_thread = self.watch_worker = None
+        if self.closing and not self.stopping_watches:
+            self.close()
+
+    def add_watched_row(self, data):
+        # Rows a stopped watch sent before it noticed belong to the previous folder or run
+        if self.sender() is self.watch_worker:
+            self.add_row(data)
+
+    def closeEvent(self, event):
+        self.stop_watch()
+        if self.stopping_watches:
+            # Closes for real from watch_ended, once the watch threads are done
+            self.closing = True
+            event.ignore()
+            return
+        super().closeEvent(event)
 
     def add_row(self, data):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        for col in range(self.table.columnCount()):
-            if col < len(data):
-                item = QTableWidgetItem(data[col])
-            else:
-                item = QTableWidgetItem("")
-            if col != 0:
-                item.setTextAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-            self.table.setItem(row, col, item)
-        self.table.resizeRowToContents(row)
-
-    def insert_text_and_resize(self, row, col, text):
-        self.table.setItem(row, col, QTableWidgetItem(text))
-        self.table.resizeRowToContents(row)
-
-    def scan_pdf_to_cell(self, item):
-        row, col = item.row(), item.column()
-        filename = self.table.item(row, 0).text()
+        self.model.append_rows([data])
+
+    def insert_text(self, row, col, text):
+        self.model.setData(self.model.index(row, col), text)
+
+    def scan_pdf_to_cell(self, index):
+        row, col = index.row(), index.column()
+        filename = self.model.text(row, 0)
         pdf_path = os.path.join(self.folder_path, filename)
         if not os.path.exists(pdf_path):
             QMessageBox.warning(self, "Error", f"PDF not found: {pdf_path}")
             return
-        images = convert_from_path(pdf_path)
-        if not images:
-            QMessageBox.warning(self, "Error", "Failed to convert PDF.")
+        # Word boxes from extraction, at whichever rung of the DPI ladder read the page
+        cached, dpi = None, DEFAULT_DPI
+        try:
+            pdf_hash = file_hash(pdf_path)
+            for rung in (DEFAULT_DPI,) + DPI_LADDER:
+                cached = get_cache().get(pdf_hash, dpi=rung, config="--psm 6")
+                if cached:
+                    dpi = rung
+                    break
+        except Exception as e:
+            print(f"OCR cache unavailable: {e}")
+        words = cached["words"] if cached else None
+        try:
+            image = render_page(pdf_path, dpi=dpi, color=RGB, poppler_path=get_poppler_path())
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Failed to convert PDF: {e}")
             return
-        image = images[0]
-        viewer = PDFCropViewer(image, lambda text: self.insert_text_and_resize(row, col, text))
+        viewer = PDFCropViewer(image, lambda text: self.insert_text(row, col, text), words)
         viewer.exec_()
 
     def open_context_menu(self, pos):
-        item = self.table.itemAt(pos)
-        if item:
+        index = self.table.indexAt(pos)
+        if index.isValid():
             menu = QMenu()
-            menu.addAction("Scan PDF to Cell", lambda: self.scan_pdf_to_cell(item))
+            menu.addAction("Scan PDF to Cell", lambda: self.scan_pdf_to_cell(index))
             menu.exec_(self.table.viewport().mapToGlobal(pos))
 
-    def update_total_row(self):
-        self.table.blockSignals(True)
-        for row in reversed(range(self.table.rowCount())):
-            if self.table.item(row, 0) and self.table.item(row, 0).text() == "TOTAL":
-                self.table.removeRow(row)
-
-        total_amount = payment_total = tax_total = balance_total = 0.0
-        for row in range(self.table.rowCount()):
-            try:
-                total_amount += float(self.table.item(row, 5).text().replace(",", "") or 0)
-                payment_total += float(self.table.item(row, 6).text().replace(",", "") or 0)
-                tax_total += float(self.table.item(row, 7).text().replace(",", "") or 0)
-                balance_total += float(self.table.item(row, 8).text().replace(",", "") or 0)
-            except:
-                continue
-
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        totals = ["TOTAL", "", "", "", "", f"{total_amount:,.2f}", f"{payment_total:,.2f}", f"{tax_total:,.2f}", f"{balance_total:,.2f}"]
-
-        for col, value in enumerate(totals):
-            item = QTableWidgetItem(value)
-            item.setTextAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-            item.setToolTip("Summary Total")
-            item.setBackground(Qt.lightGray)
-            font = item.font()
-            font.setBold(True)
-            item.setFont(font)
-            item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row, col, item)
-
-        self.table.blockSignals(False)
-
-    def recalculate_totals(self):
-        for row in range(self.table.rowCount()):
-            item0 = self.table.item(row, 0)
-            if item0 and item0.text() == "TOTAL":
-                continue
-            try:
-                total = float(self.table.item(row, 5).text().replace(",", "") or 0)
-                payment = float(self.table.item(row, 6).text().replace(",", "") or 0)
-                tax = float(self.table.item(row, 7).text().replace(",", "") or 0)
-                balance = total - payment - tax
-                self.table.blockSignals(True)
-                balance_item = QTableWidgetItem(f"{balance:,.2f}")
-                balance_item.setTextAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-                self.table.setItem(row, 8, balance_item)
-                self.table.blockSignals(False)
-            except:
-                pass
-        self.update_total_row()
-
     def save_as(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save File", "", "CSV (*.csv);;Excel (*.xlsx);;PDF (*.pdf)")
         log_action(self.user, f"Exported table as {os.path.splitext(path)[1]}", [path])
         if not path:
             return
         
-        data = []
-        for row in range(self.table.rowCount()):
-            data.append([
-                self.table.item(row, col).text() if self.table.item(row, col) else ""
-                for col in range(self.table.columnCount())
-            ])
+        data = self.model.table_rows()
         df = pd.DataFrame(data, columns=self.columns)
 
         if path.endswith(".csv"):
@@ -636,11 +714,11 @@ class PDFExtractor(QMainWindow):
 
 
     def open_file(self):
-        selected = self.table.currentRow()
-        if selected < 0:
+        selected = self.table.currentIndex()
+        if not selected.isValid():
             QMessageBox.warning(self, "Error", "No file selected.")
             return
-        filename = self.table.item(selected, 0).text()
+        filename = self.model.text(selected.row(), 0)
         full_path = os.path.join(self.folder_path, filename)
         if os.path.exists(full_path):
             os.startfile(full_path)
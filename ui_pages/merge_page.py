@@ -2,7 +2,7 @@ import os
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton, QListWidget, QFileDialog, QMessageBox, QLabel,
 )
-from PyPDF2 import PdfMerger
+from core.pdf_ops import merge_files
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from core.logger import log_action
@@ -95,11 +95,7 @@ class MergePDFPage(QWidget):
             return
 
         try:
-            merger = PdfMerger()
-            for file in all_files:
-                merger.append(file)
-            merger.write(save_path)
-            merger.close()
+            merge_files(all_files, save_path)
 
             QMessageBox.information(self, "Success", f"Merged PDF saved to:\n{save_path}")
         except Exception as e:
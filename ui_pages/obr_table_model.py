@@ -0,0 +1,300 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QColor, QFont
+from PyQt5.QtWidgets import QUndoCommand
+from core.obr_extraction import OBR_COLUMNS
+
+TOTAL_LABEL = "TOTAL"
+FILE_COLUMN = OBR_COLUMNS.index("File Name")
+AMOUNT_COLUMNS = tuple(OBR_COLUMNS.index(name) for name in ("Total Amount", "Payment", "Tax", "Balance"))
+TOTAL_COLUMN, PAYMENT_COLUMN, TAX_COLUMN, BALANCE_COLUMN = AMOUNT_COLUMNS
+BALANCE_INPUTS = (TOTAL_COLUMN, PAYMENT_COLUMN, TAX_COLUMN)
+# Long cells are cut off at the fixed row height; the tooltip shows them in full
+TOOLTIP_CHARS = 40
+# Joins a row's cells in its search key, so a query can't match across two cells
+KEY_SEPARATOR = "\x00"
+
+
+def parse_amount(text):
+    # Blank is zero; None when the cell isn't a number (e.g. an OCR misread)
+    try:
+        return float(text.replace(",", "") or 0)
+    except ValueError:
+        return None
+
+
+class ObrRow:
+    """
+    One extracted OBR: the cell texts as shown, the amount columns parsed
+    once so totals and sorting never re-read the strings, and the row's
+    lowercased text as one search key (rebuilt by update_key after changes).
+    """
+    __slots__ = ("cells", "amounts", "key")
+
+    def __init__(self, cells):
+        self.cells = cells
+        self.amounts = {col: parse_amount(cells[col]) for col in AMOUNT_COLUMNS}
+        self.update_key()
+
+    def set(self, col, text):
+        self.cells[col] = text
+        if col in self.amounts:
+            self.amounts[col] = parse_amount(text)
+
+    def update_key(self):
+        self.key = KEY_SEPARATOR.join(self.cells).lower()
+
+
+class EditCellsCommand(QUndoCommand):
+    """
+    One user edit of one or more cells, e.g. a typed value or a whole paste,
+    undone and redone as a unit. changes are (row record, col, old, new);
+    rows are held as records, not positions, so sorting in between is fine.
+    """
+
+    def __init__(self, model, changes, text):
+        super().__init__(text)
+        self.model = model
+        self.changes = changes
+
+    def redo(self):
+        self.model.apply([(record, col, new) for record, col, old, new in self.changes])
+
+    def undo(self):
+        self.model.apply([(record, col, old) for record, col, old, new in reversed(self.changes)])
+
+
+class ObrTableModel(QAbstractTableModel):
+    """
+    The OBR Extractor's rows for a QTableView, which only asks for the cells
+    it paints. totals holds a running sum per amount column, adjusted by each
+    change rather than recounted; TotalsModel shows it. User edits (the view,
+    setData, edit_cells) go on undo_stack when one is set, as one command per
+    edit, and are reported by cells_edited([(row, col, old, new), ...]);
+    undo and redo are not.
+    """
+    cells_edited = pyqtSignal(list)
+    totals_changed = pyqtSignal()
+
+    def __init__(self, columns=OBR_COLUMNS, parent=None):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.rows = []
+        self.totals = {col: 0.0 for col in AMOUNT_COLUMNS}
+        self.search_text = ""
+        self.matches = {}  # id: row, for the rows matching search_text
+        self.undo_stack = None
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record, col = self.rows[index.row()], index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return record.cells[col]
+        if role == Qt.TextAlignmentRole and col != FILE_COLUMN:
+            return Qt.AlignCenter | Qt.AlignVCenter
+        if role == Qt.BackgroundRole and id(record) in self.matches:
+            return QColor("cyan")
+        if role == Qt.ToolTipRole and len(record.cells[col]) > TOOLTIP_CHARS:
+            return record.cells[col]
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        return flags | Qt.ItemIsEditable if index.isValid() else flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        return self.edit_cells([(index.row(), index.column(), str(value))])
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Amounts sort as numbers, with cells that aren't numbers first
+        if column in AMOUNT_COLUMNS:
+            key = lambda record: (record.amounts[column] is not None, record.amounts[column] or 0.0)
+        else:
+            key = lambda record: record.cells[column].lower()
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        moved = [(self.rows[index.row()], index.column()) for index in old_indexes]
+        self.rows.sort(key=key, reverse=order == Qt.DescendingOrder)
+        positions = {id(record): row for row, record in enumerate(self.rows)}
+        self.changePersistentIndexList(old_indexes, [self.index(positions[id(record)], col) for record, col in moved])
+        self.layoutChanged.emit()
+
+    # Table operations
+
+    def text(self, row, col):
+        return self.rows[row].cells[col]
+
+    def total_cells(self):
+        cells = [""] * len(self.columns)
+        cells[FILE_COLUMN] = TOTAL_LABEL
+        for col, total in self.totals.items():
+            cells[col] = f"{total:,.2f}"
+        return cells
+
+    def append_rows(self, rows):
+        # rows are lists of cell texts, padded or cut to the column count
+        if not rows:
+            return
+        records = [ObrRow([str(v) for v in (list(cells) + [""] * len(self.columns))[:len(self.columns)]])
+                   for cells in rows]
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        self.rows.extend(records)
+        if self.search_text:
+            self.matches.update((id(record), record) for record in records if self.search_text in record.key)
+        self.endInsertRows()
+        for col in AMOUNT_COLUMNS:
+            self.totals[col] += sum(record.amounts[col] or 0.0 for record in records)
+        self.totals_changed.emit()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.matches = {}
+        self.totals = {col: 0.0 for col in AMOUNT_COLUMNS}
+        self.endResetModel()
+        self.totals_changed.emit()
+        if self.undo_stack is not None:
+            # Its commands refer to the rows just dropped
+            self.undo_stack.clear()
+
+    def edit_cells(self, edits, text=None):
+        """
+        A user edit of (row, col, new text) cells, as one undo step. Cells
+        that already hold their new text are left out; False if none remain.
+        """
+        changes, edited = [], []
+        for row, col, new in edits:
+            record = self.rows[row]
+            old = record.cells[col]
+            if old != new:
+                changes.append((record, col, old, new))
+                edited.append((row, col, old, new))
+        if not changes:
+            return False
+        if text is None:
+            row, col, old, new = edited[0]
+            text = f"edit (Row {row + 1}, Col {col + 1}): '{old}' → '{new}'" if len(edited) == 1 \
+                else f"edit of {len(edited)} cells"
+        command = EditCellsCommand(self, changes, text)
+        if self.undo_stack is not None:
+            self.undo_stack.push(command)  # applies it
+        else:
+            command.redo()
+        self.cells_edited.emit(edited)
+        return True
+
+    def apply(self, changes):
+        """
+        Set (row record, col, text) cells in one pass. Each touched row gets
+        its Balance recomputed (when Total Amount, Payment or Tax changed and
+        all three are numbers), its search key rebuilt and its amounts moved
+        into the totals once; views get one dataChanged for the lot.
+        """
+        touched = {}
+        for record, col, text in changes:
+            if id(record) not in touched:
+                touched[id(record)] = (record, dict(record.amounts), set())
+            record.set(col, text)
+            touched[id(record)][2].add(col)
+        for record, before, cols in touched.values():
+            if cols.intersection(BALANCE_INPUTS):
+                total, payment, tax = (record.amounts[c] for c in BALANCE_INPUTS)
+                if None not in (total, payment, tax):
+                    record.set(BALANCE_COLUMN, f"{total - payment - tax:,.2f}")
+            record.update_key()
+            # Cells that aren't numbers count as zero
+            for c in AMOUNT_COLUMNS:
+                self.totals[c] += (record.amounts[c] or 0.0) - (before[c] or 0.0)
+            if self.search_text:
+                self.matches.pop(id(record), None)
+                if self.search_text in record.key:
+                    self.matches[id(record)] = record
+        if len(touched) == 1:
+            first = last = self.rows.index(changes[0][0])
+        else:
+            first, last = 0, len(self.rows) - 1
+        self.dataChanged.emit(self.index(first, 0), self.index(last, len(self.columns) - 1))
+        self.totals_changed.emit()
+
+    def set_search(self, text):
+        """
+        Highlight the rows with text in any cell; "" clears the highlight.
+        A query that extends the last one only looks at the rows that matched it.
+        """
+        text = text.lower()
+        if not text:
+            matches = {}
+        elif self.search_text and text.startswith(self.search_text):
+            matches = {key: record for key, record in self.matches.items() if text in record.key}
+        else:
+            matches = {id(record): record for record in self.rows if text in record.key}
+        self.search_text, self.matches = text, matches
+        if self.rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.rows) - 1, len(self.columns) - 1),
+                                  [Qt.BackgroundRole])
+
+    def table_rows(self):
+        # Every row's cell texts, the TOTAL row last, e.g. for export
+        rows = [list(record.cells) for record in self.rows]
+        if self.rows:
+            rows.append(self.total_cells())
+        return rows
+
+
+class TotalsModel(QAbstractTableModel):
+    """
+    The TOTAL row of an ObrTableModel as a one-row model of its own, for a
+    view pinned under the table so it stays in sight while the rows scroll.
+    """
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self._bold = QFont()
+        self._bold.setBold(True)
+        source.totals_changed.connect(
+            lambda: self.dataChanged.emit(self.index(0, 0), self.index(0, self.columnCount() - 1)))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.source.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            return self.source.columns[section] if orientation == Qt.Horizontal else "Σ"
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.source.total_cells()[index.column()]
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter | Qt.AlignVCenter
+        if role == Qt.BackgroundRole:
+            return QColor(Qt.lightGray)
+        if role == Qt.FontRole:
+            return self._bold
+        if role == Qt.ToolTipRole:
+            return "Summary Total"
+        return None
@@ -6,7 +6,7 @@ class RenameOptionDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Choose Rename Option")
         self.setWindowIcon(QIcon("rename.png"))
-        self.setFixedSize(300, 160)
+        self.setFixedSize(300, 200)
 
         layout = QVBoxLayout()
         layout.addWidget(QLabel("Which type of files do you want to rename?"))
@@ -14,13 +14,17 @@ class RenameOptionDialog(QDialog):
         self.obr_button = QPushButton("OBR")
         self.nca_button = QPushButton("NCA")
         self.saro_button = QPushButton("SARO")
+        self.auto_button = QPushButton("Auto (mixed folder)")
+        self.auto_button.setToolTip("Detect each file's type and rename OBR, NCA and SARO files in one pass")
 
         layout.addWidget(self.obr_button)
         layout.addWidget(self.nca_button)
         layout.addWidget(self.saro_button)
+        layout.addWidget(self.auto_button)
 
         self.setLayout(layout)
 
         self.obr_button.clicked.connect(lambda: self.done(1))
         self.nca_button.clicked.connect(lambda: self.done(2))
         self.saro_button.clicked.connect(lambda: self.done(3))
+        self.auto_button.clicked.connect(lambda: self.done(4))
@@ -1,7 +1,7 @@
 import os
-import re
 import cv2
 import platform
+import time
 import numpy as np
 import pytesseract
 from PyQt5.QtWidgets import ( 
@@ -12,19 +12,20 @@ from PyQt5.QtWidgets import (
 import traceback
 from PyQt5.QtGui import QFont, QPixmap, QImage, QIcon
 from PyQt5.QtCore import Qt
-from PyQt5.QtCore import QObject, QThread, pyqtSignal, QEventLoop
-from PIL import Image, ImageOps, ImageFilter
-from pdf2image import convert_from_path
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from PIL import ImageOps, ImageFilter
 from config.constants import FONT_SIZE, DEFAULT_FONT, SECONDARY_COLOR
-from core.logger import log_action
+from core.logger import log_action, log_metrics
+from core.doc_classifier import AUTO, DOC_TYPES
+from core.job_journal import DONE_STATUSES, JobJournal
+from core.rename_engine import RenameEngine, rename_pdf
+from core.stage_timer import StageStats, add_timings, take_timings, timed
 from ui_pages.rename_option_dialog import RenameOptionDialog
-from utils.image_utils import preprocess_image, pil_image_to_qimage
-from ui_pages.saro_fallback_dialog import SaroFallbackDialog
 from ui_pages.path_settings_page import PathSettingsPage
-from ui_pages.nca_fallback_dialog import NcaFallbackDialog
+from ui_pages.review_queue_dialog import ReviewQueueDialog
+from ui_pages.watch_dialog import WatchDialog
 import json
 import sys
-from ui_pages.obr_fallback_dialog import ObrFallbackDialog
 
 
 def create_styled_button(text):
@@ -60,6 +61,7 @@ def get_config_path():
     return os.path.join(base_dir, "ocr_config.json")
 
 CONFIG_FILE = get_config_path()
+REVIEW_PREVIEW_SIZE = (1000, 1000)
 
 def load_config():
     if os.path.exists(CONFIG_FILE):
@@ -91,73 +93,6 @@ def ensure_poppler_path(parent=None):
     QMessageBox.warning(parent, "Poppler Not Set", "Poppler path is not set or not working. Please use the settings button (gear icon) to configure the Poppler path.")
     return None
 
-def extract_nca_number(image):
-    try:
-        text = pytesseract.image_to_string(image, config="--psm 6")
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-
-        for i, line in enumerate(lines):
-            if "2067" in line:
-                if i > 0:
-                    potential_nca = lines[i - 1]
-
-                    # Priority: 7-digit NCA format
-                    match = re.search(r"(NCA-[A-Z]{2,5}-[A-Z]-\d{2,4}-\d{7})", potential_nca)
-                    if match:
-                        return match.group(1).strip()
-
-                    # Fallback: 6-digit variant
-                    match = re.search(r"(NCA-[A-Z]{2,5}-[A-Z]-\d{2,4}-\d{6})", potential_nca)
-                    if match:
-                        return match.group(1).strip()
-
-                    # Fallback: plain numeric code like '345247-0'
-                    match = re.search(r"(\d{5,7}[-–]\d{1,3})", potential_nca)
-                    if match:
-                        return match.group(1).strip()
-
-        return None
-    except Exception as e:
-        print(f"Error during OCR: {e}")
-        return None
-    
-def extract_saro_number_from_image(image: Image.Image) -> str:
-    # Convert image to grayscale for better OCR accuracy
-    gray = image.convert("L")
-
-    # Crop bottom-right corner (where SARO No. usually appears)
-    width, height = gray.size
-    cropped = gray.crop((int(width * 0.5), int(height * 0.75), width, height))
-
-    # Run OCR on cropped section
-    text = pytesseract.image_to_string(cropped)
-
-    # Regex patterns for SARO No.
-    patterns = [
-        r"(SARO[-\s]?[A-Z]{3}[-\s]?[A-Z]?[-\s]?\d{2}[-\s]?\d{7})",  # e.g. SARO-BMB-A-08-0016104
-        r"\b([A-Z]{1}-\d{2}-\d{5})\b"  # e.g. A-01-05818
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text)
-        if match:
-            return match.group(1).replace(" ", "").strip()
-
-    print("OCR text (no match):", text)
-    return None
-
-def extract_obr_number(text):
-    try:
-        # Try to match OBR serial patterns (CA-MOOE..., MOOE..., PGF..., PS...)
-        match = re.search(r"(CA\-MOOE\S+|MOOE\S+|PGF\S+|PS\S+)", text)
-        if match:
-            return match.group(1).strip()
-        return None
-    except Exception as e:
-        print(f"Error during OBR pattern matching: {e}")
-        return None
-
-
 class RenamePage(QWidget):
     def __init__(self, switch_page_callback, username="Unknown"):
         super().__init__()
@@ -178,6 +113,11 @@ class RenamePage(QWidget):
         rename_btn.clicked.connect(self.extract_and_rename_dialog)
         layout.addWidget(rename_btn, alignment=Qt.AlignHCenter)
 
+        # Hot folders: rename scans as they are dropped in
+        watch_btn = create_styled_button("Watch Folders")
+        watch_btn.clicked.connect(self.watch_folders)
+        layout.addWidget(watch_btn, alignment=Qt.AlignHCenter)
+
         # Back button below
         back_btn = create_styled_button("Back")
         back_btn.clicked.connect(lambda: self.switch_page("main"))
@@ -198,8 +138,47 @@ class RenamePage(QWidget):
         elif choice == 3:
             self.rename_saro_files()
             log_action(self.username, "Renamed PDFs", ["Mode: SARO"])
+        elif choice == 4:
+            self.rename_auto_files()
+            log_action(self.username, "Renamed PDFs", ["Mode: Auto"])
+
+    def watch_folders(self):
+        from core.ocr_config import get_tesseract_path, get_watch_folders
+        tesseract_path = get_tesseract_path()
+        if tesseract_path:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        if not ensure_tesseract_path(self):
+            return
+        poppler_path = ensure_poppler_path(self)
+        if not poppler_path:
+            return
+        # "watch_folders" in ocr_config.json; otherwise ask for one folder
+        folders = get_watch_folders()
+        if not folders:
+            choice = RenameOptionDialog(self).exec_()
+            if not choice:
+                return
+            mode = {1: "OBR", 2: "NCA", 3: "SARO", 4: AUTO}[choice]
+            folder = QFileDialog.getExistingDirectory(self, "Select Folder to Watch")
+            if not folder:
+                return
+            folders = {folder: mode}
+        self.watch_dialog = WatchDialog(folders, poppler_path, self.username, self)
+        self.watch_dialog.show()
 
     def rename_obr_files(self):
+        self.start_rename("OBR", OBRRenameWorker)
+
+    def rename_nca_files(self):
+        self.start_rename("NCA", NCARenameWorker)
+
+    def rename_saro_files(self):
+        self.start_rename("SARO", SARORenameWorker)
+
+    def rename_auto_files(self):
+        self.start_rename(AUTO, AutoRenameWorker)
+
+    def start_rename(self, mode, worker_class):
         from core.ocr_config import get_tesseract_path
         tesseract_path = get_tesseract_path()
         if tesseract_path:
@@ -209,54 +188,95 @@ class RenamePage(QWidget):
         poppler_path = ensure_poppler_path(self)
         if not poppler_path:
             return
-        folder = QFileDialog.getExistingDirectory(self, "Select Folder with OBR PDFs")
+        label = "Mixed" if mode == AUTO else mode
+        folder = QFileDialog.getExistingDirectory(self, f"Select Folder with {label} PDFs")
         if not folder:
             return
         pdf_files = [f for f in os.listdir(folder) if f.lower().endswith(".pdf")]
         if not pdf_files:
             QMessageBox.information(self, "No PDFs", "No PDF files found in the folder.")
             return
-        self.progress_dialog = QProgressDialog("Renaming OBR files...", "Cancel", 0, len(pdf_files), self)
-        self.progress_dialog.setWindowTitle("Renaming OBR Files")
+        self.journal = JobJournal(f"rename_{mode}", folder)
+        if self.journal.entries:
+            done = self.journal.done(pdf_files)
+            answer = QMessageBox.question(
+                self, "Resume Renaming",
+                f"A previous {label} batch in this folder did not finish ({len(done)} files done).\n\n"
+                "Resume where it stopped? Choose No to start over.",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+            if answer == QMessageBox.Yes:
+                pdf_files = [f for f in pdf_files if f not in done]
+            else:
+                self.journal.finish()
+        self.progress_dialog = QProgressDialog(f"Renaming {label} files...", "Cancel", 0, len(pdf_files), self)
+        self.progress_dialog.setWindowTitle(f"Renaming {label} Files")
         self.progress_dialog.setWindowModality(Qt.WindowModal)
         self.progress_dialog.setMinimumDuration(0)
         self.progress_dialog.setAutoClose(False)
         self.progress_dialog.setAutoReset(False)
         self.worker_thread = QThread()
-        self.worker = OBRRenameWorker(folder, pdf_files, poppler_path)
+        self.worker = worker_class(folder, pdf_files, poppler_path, self.journal)
         self.worker.moveToThread(self.worker_thread)
         self.worker.progress.connect(self._on_rename_progress)
         self.worker.finished.connect(self._on_rename_finished)
-        self.worker.canceled.connect(lambda: self._on_rename_canceled("OBR"))
-        self.worker.manual_input_requested.connect(self._on_obr_manual_input)
-        self.progress_dialog.canceled.connect(self.worker.cancel)
+        self.worker.canceled.connect(lambda: self._on_rename_canceled(mode))
+        self.progress_dialog.canceled.connect(self.worker.cancel, Qt.DirectConnection)
         self.worker_thread.started.connect(self.worker.run)
         self.worker_thread.start()
 
     def _on_rename_progress(self, i, label):
+        started = time.perf_counter()
         self.progress_dialog.setValue(i)
         self.progress_dialog.setLabelText(label)
+        self.worker.stats.add({"ui": time.perf_counter() - started}, count_file=False)
 
-    def _on_rename_finished(self, renamed, skipped, summary):
+    def _on_rename_finished(self, renamed, skipped, summary, review):
         self.worker_thread.quit()
         self.worker_thread.wait()
         self.progress_dialog.close()
-        message = f"✅ Renamed {renamed} OBR files."
+        mode = self.worker.mode
+        log_metrics(self.username, f"Rename {mode}", self.worker.stats.to_dict())
+        # Files the batch couldn't read are all reviewed together at the end, one queue per type
+        queues = {}
+        for item in review:
+            queues.setdefault(item["mode"], []).append(item)
+        for item_mode, items in queues.items():
+            dialog = ReviewQueueDialog(item_mode, self.worker.folder, items, self)
+            dialog.exec_()
+            renamed += dialog.renamed
+            skipped += dialog.skipped
+            summary += dialog.summary
+        if mode == AUTO:
+            counts = self.worker.type_counts
+            message = f"✅ Renamed {renamed} files."
+            message += "\n\nDetected: " + ", ".join(f"{doc_type} {counts.get(doc_type, 0)}" for doc_type in DOC_TYPES)
+            if counts.get(None):
+                message += f", unrecognized {counts[None]}"
+            classified = sum(counts.values())
+            # Summed over the pool's processes, which classify side by side, so not elapsed time
+            message += (f"\nClassification: {self.worker.classify_time:.1f} s of worker time "
+                        f"({self.worker.classify_time * 1000 / max(1, classified):.0f} ms per file)")
+        else:
+            message = f"✅ Renamed {renamed} {mode} files."
         if skipped:
             message += "\n\n⚠ Skipped Files:\n" + "\n".join(skipped[:10])
             if len(skipped) > 10:
                 message += "\n..."
         QMessageBox.information(self, "Renaming Complete", message)
+        self.journal.finish()
         if skipped:
             self.show_skipped_files_preview(skipped)
         # Log the rename activity for OBR, NCA, SARO
         if hasattr(self.parent(), 'on_rename_completed'):
-            self.parent().on_rename_completed(self.username, renamed, skipped, "OBR")
+            self.parent().on_rename_completed(self.username, renamed, skipped, mode)
 
     def _on_rename_canceled(self, mode=None):
         self.worker_thread.quit()
         self.worker_thread.wait()
         self.progress_dialog.close()
+        # Kept, so the next run in this folder can resume
+        self.journal.close()
+        log_metrics(self.username, f"Rename {mode} (canceled)", self.worker.stats.to_dict())
         QMessageBox.information(self, "Canceled", "Renaming was canceled.")
         # Log the cancellation event
         if hasattr(self.parent(), 'on_rename_canceled'):
@@ -266,110 +286,6 @@ class RenamePage(QWidget):
         self.worker_thread.quit()
         self.worker_thread.wait()
 
-    def _on_nca_manual_input(self, file, image):
-        dialog = NcaFallbackDialog(self, filename=file, image=image)
-        if dialog.exec_() == QDialog.Accepted and dialog.get_result():
-            self.worker.manual_input_result.emit(dialog.get_result())
-        else:
-            self.worker.manual_input_result.emit("")
-            
-    def _on_obr_manual_input(self, file, image, pdf_path, suggestions):
-        dialog = ObrFallbackDialog(suggestions, image, pdf_path, self)
-        if dialog.exec_() == QDialog.Accepted:
-            self.worker.manual_input_result.emit(dialog.combo.currentText().strip())
-        else:
-            self.worker.manual_input_result.emit("")
-            
-    def _on_saro_manual_input(self, file, image, pdf_path, suggestions):
-        dialog = SaroFallbackDialog(suggestions, image, pdf_path, self)
-        if dialog.exec_() == QDialog.Accepted:
-            self.worker.manual_input_result.emit(dialog.combo.currentText().strip())
-        else:
-            self.worker.manual_input_result.emit("")
-
-    def _on_rename_finished_nca(self, renamed, skipped, summary):
-        self.worker_thread.quit()
-        self.worker_thread.wait()
-        self.progress_dialog.close()
-        message = f"✅ Renamed {renamed} NCA files."
-        if skipped:
-            message += "\n\n⚠ Skipped Files:\n" + "\n".join(skipped[:10])
-            if len(skipped) > 10:
-                message += "\n..."
-        QMessageBox.information(self, "Renaming Complete", message)
-        if skipped:
-            self.show_skipped_files_preview(skipped)
-        if hasattr(self.parent(), 'on_rename_completed'):
-            self.parent().on_rename_completed(self.username, renamed, skipped, "NCA")
-
-    def rename_nca_files(self):
-        from core.ocr_config import get_tesseract_path
-        tesseract_path = get_tesseract_path()
-        if tesseract_path:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
-        if not ensure_tesseract_path(self):
-            return
-        poppler_path = ensure_poppler_path(self)
-        if not poppler_path:
-            return
-        folder = QFileDialog.getExistingDirectory(self, "Select Folder with NCA PDFs")
-        if not folder:
-            return
-        pdf_files = [f for f in os.listdir(folder) if f.lower().endswith(".pdf")]
-        if not pdf_files:
-            QMessageBox.information(self, "No PDFs", "No PDF files found in the folder.")
-            return
-        self.progress_dialog = QProgressDialog("Renaming NCA files...", "Cancel", 0, len(pdf_files), self)
-        self.progress_dialog.setWindowTitle("Renaming NCA Files")
-        self.progress_dialog.setWindowModality(Qt.WindowModal)
-        self.progress_dialog.setMinimumDuration(0)
-        self.progress_dialog.setAutoClose(False)
-        self.progress_dialog.setAutoReset(False)
-        self.worker_thread = QThread()
-        self.worker = NCARenameWorker(folder, pdf_files, poppler_path)
-        self.worker.moveToThread(self.worker_thread)
-        self.worker.progress.connect(self._on_rename_progress)
-        self.worker.finished.connect(self._on_rename_finished_nca)
-        self.worker.canceled.connect(lambda: self._on_rename_canceled("NCA"))
-        self.worker.manual_input_requested.connect(self._on_nca_manual_input)
-        self.progress_dialog.canceled.connect(self.worker.cancel)
-        self.worker_thread.started.connect(self.worker.run)
-        self.worker_thread.start()
-
-    def rename_saro_files(self):
-        from core.ocr_config import get_tesseract_path
-        tesseract_path = get_tesseract_path()
-        if tesseract_path:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
-        if not ensure_tesseract_path(self):
-            return
-        poppler_path = ensure_poppler_path(self)
-        if not poppler_path:
-            return
-        folder = QFileDialog.getExistingDirectory(self, "Select Folder with SARO PDFs")
-        if not folder:
-            return
-        pdf_files = [f for f in os.listdir(folder) if f.lower().endswith(".pdf")]
-        if not pdf_files:
-            QMessageBox.information(self, "No PDFs", "No PDF files found in the folder.")
-            return
-        self.progress_dialog = QProgressDialog("Renaming SARO files...", "Cancel", 0, len(pdf_files), self)
-        self.progress_dialog.setWindowTitle("Renaming SARO Files")
-        self.progress_dialog.setWindowModality(Qt.WindowModal)
-        self.progress_dialog.setMinimumDuration(0)
-        self.progress_dialog.setAutoClose(False)
-        self.progress_dialog.setAutoReset(False)
-        self.worker_thread = QThread()
-        self.worker = SARORenameWorker(folder, pdf_files, poppler_path)
-        self.worker.moveToThread(self.worker_thread)
-        self.worker.progress.connect(self._on_rename_progress)
-        self.worker.finished.connect(self._on_rename_finished)
-        self.worker.canceled.connect(lambda: self._on_rename_canceled("SARO"))
-        self.worker.manual_input_requested.connect(self._on_saro_manual_input)
-        self.progress_dialog.canceled.connect(self.worker.cancel)
-        self.worker_thread.started.connect(self.worker.run)
-        self.worker_thread.start()
-
     def show_skipped_files_preview(self, skipped_files):
         dialog = QDialog(self)
         dialog.setWindowTitle("Skipped Files Preview")
@@ -389,287 +305,104 @@ class RenamePage(QWidget):
 
         dialog.exec_()
 
-class OBRRenameWorker(QObject):
+class RenameWorker(QObject):
+    """
+    Shared batch loop for the OBR/NCA/SARO/Auto rename workers. Rendering and
+    OCR run on the RenameEngine process pool; results are handled here in
+    completion order. Files with no readable number are queued for review
+    instead of stopping the batch. Auto batches also tally the detected types.
+    Renamed and skipped files are written to the batch's JobJournal, and a
+    resumed batch starts from the files it renamed. Per-stage timings go
+    to stats and are shown under the progress label.
+    """
+    mode = None
     progress = pyqtSignal(int, str)
-    finished = pyqtSignal(int, list, list)
+    finished = pyqtSignal(int, list, list, list)  # renamed, skipped, summary, review queue
     canceled = pyqtSignal()
-    manual_input_requested = pyqtSignal(str, object, str, list)  # file, image, pdf_path, suggestions
-    manual_input_result = pyqtSignal(str)
 
-    def __init__(self, folder, pdf_files, poppler_path):
+    def __init__(self, folder, pdf_files, poppler_path, journal=None):
         super().__init__()
         self.folder = folder
         self.pdf_files = pdf_files
         self.poppler_path = poppler_path
+        self.journal = journal
+        self.engine = RenameEngine(self.mode, folder, pdf_files, poppler_path)
+        self.type_counts = {}
+        self.classify_time = 0.0
+        self.stats = StageStats()
         self._cancel = False
-        self._manual_result = None
-        self._event_loop = None
-        self.manual_input_result.connect(self._on_manual_input_result)
 
     def cancel(self):
+        # Connected with Qt.DirectConnection, so this runs on the UI thread while run() is busy
         self._cancel = True
-        if self._event_loop:
-            self._event_loop.quit()
-            
-    def _on_manual_input_result(self, value):
-        self._manual_result = value
-        if self._event_loop:
-            self._event_loop.quit()
+        self.engine.cancel()
 
     def run(self):
-        renamed, skipped, summary = 0, [], []
-        for i, file in enumerate(self.pdf_files):
+        renamed, skipped, summary, review = 0, [], [], []
+        entries = self.journal.entries.values() if self.journal else ()
+        todo = set(self.pdf_files)
+        for entry in entries:
+            # Only files the resume leaves out; the rest count when processed again
+            if entry["file"] not in todo and entry["status"] in DONE_STATUSES:
+                renamed += 1
+                summary.append(entry["message"])
+        total = len(self.pdf_files)
+        for done, result in enumerate(self.engine.results(), start=1):
             if self._cancel:
-                self.canceled.emit()
-                return
-            self.progress.emit(i, f"Processing {file} ({i+1}/{len(self.pdf_files)})")
-            path = os.path.join(self.folder, file)
+                break
+            file = result["file"]
             try:
-                if self._cancel:
-                    self.canceled.emit()
-                    return
-                image = convert_from_path(path, first_page=1, last_page=1, poppler_path=self.poppler_path)[0]
-                if self._cancel:
-                    self.canceled.emit()
-                    return
-                QThread.msleep(100)  # Add small delay after PDF conversion
-                text = pytesseract.image_to_string(image)
-                if self._cancel:
-                    self.canceled.emit()
-                    return
-                QThread.msleep(50)  # Add small delay after OCR
-                serial = extract_obr_number(text)
-                if self._cancel:
-                    self.canceled.emit()
-                    return
-                if serial:
-                    new_name = f"{serial}.pdf"
-                    new_path = os.path.join(self.folder, new_name)
-                    if not os.path.exists(new_path):
-                        os.rename(path, new_path)
-                        renamed += 1
-                        summary.append(f"{file} ➔ {new_name}")
-                    else:
-                        skipped.append(f"{file} (already exists as {new_name})")
+                if "classify_time" in result:
+                    self.type_counts[result["mode"]] = self.type_counts.get(result["mode"], 0) + 1
+                    self.classify_time += result["classify_time"]
+                if result["error"]:
+                    skipped.append(f"{file} (error: {result['error']})")
+                    self.record(file, "skipped", message=skipped[-1])
                     continue
-                # Try to find potential OBR numbers for suggestions
-                suggestions = []
-                lines = text.splitlines()
-                for line in lines:
-                    if any(pattern in line.upper() for pattern in ['CA-MOOE', 'MOOE', 'PGF', 'PS']):
-                        suggestions.append(line.strip())
-                suggestions = list(dict.fromkeys(suggestions))[:3]  # Unique, max 3
-                
-                # Crop image to show top-right corner where OBR numbers typically appear
-                width, height = image.size
-                cropped_image = image.crop((int(width * 0.5), 0, width, int(height * 0.3)))
-                preview_image = pil_image_to_qimage(cropped_image)
-                
-                # Manual fallback with suggestions
-                self._manual_result = None
-                self._event_loop = QEventLoop()
-                self.manual_input_requested.emit(file, preview_image, path, suggestions)
-                self._event_loop.exec_()
-                manual_value = self._manual_result
-                self._event_loop = None
-                
-                if manual_value and manual_value.strip():
-                    new_name = f"{manual_value.strip()}.pdf"
-                    new_path = os.path.join(self.folder, new_name)
-                    if not os.path.exists(new_path):
-                        os.rename(path, new_path)
-                        renamed += 1
-                        summary.append(f"{file} ➔ {new_name}")
-                    else:
-                        skipped.append(f"{file} (already exists as {new_name})")
-                else:
-                    skipped.append(f"{file} (OBR number not found)")
-            except Exception as e:
-                skipped.append(f"{file} (error: {e})")
-        self.finished.emit(renamed, skipped, summary)
-
-class NCARenameWorker(QObject):
-    progress = pyqtSignal(int, str)
-    finished = pyqtSignal(int, list, list)
-    canceled = pyqtSignal()
-    manual_input_requested = pyqtSignal(str, object)  # file, image
-    manual_input_result = pyqtSignal(str)
-
-    def __init__(self, folder, pdf_files, poppler_path):
-        super().__init__()
-        self.folder = folder
-        self.pdf_files = pdf_files
-        self.poppler_path = poppler_path
-        self._cancel = False
-        self._manual_result = None
-        self._event_loop = None
-        self.manual_input_result.connect(self._on_manual_input_result)
-
-    def cancel(self):
-        self._cancel = True
-        if self._event_loop:
-            self._event_loop.quit()
-
-    def _on_manual_input_result(self, value):
-        self._manual_result = value
-        if self._event_loop:
-            self._event_loop.quit()
-
-    def run(self):
-        renamed, skipped, summary = 0, [], []
-        for i, file in enumerate(self.pdf_files):
-            if self._cancel:
-                self.canceled.emit()
-                return
-            self.progress.emit(i, f"Processing {file} ({i+1}/{len(self.pdf_files)})")
-            path = os.path.join(self.folder, file)
-            try:
-                image = convert_from_path(path, first_page=1, last_page=1, poppler_path=self.poppler_path)[0]
-                if self._cancel:
-                    self.canceled.emit()
-                    return
-                QThread.msleep(100)  # Add small delay after PDF conversion
-                text = pytesseract.image_to_string(image)
-                if self._cancel:
-                    self.canceled.emit()
-                    return
-                QThread.msleep(50)  # Add small delay after OCR
-                nca_number = extract_nca_number(image)
-                if self._cancel:
-                    self.canceled.emit()
-                    return
-                if nca_number:
-                    new_name = f"{nca_number}.pdf"
-                    new_path = os.path.join(self.folder, new_name)
-                    if not os.path.exists(new_path):
-                        os.rename(path, new_path)
-                        renamed += 1
-                        summary.append(f"{file} ➔ {new_name}")
-                    else:
-                        skipped.append(f"{file} (already exists as {new_name})")
+                if not result["value"]:
+                    if result["preview"] is not None:
+                        # Keep queued previews small; a long batch can queue hundreds
+                        result["preview"].thumbnail(REVIEW_PREVIEW_SIZE)
+                    review.append(result)
                     continue
-                # Manual fallback: request input from main thread
-                self._manual_result = None
-                self._event_loop = QEventLoop()
-                self.manual_input_requested.emit(file, image)
-                self._event_loop.exec_()
-                manual_value = self._manual_result
-                self._event_loop = None
-                if manual_value and manual_value.strip():
-                    new_name = f"{manual_value.strip()}.pdf"
-                    new_path = os.path.join(self.folder, new_name)
-                    if not os.path.exists(new_path):
-                        os.rename(path, new_path)
-                        renamed += 1
-                        summary.append(f"{file} ➔ {new_name}")
-                    else:
-                        skipped.append(f"{file} (already exists as {new_name})")
+                try:
+                    with timed("rename"):
+                        ok, message = rename_pdf(self.folder, file, result["path"], result["value"])
+                except Exception as e:
+                    skipped.append(f"{file} (error: {e})")
+                    self.record(file, "skipped", message=skipped[-1])
+                    continue
+                if ok:
+                    renamed += 1
+                    summary.append(message)
+                    new_name = f"{result['value']}.pdf"
+                    self.record(file, "renamed", os.path.join(self.folder, new_name), value=result["value"],
+                                new_name=new_name, message=message)
                 else:
-                    skipped.append(f"{file} (NCA number not found)")
-            except Exception as e:
-                skipped.append(f"{file} (error: {e})")
-        self.finished.emit(renamed, skipped, summary)
+                    skipped.append(message)
+                    self.record(file, "skipped", message=message)
+            finally:
+                # The pool's stages plus the renaming done here
+                self.stats.add(add_timings(take_timings(), result.get("timings") or {}))
+                self.progress.emit(done, f"Processed {file} ({done}/{total})\n\n{self.stats.summary()}")
+        if self._cancel:
+            self.canceled.emit()
+            return
+        self.finished.emit(renamed, skipped, summary, review)
 
-class SARORenameWorker(QObject):
-    progress = pyqtSignal(int, str)
-    finished = pyqtSignal(int, list, list)
-    canceled = pyqtSignal()
-    manual_input_requested = pyqtSignal(str, object, str, list)  # file, image, pdf_path, suggestions
-    manual_input_result = pyqtSignal(str)
+    def record(self, file, status, path=None, **fields):
+        if self.journal:
+            with timed("journal"):
+                self.journal.record(file, status, path, **fields)
 
-    def __init__(self, folder, pdf_files, poppler_path):
-        super().__init__()
-        self.folder = folder
-        self.pdf_files = pdf_files
-        self.poppler_path = poppler_path
-        self._cancel = False
-        self._manual_result = None
-        self._event_loop = None
-        self.manual_input_result.connect(self._on_manual_input_result)
+class OBRRenameWorker(RenameWorker):
+    mode = "OBR"
 
-    def cancel(self):
-        self._cancel = True
-        if self._event_loop:
-            self._event_loop.quit()
+class NCARenameWorker(RenameWorker):
+    mode = "NCA"
 
-    def _on_manual_input_result(self, value):
-        self._manual_result = value
-        if self._event_loop:
-            self._event_loop.quit()
+class SARORenameWorker(RenameWorker):
+    mode = "SARO"
 
-    def run(self):
-        renamed, skipped, summary = 0, [], []
-        for i, file in enumerate(self.pdf_files):
-            if self._cancel:
-                self.canceled.emit()
-                return
-            self.progress.emit(i, f"Processing {file} ({i+1}/{len(self.pdf_files)})")
-            path = os.path.join(self.folder, file)
-            try:
-                if self._cancel:
-                    self.canceled.emit()
-                    return
-                image = convert_from_path(path, first_page=1, last_page=1, poppler_path=self.poppler_path)[0]
-                if self._cancel:
-                    self.canceled.emit()
-                    return
-                QThread.msleep(100)  # Add small delay after PDF conversion
-                text = pytesseract.image_to_string(image)
-                if self._cancel:
-                    self.canceled.emit()
-                    return
-                QThread.msleep(50)  # Add small delay after OCR
-                # Try to find potential SARO numbers for suggestions
-                suggestions = []
-                match = re.search(r"SARO\s*No\.?\s*[:\-~]?\s*([A-Z0-9\-~]+)", text, re.IGNORECASE)
-                if match:
-                    suggestion = match.group(1).replace("~", "-").replace("–", "-").strip()
-                    if not suggestion.upper().startswith(("SARO-", "A-")):
-                        suggestion = "A-" + suggestion
-                    suggestions.append(suggestion)
-                
-                # Look for additional patterns in each line
-                lines = text.splitlines()
-                for line in lines:
-                    # Look for A-XX-XXXXX pattern
-                    match = re.search(r"\b([A-Z]\-\d{2}\-\d{5})\b", line)
-                    if match:
-                        suggestions.append(match.group(1))
-                    # Look for SARO-XXX-X-XX-XXXXXXX pattern
-                    match = re.search(r"(SARO\-[A-Z]{3}\-[A-Z]\-\d{2}\-\d{7})", line)
-                    if match:
-                        suggestions.append(match.group(1))
-                
-                # Remove duplicates and limit to top 3
-                suggestions = list(dict.fromkeys(suggestions))[:3]
-                
-                # Crop image to show bottom-right corner where SARO numbers typically appear
-                width, height = image.size
-                cropped_image = image.crop((int(width * 0.5), int(height * 0.7), width, height))
-                preview_image = pil_image_to_qimage(cropped_image)
-                
-                # Manual fallback with suggestions
-                self._manual_result = None
-                self._event_loop = QEventLoop()
-                self.manual_input_requested.emit(file, preview_image, path, suggestions)
-                self._event_loop.exec_()
-                manual_value = self._manual_result
-                self._event_loop = None
-
-                if manual_value and manual_value.strip():
-                    fallback_name = manual_value.strip()
-                    if not fallback_name.upper().startswith(("SARO-", "A-")):
-                        fallback_name = "A-" + fallback_name
-                    new_name = f"{fallback_name}.pdf"
-                    new_path = os.path.join(self.folder, new_name)
-                    if not os.path.exists(new_path):
-                        os.rename(path, new_path)
-                        renamed += 1
-                        summary.append(f"{file} ➔ {new_name}")
-                    else:
-                        skipped.append(f"{file} (already exists as {new_name})")
-                else:
-                    skipped.append(f"{file} (SARO number not found)")
-            except Exception as e:
-                skipped.append(f"{file} (error: {e})")
-        self.finished.emit(renamed, skipped, summary)
\ No newline at end of file
+class AutoRenameWorker(RenameWorker):
+    mode = AUTO
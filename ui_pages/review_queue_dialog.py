@@ -0,0 +1,153 @@
+import os
+import platform
+import subprocess
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+    QAbstractItemView, QAbstractItemDelegate, QHeaderView, QShortcut, QStyledItemDelegate
+)
+from PyQt5.QtGui import QPixmap, QKeySequence
+from PyQt5.QtCore import Qt, QEvent, pyqtSignal
+from core.rename_engine import apply_renames
+from utils.image_utils import pil_image_to_qimage
+
+PREVIEW_COL, FILE_COL, SUGGESTIONS_COL, NAME_COL = range(4)
+
+
+def is_plain_enter(event):
+    return event.key() in (Qt.Key_Return, Qt.Key_Enter) and not event.modifiers() & Qt.ControlModifier
+
+
+class EntryDelegate(QStyledItemDelegate):
+    # Tells the dialog when an entry was confirmed with Enter rather than by clicking away
+    enter_pressed = pyqtSignal()
+
+    def eventFilter(self, editor, event):
+        if event.type() == QEvent.KeyPress and is_plain_enter(event):
+            self.commitData.emit(editor)
+            self.closeEditor.emit(editor, QAbstractItemDelegate.NoHint)
+            self.enter_pressed.emit()
+            return True
+        return super().eventFilter(editor, event)
+
+
+class ReviewQueueDialog(QDialog):
+    """
+    End-of-batch review of every file the rename workers could not read.
+    Type a name and press Enter to move to the next file; Ctrl+Enter renames
+    everything that has a name.
+    """
+
+    def __init__(self, mode, folder, items, parent=None):
+        super().__init__(parent)
+        self.mode = mode
+        self.folder = folder
+        self.items = items
+        self.renamed, self.skipped, self.summary = 0, [], []
+        self.setWindowTitle(f"Review Unread {mode} Files ({len(items)})")
+        self.setMinimumSize(1000, 700)
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(
+            f"📝 Enter the {mode} number for each file. Enter moves to the next file, "
+            "Ctrl+Enter renames all. Leave a row blank to skip it."
+        ))
+
+        self.table = QTableWidget(len(items), 4)
+        self.table.setHorizontalHeaderLabels(["Preview", "File", "Suggestions", f"{mode} Number"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.AnyKeyPressed | QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(PREVIEW_COL, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(FILE_COL, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(SUGGESTIONS_COL, QHeaderView.Stretch)
+        header.setSectionResizeMode(NAME_COL, QHeaderView.Stretch)
+
+        for row, item in enumerate(items):
+            preview = QLabel()
+            if item.get("preview") is not None:
+                # copy() so the QImage no longer points into the PIL buffer
+                qimage = pil_image_to_qimage(item["preview"]).copy()
+                preview.setPixmap(QPixmap.fromImage(qimage).scaled(360, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            preview.setAlignment(Qt.AlignCenter)
+            self.table.setCellWidget(row, PREVIEW_COL, preview)
+
+            for col, text in ((FILE_COL, item["file"]), (SUGGESTIONS_COL, "\n".join(item["suggestions"]))):
+                cell = QTableWidgetItem(text)
+                cell.setFlags(cell.flags() & ~Qt.ItemIsEditable)
+                self.table.setItem(row, col, cell)
+
+            suggestions = item["suggestions"]
+            self.table.setItem(row, NAME_COL, QTableWidgetItem(suggestions[0] if suggestions else ""))
+            self.table.setRowHeight(row, 190)
+
+        self.delegate = EntryDelegate(self.table)
+        self.delegate.enter_pressed.connect(self.next_row)
+        self.table.setItemDelegateForColumn(NAME_COL, self.delegate)
+        self.table.installEventFilter(self)
+        self.table.doubleClicked.connect(self._on_double_clicked)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        open_btn = QPushButton("📂 Open File in System Viewer")
+        open_btn.clicked.connect(self.open_current_file)
+        apply_btn = QPushButton("✅ Rename All")
+        apply_btn.clicked.connect(self.apply)
+        cancel_btn = QPushButton("❌ Skip All")
+        cancel_btn.clicked.connect(self.reject)
+        buttons.addWidget(open_btn)
+        buttons.addStretch()
+        buttons.addWidget(apply_btn)
+        buttons.addWidget(cancel_btn)
+        layout.addLayout(buttons)
+
+        QShortcut(QKeySequence("Ctrl+Return"), self, activated=self.apply)
+        QShortcut(QKeySequence("Ctrl+Enter"), self, activated=self.apply)
+        QShortcut(QKeySequence("Ctrl+O"), self, activated=self.open_current_file)
+
+        self.setLayout(layout)
+        if items:
+            self.table.setCurrentCell(0, NAME_COL)
+            self.table.setFocus()
+
+    def eventFilter(self, source, event):
+        # Enter on a row that isn't being edited accepts the suggestion as is
+        if source is self.table and event.type() == QEvent.KeyPress and is_plain_enter(event):
+            self.next_row()
+            return True
+        return super().eventFilter(source, event)
+
+    def next_row(self):
+        row = self.table.currentRow() + 1
+        if row < self.table.rowCount():
+            self.table.setCurrentCell(row, NAME_COL)
+            self.table.editItem(self.table.item(row, NAME_COL))
+
+    def _on_double_clicked(self, index):
+        if index.column() == PREVIEW_COL:
+            self.open_current_file()
+
+    def open_current_file(self):
+        row = self.table.currentRow()
+        if row < 0:
+            return
+        path = self.items[row]["path"]
+        if platform.system() == "Windows":
+            os.startfile(path)
+        elif platform.system() == "Darwin":
+            subprocess.call(["open", path])
+        else:
+            subprocess.call(["xdg-open", path])
+
+    def entries(self):
+        return [(item, self.table.item(row, NAME_COL).text()) for row, item in enumerate(self.items)]
+
+    def apply(self):
+        # Commit a half-typed value before reading the grid
+        self.table.setCurrentCell(self.table.currentRow(), FILE_COL)
+        self.renamed, self.skipped, self.summary = apply_renames(self.folder, self.mode, self.entries())
+        self.accept()
+
+    def reject(self):
+        self.renamed, self.skipped, self.summary = apply_renames(self.folder, self.mode, [(item, "") for item in self.items])
+        super().reject()
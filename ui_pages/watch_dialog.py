@@ -0,0 +1,194 @@
+import os
+import time
+import pytesseract
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTextEdit
+from PyQt5.QtCore import Qt, QObject, QThread, pyqtSignal
+from core.folder_watcher import FolderWatcher
+from core.logger import log_action
+from core.obr_extraction import ExtractEngine
+from core.rename_engine import RenameEngine, rename_pdf
+from ui_pages.review_queue_dialog import ReviewQueueDialog
+
+# Watch mode of the OBR extractor; the others are rename modes
+EXTRACT = "Extract"
+REVIEW_PREVIEW_SIZE = (1000, 1000)
+
+
+class WatchWorker(QObject):
+    """
+    Runs the PDFs that arrive in one folder through the rename pipeline
+    (OBR, NCA, SARO or Auto) or OBR extraction, batch by batch as they
+    finish being written. Unread files are kept for review when watching stops.
+    seen is passed on to FolderWatcher. One engine, and so one process pool,
+    serves every batch of the watch; it is shut down when the watch ends.
+    """
+    log = pyqtSignal(str)
+    row = pyqtSignal(list)
+    finished = pyqtSignal()
+
+    def __init__(self, folder, mode, poppler_path, seen=None):
+        super().__init__()
+        self.folder = folder
+        self.mode = mode
+        self.poppler_path = poppler_path
+        self.watcher = FolderWatcher(folder, seen=seen)
+        self.engine = None
+        self.renamed, self.skipped, self.review = 0, [], []
+        self._stopped = False
+
+    def stop(self):
+        # Safe from the UI thread while run() is busy
+        self._stopped = True
+        self.watcher.stop()
+        if self.engine:
+            self.engine.cancel()
+
+    def run(self):
+        from core.ocr_config import get_tesseract_path
+        tesseract_path = get_tesseract_path()
+        if tesseract_path:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        self.log.emit(f"Watching {self.folder} ({self.mode})")
+        if self.mode == EXTRACT:
+            self.engine = ExtractEngine(self.folder, [], self.poppler_path, keep_pool=True)
+        else:
+            self.engine = RenameEngine(self.mode, self.folder, [], self.poppler_path, keep_pool=True)
+        try:
+            for files in self.watcher.batches():
+                if self._stopped:
+                    break
+                self.log.emit(f"{len(files)} new file(s) in {self.folder}")
+                if self.mode == EXTRACT:
+                    self.extract(files)
+                else:
+                    self.rename(files)
+        finally:
+            self.engine.close()
+        self.log.emit(f"Stopped watching {self.folder}")
+        self.finished.emit()
+
+    def extract(self, files):
+        for result in self.engine.results(files):
+            if self._stopped:
+                break
+            if result["error"]:
+                self.log.emit(f"⚠ {result['file']}: {result['error']}")
+            else:
+                self.row.emit(result["row"])
+
+    def rename(self, files):
+        for result in self.engine.results(files):
+            if self._stopped:
+                break
+            file = result["file"]
+            if result["error"]:
+                self.skipped.append(f"{file} (error: {result['error']})")
+                self.log.emit(f"⚠ {file}: {result['error']}")
+                continue
+            if not result["value"]:
+                if result["preview"] is not None:
+                    result["preview"].thumbnail(REVIEW_PREVIEW_SIZE)
+                self.review.append(result)
+                self.log.emit(f"📝 {file}: no {result['mode']} number found, queued for review")
+                continue
+            # The renamed file lands in the watched folder too; it isn't a new arrival
+            self.watcher.ignore(f"{result['value']}.pdf")
+            try:
+                ok, message = rename_pdf(self.folder, file, result["path"], result["value"])
+            except Exception as e:
+                ok, message = False, f"{file} (error: {e})"
+            if ok:
+                self.renamed += 1
+            else:
+                self.skipped.append(message)
+            self.log.emit(("✅ " if ok else "⚠ ") + message)
+
+
+class WatchDialog(QDialog):
+    """
+    Non-modal log of the watched rename folders ({folder: mode}). Closing
+    it or pressing Stop ends the watch; once every watch thread has
+    finished, the review queues open and the dialog closes.
+    """
+
+    def __init__(self, folders, poppler_path, username="Unknown", parent=None):
+        super().__init__(parent)
+        self.username = username
+        self.setWindowTitle("Watching Folders")
+        self.setMinimumSize(700, 400)
+        self.setWindowModality(Qt.NonModal)
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("New PDFs are renamed as they arrive. Leave this window open to keep watching."))
+        self.log_output = QTextEdit()
+        self.log_output.setReadOnly(True)
+        layout.addWidget(self.log_output)
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        self.stop_button = QPushButton("Stop Watching")
+        self.stop_button.clicked.connect(self.close)
+        buttons.addWidget(self.stop_button)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self.watches = []
+        self.running = 0  # watch threads not finished yet
+        self.stopping = False
+        for folder, mode in folders.items():
+            thread = QThread()
+            worker = WatchWorker(folder, mode, poppler_path)
+            worker.moveToThread(thread)
+            worker.log.connect(self.append_log)
+            worker.finished.connect(thread.quit)
+            thread.finished.connect(self.watch_ended)
+            thread.started.connect(worker.run)
+            thread.start()
+            self.running += 1
+            self.watches.append((thread, worker))
+
+    def append_log(self, message):
+        self.log_output.append(f"[{time.strftime('%H:%M:%S')}] {message}")
+
+    def closeEvent(self, event):
+        if self.running:
+            # Closes for real from watch_ended, once the threads are done
+            self.stop()
+            event.ignore()
+            return
+        super().closeEvent(event)
+
+    def stop(self):
+        # Returns right away; the UI stays responsive while the workers wind down
+        if self.stopping:
+            return
+        self.stopping = True
+        self.stop_button.setEnabled(False)
+        self.stop_button.setText("Stopping...")
+        for thread, worker in self.watches:
+            worker.stop()
+
+    def watch_ended(self):
+        self.running -= 1
+        if self.running:
+            return
+        self.finish()
+        self.close()
+
+    def finish(self):
+        watches, self.watches = self.watches, []
+        renamed, skipped = 0, []
+        for thread, worker in watches:
+            # Review queues are per type, and an Auto folder can hold all three
+            queues = {}
+            for item in worker.review:
+                queues.setdefault(item["mode"], []).append(item)
+            for mode, items in queues.items():
+                dialog = ReviewQueueDialog(mode, worker.folder, items, self)
+                dialog.exec_()
+                renamed += dialog.renamed
+                skipped += dialog.skipped
+            renamed += worker.renamed
+            skipped += worker.skipped
+        log_action(self.username, "Watched Folders",
+                   [f"{os.path.basename(worker.folder) or worker.folder}: {worker.mode}" for _, worker in watches]
+                   + [f"Renamed: {renamed}", f"Skipped: {len(skipped)}"])